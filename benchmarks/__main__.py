@@ -0,0 +1,64 @@
+"""Runs the sqlight overhead benchmarks.
+
+    python -m benchmarks [--url URL ...] [--rows 10,1000] [--widths 4,16]
+                         [--repeat 5] [--json results.json]
+                         [--check benchmarks/thresholds.json]
+
+SQLite in memory always runs, every --url (for instance a local MySQL or
+PostgreSQL server) runs too. --check exits with status 1 when a
+sqlight/raw ratio is above the limit given for its driver and case.
+"""
+import argparse
+import json
+import sys
+
+from benchmarks.overhead import CASES, check, run
+
+SQLITE_URL = "sqlite:///:memory:"
+
+
+def _ints(text: str):
+    return [int(v) for v in text.split(",")]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--url", action="append", default=[],
+                        help="database URL to run besides SQLite")
+    parser.add_argument("--rows", type=_ints, default=[10, 1000, 10000])
+    parser.add_argument("--widths", type=_ints, default=[4, 16])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--case", action="append", choices=CASES,
+                        help="cases to run, all by default")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--check", help="thresholds JSON file to enforce")
+    args = parser.parse_args(argv)
+
+    results = []
+    for url in [SQLITE_URL] + args.url:
+        results.extend(run(url, args.rows, args.widths, args.repeat,
+                           args.case or CASES))
+
+    print("{:<12} {:<18} {:>6} {:>5} {:>12} {:>12} {:>6}".format(
+        "driver", "case", "rows", "width", "raw us", "sqlight us", "ratio"))
+    for r in results:
+        print("{:<12} {:<18} {:>6} {:>5} {:>12.1f} {:>12.1f} {:>6.2f}".format(
+            r["driver"], r["case"], r["rows"], r["width"], r["raw"] * 1e6,
+            r["sqlight"] * 1e6, r["ratio"]))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.check:
+        with open(args.check) as f:
+            failures = check(results, json.load(f))
+        for failure in failures:
+            print("FAIL", failure, file=sys.stderr)
+        if failures:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""Reports rows/sec of executemany and copy_from.
+
+    python -m benchmarks.bench_bulk_load [dburl] [rows]
+
+The dburl defaults to an in-memory SQLite database; pass a PostgreSQL url
+to compare per-row executemany, paged multi-row VALUES and COPY.
+"""
+import sys
+import time
+
+from sqlight.connection import Connection
+from sqlight.platforms import Platform
+
+
+TABLES = {
+    Platform.PostgreSQL: "CREATE TABLE bench_load (id BIGINT, name TEXT, "
+                         "score DOUBLE PRECISION)",
+    Platform.MySQL: "CREATE TABLE bench_load (id BIGINT, name VARCHAR(64), "
+                    "score DOUBLE)",
+    Platform.SQLite: "CREATE TABLE bench_load (id INTEGER, name TEXT, "
+                     "score REAL)",
+}
+
+
+def rows(count):
+    return ((i, "name%d" % i, i / 3) for i in range(count))
+
+
+def run(c, name, count, func):
+    c.execute("DELETE FROM bench_load")
+    c.commit()
+    start = time.perf_counter()
+    loaded = func()
+    c.commit()
+    elapsed = time.perf_counter() - start
+    assert loaded == count, (loaded, count)
+    print("{:<24} {:8.0f} ms {:12.0f} rows/s".format(
+        name, elapsed * 1000, count / elapsed))
+
+
+def main(argv):
+    url = argv[1] if len(argv) > 1 else "sqlite:///:memory:"
+    count = int(argv[2]) if len(argv) > 2 else 100000
+    c = Connection.create_from_dburl(url)
+    c.connect()
+    platform = c.dburl.platform
+    if platform is Platform.MariaDB:
+        platform = Platform.MySQL
+    c.execute("DROP TABLE IF EXISTS bench_load")
+    c.execute(TABLES[platform])
+    c.commit()
+
+    insert = "INSERT INTO bench_load (id, name, score) VALUES (%s, %s, %s)"
+    print("{} rows into {}".format(count, platform.value))
+    page_size = getattr(c._db, "page_size", None)
+    if page_size is not None:
+        c._db.page_size = 1
+        run(c, "executemany per row", count,
+            lambda: c.executemany(insert, list(rows(count))))
+        c._db.page_size = page_size
+    run(c, "executemany", count,
+        lambda: c.executemany(insert, list(rows(count))))
+    run(c, "copy_from", count,
+        lambda: c.copy_from("bench_load", rows(count),
+                            ["id", "name", "score"]))
+
+    c.execute("DROP TABLE bench_load")
+    c.commit()
+    c.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,39 @@
+"""Measures the time `import sqlight` takes in a fresh interpreter and
+lists the driver modules it loaded.
+
+    python -m benchmarks.bench_import [runs]
+"""
+import statistics
+import subprocess
+import sys
+import time
+
+DRIVER_MODULES = ("sqlite3", "pymysql", "MySQLdb", "psycopg2")
+
+
+def import_time(statement: str, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.check_call([sys.executable, "-c", statement])
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main(argv):
+    runs = int(argv[1]) if len(argv) > 1 else 20
+    baseline = import_time("pass", runs)
+    total = import_time("import sqlight", runs)
+    loaded = subprocess.check_output([
+        sys.executable, "-c",
+        "import sys, sqlight; print(' '.join(m for m in {!r} "
+        "if m in sys.modules))".format(DRIVER_MODULES)]).decode().strip()
+
+    print("interpreter    {:8.1f} ms".format(baseline * 1000))
+    print("import sqlight {:8.1f} ms (+{:.1f} ms)".format(
+        total * 1000, (total - baseline) * 1000))
+    print("drivers loaded: {}".format(loaded or "none"))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
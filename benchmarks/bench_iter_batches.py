@@ -0,0 +1,48 @@
+"""Compares iter and iter_batches throughput on SQLite.
+
+    python -m benchmarks.bench_iter_batches [rows] [batch_size]
+"""
+import sys
+import time
+
+from sqlight.connection import Connection
+from sqlight.row import tuple_factory
+
+
+def setup(count):
+    c = Connection.create_from_dburl("sqlite:///:memory:")
+    c.connect()
+    c.execute("create table t (id integer primary key, a int, b text)")
+    c.executemany("insert into t (a, b) values (%s, %s)",
+                  [(i, "name%d" % i) for i in range(count)])
+    c.commit()
+    return c
+
+
+def run(name, count, func):
+    start = time.perf_counter()
+    rows = func()
+    elapsed = time.perf_counter() - start
+    assert rows == count
+    print("{:<28} {:8.1f} ms {:12.0f} rows/s".format(
+        name, elapsed * 1000, count / elapsed))
+
+
+def main(argv):
+    count = int(argv[1]) if len(argv) > 1 else 200000
+    batch_size = int(argv[2]) if len(argv) > 2 else 1000
+    c = setup(count)
+    query = "select * from t"
+
+    print("{} rows, batch_size {}".format(count, batch_size))
+    for factory_name, factory in (("Row", None), ("tuple", tuple_factory)):
+        run("iter {}".format(factory_name), count,
+            lambda: sum(1 for _ in c.iter(query, row_factory=factory)))
+        run("iter_batches {}".format(factory_name), count,
+            lambda: sum(len(b) for b in c.iter_batches(
+                query, batch_size=batch_size, row_factory=factory)))
+    c.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,42 @@
+"""Compares Row and CompactRow memory and construction time.
+The driver tuples exist in both cases and are not counted.
+
+    python -m benchmarks.bench_row [rows] [columns]
+"""
+import sys
+import time
+import tracemalloc
+
+from sqlight.row import default_row_factory, compact_row_factory
+
+
+def measure(factory, column_names, tuples):
+    build = factory(column_names)
+    start = time.perf_counter()
+    rows = [build(t) for t in tuples]
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    rows = [build(t) for t in tuples]
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rows
+    return elapsed, memory
+
+
+def main(argv):
+    count = int(argv[1]) if len(argv) > 1 else 100000
+    width = int(argv[2]) if len(argv) > 2 else 8
+    column_names = ["col{}".format(i) for i in range(width)]
+    tuples = [tuple(range(i, i + width)) for i in range(count)]
+
+    print("{} rows x {} columns".format(count, width))
+    for name, factory in (("Row", default_row_factory),
+                          ("CompactRow", compact_row_factory)):
+        elapsed, memory = measure(factory, column_names, tuples)
+        print("{:<12} {:8.1f} ms {:10.1f} KiB {:8.1f} bytes/row".format(
+            name, elapsed * 1000, memory / 1024, memory / count))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
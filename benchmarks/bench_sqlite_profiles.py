@@ -0,0 +1,51 @@
+"""Compares the SQLite profiles on committed single-row writes and point
+reads against a database file.
+
+    python -m benchmarks.bench_sqlite_profiles [writes] [reads]
+"""
+import sys
+import tempfile
+import time
+
+from sqlight.connection import Connection
+from sqlight.platforms.sqlite import PROFILES
+
+
+def run(profile, writes: int, reads: int):
+    with tempfile.TemporaryDirectory() as directory:
+        url = "sqlite:///{}/bench.db".format(directory)
+        if profile is not None:
+            url += "?profile=" + profile
+        conn = Connection.create_from_dburl(url)
+        conn.connect()
+        conn.execute("CREATE TABLE bench (id INTEGER PRIMARY KEY, "
+                     "name TEXT, value REAL)")
+        conn.commit()
+
+        start = time.perf_counter()
+        for i in range(writes):
+            conn.insert("INSERT INTO bench (name, value) VALUES (%s, %s)",
+                        "name%d" % i, i / 3)
+            conn.commit()
+        write_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(reads):
+            conn.get("SELECT * FROM bench WHERE id = %s", i % writes + 1)
+        read_time = time.perf_counter() - start
+        conn.close()
+    return write_time, read_time
+
+
+def main(argv):
+    writes = int(argv[1]) if len(argv) > 1 else 2000
+    reads = int(argv[2]) if len(argv) > 2 else 20000
+    print("{} committed inserts, {} point reads".format(writes, reads))
+    for profile in [None] + sorted(PROFILES):
+        write_time, read_time = run(profile, writes, reads)
+        print("{:<10} {:10.0f} writes/s {:10.0f} reads/s".format(
+            profile or "default", writes / write_time, reads / read_time))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,69 @@
+"""Compares read throughput of threads sharing one SQLite connection
+with the threaded engine's reader pool.
+
+    python -m benchmarks.bench_sqlite_threads [threads] [reads per thread]
+"""
+import sys
+import tempfile
+import threading
+import time
+
+from sqlight.connection import Connection
+
+QUERY = "SELECT count(*) AS n FROM bench WHERE value > %s"
+
+
+def setup(path: str):
+    conn = Connection.create_from_dburl("sqlite:///{}".format(path))
+    conn.connect()
+    conn.execute("CREATE TABLE bench (id INTEGER PRIMARY KEY, value REAL)")
+    conn.executemany("INSERT INTO bench (value) VALUES (%s)",
+                     [(i / 7,) for i in range(20000)])
+    conn.commit()
+    conn.close()
+
+
+def run(conn: Connection, threads: int, reads: int, lock=None) -> float:
+    def work():
+        for i in range(reads):
+            if lock is None:
+                conn.get(QUERY, i)
+            else:
+                with lock:
+                    conn.get(QUERY, i)
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return threads * reads / (time.perf_counter() - start)
+
+
+def main(argv):
+    threads = int(argv[1]) if len(argv) > 1 else 4
+    reads = int(argv[2]) if len(argv) > 2 else 200
+    with tempfile.TemporaryDirectory() as directory:
+        path = "{}/bench.db".format(directory)
+        setup(path)
+
+        single = Connection.create_from_dburl(
+            "sqlite:///{}?check_same_thread=False".format(path))
+        single.connect()
+        locked = run(single, threads, reads, threading.Lock())
+        single.close()
+
+        threaded = Connection.create_from_dburl(
+            "sqlite+threaded:///{}?readers={}".format(path, threads))
+        threaded.connect()
+        pooled = run(threaded, threads, reads)
+        threaded.close()
+
+    print("{} threads x {} reads".format(threads, reads))
+    print("one connection {:10.0f} reads/s".format(locked))
+    print("reader pool    {:10.0f} reads/s".format(pooled))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,194 @@
+"""Measures the time sqlight adds on top of the raw DB-API driver.
+
+Each case runs the same statement through the driver's own connection
+(cursor, execute, fetch tuples) and through sqlight (paramstyle
+translation, exception conversion, cursor handling and Row building),
+on the same database connection. Results are seconds per call, best of
+repeat runs, and the sqlight/raw ratio.
+"""
+import time
+
+from typing import Callable, Dict, List, Sequence
+
+from sqlight.connection import Connection
+from sqlight.platforms import Platform
+
+CASES = ("get", "query", "iter", "execute_lastrowid", "executemany")
+
+_ID_COLUMN = {
+    Platform.SQLite: "id INTEGER PRIMARY KEY",
+    Platform.MySQL: "id INT PRIMARY KEY AUTO_INCREMENT",
+    Platform.MariaDB: "id INT PRIMARY KEY AUTO_INCREMENT",
+    Platform.PostgreSQL: "id SERIAL PRIMARY KEY",
+}
+
+TABLE = "sqlight_bench"
+CALLS = 200  # calls per run of the single-row cases
+
+
+def best_time(func: Callable, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+class Bench:
+    """One table of rows x width integer columns on one connection."""
+
+    def __init__(self, url: str, rows: int, width: int):
+        self.conn = Connection.create_from_dburl(url)
+        self.conn.connect()
+        self.platform = self.conn.dburl.platform
+        self.raw = self.conn._db._db  # the driver's DB-API connection
+        self.mark = "?" if self.platform is Platform.SQLite else "%s"
+        self.rows = rows
+        self.width = width
+        self.columns = ["c{}".format(i) for i in range(width)]
+        self._create()
+
+    def close(self):
+        self.conn.execute("DROP TABLE {}".format(TABLE))
+        self.conn.commit()
+        self.conn.close()
+
+    def _create(self):
+        self.conn.execute("DROP TABLE IF EXISTS {}".format(TABLE))
+        self.conn.execute("CREATE TABLE {} ({}, {})".format(
+            TABLE, _ID_COLUMN[self.platform],
+            ", ".join(c + " INTEGER" for c in self.columns)))
+        self.conn.executemany(self._insert_sql("%s"), self._values())
+        self.conn.commit()
+
+    def _insert_sql(self, mark: str) -> str:
+        return "INSERT INTO {} ({}) VALUES ({})".format(
+            TABLE, ", ".join(self.columns), ", ".join([mark] * self.width))
+
+    def _values(self, count: int = None) -> List[Sequence]:
+        return [tuple(range(i, i + self.width))
+                for i in range(count or self.rows)]
+
+    def _scratch(self):
+        """Keeps the write cases from growing the table."""
+        self.conn.execute("DELETE FROM {} WHERE id > %s".format(TABLE),
+                          self.rows)
+        self.conn.commit()
+
+    def cases(self) -> Dict[str, tuple]:
+        """Returns case name -> (raw function, sqlight function, calls)."""
+        raw, conn, mark = self.raw, self.conn, self.mark
+        get_sql = "SELECT * FROM {} WHERE id = {{}}".format(TABLE)
+        all_sql = "SELECT * FROM {}".format(TABLE)
+        ids = [i % self.rows + 1 for i in range(CALLS)]
+        values = self._values(CALLS)
+        many = self._values()
+
+        def raw_get():
+            for i in ids:
+                cursor = raw.cursor()
+                cursor.execute(get_sql.format(mark), (i,))
+                cursor.fetchone()
+                cursor.close()
+
+        def sqlight_get():
+            for i in ids:
+                conn.get(get_sql.format("%s"), i)
+
+        def raw_query():
+            cursor = raw.cursor()
+            cursor.execute(all_sql)
+            cursor.fetchall()
+            cursor.close()
+
+        def sqlight_query():
+            conn.query(all_sql)
+
+        def raw_iter():
+            cursor = raw.cursor()
+            cursor.execute(all_sql)
+            for _ in cursor:
+                pass
+            cursor.close()
+
+        def sqlight_iter():
+            for _ in conn.iter(all_sql):
+                pass
+
+        def raw_insert():
+            sql = self._insert_sql(mark)
+            for v in values:
+                cursor = raw.cursor()
+                cursor.execute(sql, v)
+                cursor.lastrowid
+                cursor.close()
+            self._scratch()
+
+        def sqlight_insert():
+            sql = self._insert_sql("%s")
+            for v in values:
+                conn.execute_lastrowid(sql, *v)
+            self._scratch()
+
+        def raw_many():
+            cursor = raw.cursor()
+            cursor.executemany(self._insert_sql(mark), many)
+            cursor.close()
+            self._scratch()
+
+        def sqlight_many():
+            conn.executemany(self._insert_sql("%s"), many)
+            self._scratch()
+
+        return {
+            "get": (raw_get, sqlight_get, CALLS),
+            "query": (raw_query, sqlight_query, 1),
+            "iter": (raw_iter, sqlight_iter, 1),
+            "execute_lastrowid": (raw_insert, sqlight_insert, CALLS),
+            "executemany": (raw_many, sqlight_many, 1),
+        }
+
+
+def run(url: str, rows: Sequence[int] = (10, 1000, 10000),
+        widths: Sequence[int] = (4, 16), repeat: int = 5,
+        cases: Sequence[str] = CASES) -> List[Dict]:
+    """Runs the cases against url for every rows x widths table."""
+    results = []
+    for count in rows:
+        for width in widths:
+            bench = Bench(url, count, width)
+            try:
+                for name, (raw, wrapped, calls) in bench.cases().items():
+                    if name not in cases:
+                        continue
+                    raw_time = best_time(raw, repeat) / calls
+                    sqlight_time = best_time(wrapped, repeat) / calls
+                    results.append({
+                        "platform": bench.platform.value,
+                        "driver": bench.conn.dburl.driver.value[0],
+                        "case": name,
+                        "rows": count,
+                        "width": width,
+                        "raw": raw_time,
+                        "sqlight": sqlight_time,
+                        "ratio": sqlight_time / raw_time,
+                    })
+            finally:
+                bench.close()
+    return results
+
+
+def check(results: List[Dict], thresholds: Dict) -> List[str]:
+    """Returns a message for each result whose ratio is above its limit.
+    thresholds maps driver -> case -> max ratio."""
+    failures = []
+    for r in results:
+        limit = thresholds.get(r["driver"], {}).get(r["case"])
+        if limit is not None and r["ratio"] > limit:
+            failures.append(
+                "{driver} {case} rows={rows} width={width}: "
+                "{ratio:.2f}x raw, limit {limit}x".format(limit=limit, **r))
+    return failures
@@ -1,9 +1,12 @@
 from sqlight.connection import Connection
 from sqlight.dburl import DBUrl
-from sqlight.row import Row
+from sqlight.inlist import InList
+from sqlight.row import Row, CompactRow
 
 
 VERSION = "2.0.1"
 Connection = Connection
 DBUrl = DBUrl
+InList = InList
 Row = Row
+CompactRow = CompactRow
@@ -0,0 +1,176 @@
+import asyncio
+import queue
+import threading
+
+from concurrent.futures import Future
+from itertools import islice
+from typing import AsyncIterator, Dict, Iterator, List
+
+import sqlight.err as err
+
+from sqlight.connection import Connection
+from sqlight.row import Row
+
+
+class _Worker(threading.Thread):
+    """The thread that owns a driver connection and runs its calls in
+    submission order."""
+
+    def __init__(self):
+        super().__init__(name="sqlight-aio", daemon=True)
+        self.jobs = queue.Queue()
+
+    def run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            future, func, args, kwargs = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+
+class AsyncConnection:
+    """An asyncio front-end for Connection.
+
+    Every call runs on one worker thread dedicated to this connection, so
+    drivers bound to the thread that opened them (like sqlite3) work as
+    they do synchronously. At most ``max_pending`` calls are queued at a
+    time, further callers wait for a free slot.
+    """
+
+    @classmethod
+    def create_from_dburl(cls, url: str, **kwargs) -> 'AsyncConnection':
+        """
+        create async connect from dburl
+        """
+        return cls(Connection.create_from_dburl(url), **kwargs)
+
+    def __init__(self, connection: Connection, max_pending: int = 64,
+                 iter_chunk_size: int = 100):
+        self.connection = connection
+        self.max_pending = max_pending
+        self.iter_chunk_size = iter_chunk_size
+        self._slots = None  # created on first use, inside the event loop
+        self._closed = False
+        self._worker = _Worker()
+        self._worker.start()
+
+    async def __aenter__(self) -> 'AsyncConnection':
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def connect(self):
+        """connect to DB"""
+        await self._run(self.connection.connect)
+
+    async def begin(self):
+        """begin a transaction."""
+        await self._run(self.connection.begin)
+
+    async def commit(self):
+        """commit transaction."""
+        await self._run(self.connection.commit)
+
+    async def rollback(self):
+        """rollback transaction."""
+        await self._run(self.connection.rollback)
+
+    async def iter(self, query: str, *parameters,
+                   **kwparameters) -> AsyncIterator[Row]:
+        """Returns an async iterator for the given query and parameters.
+        Rows are fetched from the worker ``iter_chunk_size`` at a time.
+        """
+        rows = await self._run(self.connection.iter, query, *parameters,
+                               **kwparameters)
+        try:
+            while True:
+                chunk = await self._run(_next_chunk, rows,
+                                        self.iter_chunk_size)
+                for row in chunk:
+                    yield row
+                if len(chunk) < self.iter_chunk_size:
+                    return
+        finally:
+            if not self._closed:
+                await self._run(rows.close)
+
+    async def query(self, query: str, *parameters,
+                    **kwparameters) -> List[Row]:
+        """Returns a row list for the given query and parameters."""
+        return await self._run(self.connection.query, query, *parameters,
+                               **kwparameters)
+
+    async def get(self, query: str, *parameters, **kwparameters) -> Row:
+        """Returns the (singular) row returned by the given query."""
+        return await self._run(self.connection.get, query, *parameters,
+                               **kwparameters)
+
+    async def execute(self, query: str, *parameters, **kwparameters) -> int:
+        """Executes the given query."""
+        return await self.execute_lastrowid(query, *parameters,
+                                            **kwparameters)
+
+    async def execute_lastrowid(self, query: str, *parameters,
+                                **kwparameters) -> int:
+        """Executes the given query, returning the lastrowid from the query."""
+        return await self._run(self.connection.execute_lastrowid, query,
+                               *parameters, **kwparameters)
+
+    async def execute_rowcount(self, query: str, *parameters,
+                               **kwparameters) -> int:
+        """Executes the given query, returning the rowcount from the query."""
+        return await self._run(self.connection.execute_rowcount, query,
+                               *parameters, **kwparameters)
+
+    async def executemany(self, query: str, parameters: Iterator[Dict]) -> int:
+        """Executes the given query against all the given param sequences.
+        We return the rowcount from the query.
+        """
+        return await self._run(self.connection.executemany, query,
+                               parameters)
+
+    async def close(self):
+        """Closes connection and stops the worker thread."""
+        if self._closed:
+            return
+        try:
+            await self._run(self.connection.close)
+        finally:
+            self._closed = True
+            self._worker.jobs.put(None)
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._worker.join)
+
+    async def get_last_executed(self):
+        """Get last executed."""
+        return await self._run(self.connection.get_last_executed)
+
+    update = delete = execute_rowcount
+    updatemany = executemany
+    insert = execute_lastrowid
+    insertmany = executemany
+
+    async def _run(self, func, *args, **kwargs):
+        if self._closed:
+            raise err.InterfaceError("AsyncConnection is closed.")
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        async with self._slots:
+            future = Future()
+            self._worker.jobs.put((future, func, args, kwargs))
+            return await asyncio.wrap_future(future)
+
+
+def _next_chunk(rows: Iterator, size: int) -> list:
+    return list(islice(rows, size))
+
@@ -0,0 +1,348 @@
+import copy
+import sys
+import threading
+import time
+
+from collections import OrderedDict
+from functools import lru_cache
+from typing import AbstractSet, Callable, Dict, FrozenSet, Iterable, \
+    Iterator, List
+
+import sqlight.err as err
+import sqlight.lexer as lexer
+
+from sqlight.connection import Connection
+from sqlight.platforms.db import DB
+from sqlight.row import Row
+
+ALL_TABLES = "*"  # tag of entries whose tables could not be parsed
+
+_WRITE_STATEMENTS = {"INSERT", "REPLACE", "MERGE", "DELETE", "UPDATE",
+                     "TRUNCATE", "DROP", "ALTER", "CREATE"}
+# words that may sit between the statement keyword and the table name
+_WRITE_SKIP = {"OR", "ROLLBACK", "ABORT", "REPLACE", "FAIL", "IGNORE",
+               "LOW_PRIORITY", "DELAYED", "HIGH_PRIORITY", "QUICK", "ONLY",
+               "TABLE", "TEMP", "TEMPORARY", "IF", "NOT", "EXISTS", "INTO",
+               "FROM"}
+
+
+class QueryCache:
+    """A thread-safe LRU of query results bounded by entry count and an
+    estimate of the memory the rows take.
+
+    Entries are tagged with the tables their query reads, so writes can
+    drop them by table. A cache can be shared by several connections to
+    the same database.
+    """
+
+    def __init__(self, max_entries: int = 10000,
+                 max_bytes: int = 64 * 1024 * 1024, ttl: float = 60.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl  # default seconds an entry lives
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+        self._entries = OrderedDict()  # key -> (expires, rows, tables, size)
+        self._tables = {}  # table -> set of keys
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        """Estimated bytes held by the cached rows."""
+        return self._bytes
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+        }
+
+    def get(self, key) -> List:
+        """Returns the cached rows of key, None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] < time.monotonic():
+                self._remove(key)
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, rows: List, tables: AbstractSet[str],
+            ttl: float = None):
+        size = _sizeof_rows(rows)
+        if size > self.max_bytes:
+            return
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires, rows, tables, size)
+            self._bytes += size
+            for table in tables:
+                self._tables.setdefault(table, set()).add(key)
+            while len(self._entries) > self.max_entries or \
+                    self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, tables: Iterable[str] = None):
+        """Drops entries reading any of tables, everything when tables
+        is None or contains ALL_TABLES."""
+        with self._lock:
+            if tables is None or ALL_TABLES in tables:
+                keys = list(self._entries)
+            else:
+                keys = set(self._tables.get(ALL_TABLES, ()))
+                for table in tables:
+                    keys.update(self._tables.get(table, ()))
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+
+    def clear(self):
+        self.invalidate()
+
+    def _remove(self, key):
+        _, _, tables, size = self._entries.pop(key)
+        self._bytes -= size
+        for table in tables:
+            keys = self._tables.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tables[table]
+
+
+class CachedConnection(Connection):
+    """A Connection caching query and get results in a QueryCache.
+
+    query/get take cache_ttl to override the cache's TTL, 0 bypasses the
+    cache. execute*/executemany*/copy_from drop the entries of the tables
+    they write. Reads of tables written by the open transaction bypass
+    the cache until commit or rollback. Callers get their own copies of
+    cached rows, so changing one row never shows up in another result.
+    """
+
+    def __init__(self, driver: DB, cache: QueryCache = None,
+                 row_factory: Callable = None):
+        super().__init__(driver, row_factory=row_factory)
+        self.cache = cache if cache is not None else QueryCache()
+        self._in_transaction = False
+        self._dirty_tables = set()  # written by the open transaction
+
+    def begin(self):
+        super().begin()
+        self._in_transaction = True
+
+    def commit(self):
+        super().commit()
+        self._end_transaction()
+
+    def rollback(self):
+        super().rollback()
+        self._end_transaction()
+
+    def query(self, query: str, *parameters, row_factory: Callable = None,
+              cache_ttl: float = None, **kwparameters) -> List[Row]:
+        """Returns a row list for the given query and parameters."""
+        if cache_ttl == 0:
+            return super().query(query, *parameters,
+                                 row_factory=row_factory, **kwparameters)
+        factory = row_factory or self.row_factory
+        key = (query, parameters, tuple(sorted(kwparameters.items())),
+               factory)
+        tables = read_tables(query, self.platform)
+        try:
+            hash(key)
+        except TypeError:
+            key = None
+        if key is None or self._is_dirty(tables):
+            return super().query(query, *parameters,
+                                 row_factory=row_factory, **kwparameters)
+
+        rows = self.cache.get(key)
+        if rows is None:
+            rows = super().query(query, *parameters,
+                                 row_factory=row_factory, **kwparameters)
+            self.cache.put(key, _copy_rows(rows), tables, cache_ttl)
+            return rows
+        return _copy_rows(rows)
+
+    def get(self, query: str, *parameters, row_factory: Callable = None,
+            cache_ttl: float = None, **kwparameters) -> Row:
+        """Returns the (singular) row returned by the given query.
+        If the query has no results, returns None.  If it has
+        more than one result, raises an exception.
+        """
+        rows = self.query(query, *parameters, row_factory=row_factory,
+                          cache_ttl=cache_ttl, **kwparameters)
+        if not rows:
+            return None
+        elif len(rows) > 1:
+            raise err.ProgrammingError(
+                "Multiple rows returned for Database.get() query")
+        return rows[0]
+
+    def execute_lastrowid(self, query: str, *parameters,
+                          **kwparameters) -> int:
+        try:
+            return super().execute_lastrowid(query, *parameters,
+                                             **kwparameters)
+        finally:
+            self._written(write_tables(query, self.platform))
+
+    def execute_rowcount(self, query: str, *parameters, **kwparameters) -> int:
+        try:
+            return super().execute_rowcount(query, *parameters,
+                                            **kwparameters)
+        finally:
+            self._written(write_tables(query, self.platform))
+
+    def executemany(self, query: str, parameters: Iterator[Dict]) -> int:
+        try:
+            return super().executemany(query, parameters)
+        finally:
+            self._written(write_tables(query, self.platform))
+
+    def executemany_stream(self, query: str, parameters: Iterable,
+                           *args, **kwargs) -> int:
+        try:
+            return super().executemany_stream(query, parameters,
+                                              *args, **kwargs)
+        finally:
+            self._written(write_tables(query, self.platform))
+
+    def copy_from(self, table: str, rows: Iterator,
+                  columns: List[str] = None) -> int:
+        try:
+            return super().copy_from(table, rows, columns)
+        finally:
+            self._written({_normalize(table)})
+
+    update = delete = execute_rowcount
+    updatemany = executemany
+    insert = execute_lastrowid
+    insertmany = executemany
+
+    def _written(self, tables: AbstractSet[str]):
+        self.cache.invalidate(tables)
+        if self._in_transaction or not getattr(self._db, "autocommit", False):
+            self._dirty_tables.update(tables)
+
+    def _is_dirty(self, tables: AbstractSet[str]) -> bool:
+        dirty = self._dirty_tables
+        if not dirty:
+            return False
+        return ALL_TABLES in dirty or ALL_TABLES in tables or \
+            not dirty.isdisjoint(tables)
+
+    def _end_transaction(self):
+        if self._dirty_tables:
+            self.cache.invalidate(self._dirty_tables)
+        self._dirty_tables = set()
+        self._in_transaction = False
+
+
+@lru_cache(maxsize=1024)
+def read_tables(query: str, platform=None) -> FrozenSet[str]:
+    """Returns the tables named after FROM, JOIN and the commas of a FROM
+    list, or {ALL_TABLES} when there are none. It errs on the side of
+    naming too many tables, which only costs extra invalidations.
+    Results are memoized per query and platform."""
+    tables = set()
+    expect_table = False
+    in_from = False
+    last = None  # the table just read, replaced when followed by .name
+    for kind, text in _significant(query, platform):
+        word = text.upper() if kind == lexer.WORD else None
+        if expect_table:
+            expect_table = False
+            if kind in (lexer.WORD, lexer.QUOTED) and word not in (
+                    "SELECT", "LATERAL"):
+                last = _normalize(text)
+                tables.add(last)
+                continue
+        if text == "." and last is not None:
+            # schema.table, keep the table part
+            tables.discard(last)
+            expect_table = True
+        elif word in ("FROM", "JOIN"):
+            expect_table = in_from = True
+        elif in_from and text == ",":
+            expect_table = True
+        elif word in ("WHERE", "GROUP", "ORDER", "LIMIT", "HAVING",
+                      "UNION", "SELECT", "SET", "VALUES"):
+            in_from = False
+        last = None
+    return frozenset(tables or (ALL_TABLES,))
+
+
+@lru_cache(maxsize=1024)
+def write_tables(query: str, platform=None) -> FrozenSet[str]:
+    """Returns the table a write statement changes plus the tables it
+    reads, or {ALL_TABLES} when the target is not recognized. Results
+    are memoized per query and platform."""
+    tokens = _significant(query, platform)
+    if not tokens or tokens[0][1].upper() not in _WRITE_STATEMENTS:
+        return frozenset((ALL_TABLES,))
+    target = None
+    for i, (kind, text) in enumerate(tokens[1:], 1):
+        if kind == lexer.WORD and text.upper() in _WRITE_SKIP:
+            continue
+        if kind in (lexer.WORD, lexer.QUOTED):
+            target = text
+            if i + 2 < len(tokens) and tokens[i + 1][1] == ".":
+                target = tokens[i + 2][1]
+        break
+    if target is None:
+        return frozenset((ALL_TABLES,))
+    return read_tables(query, platform) - {ALL_TABLES} | {_normalize(target)}
+
+
+def _significant(query: str, platform=None) -> List:
+    return [(kind, text) for kind, text in lexer.tokenize(query, platform)
+            if kind not in (lexer.SPACE, lexer.COMMENT)]
+
+
+def _normalize(name: str) -> str:
+    name = name.rsplit(".", 1)[-1]
+    if name[:1] in ('"', "`"):
+        name = name[1:-1]
+    return name.lower()
+
+
+def _copy_rows(rows: List) -> List:
+    return [copy.copy(row) for row in rows]
+
+
+def _sizeof_rows(rows: List) -> int:
+    size = sys.getsizeof(rows)
+    for row in rows:
+        size += sys.getsizeof(row)
+        if isinstance(row, tuple):
+            values = row
+        elif hasattr(row, "values"):
+            values = row.values()
+        else:
+            values = getattr(row, "__dict__", {}).values()
+        for value in values:
+            size += sys.getsizeof(value)
+    return size
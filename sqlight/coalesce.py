@@ -0,0 +1,198 @@
+import queue
+import threading
+import time
+
+from concurrent.futures import Future
+from typing import List, NoReturn, Union
+
+import sqlight.err as err
+
+from sqlight.connection import Connection
+from sqlight.dburl import DBUrl
+
+
+class _Write:
+
+    __slots__ = ("method", "query", "parameters", "kwparameters", "future")
+
+    def __init__(self, method: str, query: str, parameters, kwparameters):
+        self.method = method
+        self.query = query
+        self.parameters = parameters
+        self.kwparameters = kwparameters
+        self.future = Future()
+
+
+class WriteCoalescer:
+    """Batches small writes from many threads into shared transactions.
+
+    insert/update/delete/execute_* queue the statement and return a
+    concurrent.futures.Future with its lastrowid or rowcount. A flusher
+    thread owns the connection and commits once per batch of up to
+    max_batch writes, or after max_delay seconds once the first write of
+    a batch arrived, so N writes cost one commit instead of N.
+
+    When a statement fails its future gets the exception, the transaction
+    is rolled back and the other writes of the batch are replayed in a
+    new one. Futures resolve only after their transaction committed, so
+    a result is never reported for a write that was rolled back. Works in
+    both autocommit and non-autocommit mode, begin() opens the batch
+    transaction in either.
+    """
+
+    def __init__(self,
+                 url: Union[str, DBUrl],
+                 max_batch: int = 100,
+                 max_delay: float = 0.01,
+                 max_pending: int = 10000):
+        if isinstance(url, DBUrl):
+            url = url.raw_url
+        self.url = url
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+
+        self.batches = 0  # transactions committed
+        self.replays = 0  # batches replayed after a failed statement
+
+        self._queue = queue.Queue(max_pending)
+        self._closed = False
+        # orders submissions before the close sentinel
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run,
+                                        name="sqlight-coalescer", daemon=True)
+        self._started = Future()
+        self._thread.start()
+        self._started.result()  # raises when the connection failed
+
+    def __enter__(self) -> 'WriteCoalescer':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def execute_lastrowid(self, query: str, *parameters,
+                          **kwparameters) -> Future:
+        """Queues the query, the future resolves with its lastrowid."""
+        return self._submit("execute_lastrowid", query, parameters,
+                            kwparameters)
+
+    def execute_rowcount(self, query: str, *parameters,
+                         **kwparameters) -> Future:
+        """Queues the query, the future resolves with its rowcount."""
+        return self._submit("execute_rowcount", query, parameters,
+                            kwparameters)
+
+    execute = insert = execute_lastrowid
+    update = delete = execute_rowcount
+
+    def flush(self, timeout: float = None) -> NoReturn:
+        """Waits until every write queued so far is committed or failed."""
+        self._submit(None, None, None, None).result(timeout)
+
+    def close(self) -> NoReturn:
+        """Commits the queued writes and closes the connection."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join()
+
+    def _submit(self, method, query, parameters, kwparameters) -> Future:
+        write = _Write(method, query, parameters, kwparameters)
+        with self._lock:
+            if self._closed:
+                raise err.InterfaceError("Write coalescer is closed.")
+            self._queue.put(write)
+        return write.future
+
+    def _run(self):
+        try:
+            conn = Connection.create_from_dburl(self.url)
+            conn.connect()
+        except BaseException as e:
+            self._started.set_exception(e)
+            return
+        self._started.set_result(None)
+
+        try:
+            stop = False
+            while not stop:
+                batch, stop = self._next_batch()
+                writes = [w for w in batch if w.method is not None]
+                if writes:
+                    self._flush(conn, writes)
+                for w in batch:
+                    if w.method is None:
+                        w.future.set_result(None)
+        finally:
+            conn.close()
+
+    def _next_batch(self):
+        """Blocks for a write, then collects more until the batch is full
+        or max_delay passed. Returns the batch and whether to stop."""
+        first = self._queue.get()
+        if first is None:
+            return [], True
+        batch = [first]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    write = self._queue.get(timeout=remaining)
+                else:
+                    write = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if write is None:
+                return batch, True
+            batch.append(write)
+        return batch, False
+
+    def _flush(self, conn: Connection, writes: List[_Write]):
+        while writes:
+            results = []
+            try:
+                conn.begin()
+            except Exception as e:
+                self._fail(writes, e)
+                return
+            failed = None
+            for w in writes:
+                try:
+                    results.append(getattr(conn, w.method)(
+                        w.query, *w.parameters, **w.kwparameters))
+                except Exception as e:
+                    failed = w
+                    failed.future.set_exception(e)
+                    break
+
+            if failed is not None:
+                self._rollback(conn)
+                writes = [w for w in writes if w is not failed]
+                self.replays += 1
+                continue
+
+            try:
+                conn.commit()
+            except Exception as e:
+                self._rollback(conn)
+                self._fail(writes, e)
+                return
+            self.batches += 1
+            for w, result in zip(writes, results):
+                w.future.set_result(result)
+            return
+
+    @staticmethod
+    def _rollback(conn: Connection):
+        try:
+            conn.rollback()
+        except err.Error:
+            pass
+
+    @staticmethod
+    def _fail(writes: List[_Write], exception: Exception):
+        for w in writes:
+            w.future.set_exception(exception)
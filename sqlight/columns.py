@@ -0,0 +1,101 @@
+from array import array
+from typing import Dict, List, Sequence
+
+_numpy = None  # imported on first use, False when not installed
+
+# ints above this lose precision once packed into doubles
+_MAX_EXACT_FLOAT_INT = 2 ** 53
+
+
+def build_columns(cursor, chunk_size: int = None) -> Dict[str, Sequence]:
+    """Reads the cursor into a column name to sequence mapping.
+
+    Integer columns are packed into array('q') and float columns into
+    array('d'), or into NumPy arrays sharing that memory when NumPy is
+    installed. Columns holding NULLs or other types stay lists. With
+    chunk_size the rows are fetched with fetchmany, so only one chunk of
+    row tuples is alive at a time.
+    """
+    column_names = [d[0] for d in cursor.description]
+    columns = [None] * len(column_names)
+
+    if chunk_size:
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            _extend_columns(columns, rows)
+    else:
+        rows = cursor.fetchall()
+        if rows:
+            _extend_columns(columns, rows)
+
+    return {name: _finish(column)
+            for name, column in zip(column_names, columns)}
+
+
+def _extend_columns(columns: List, rows: Sequence) -> None:
+    for i, values in enumerate(zip(*rows)):
+        column = columns[i]
+        if column is None:
+            column = columns[i] = _new_column(values)
+        if isinstance(column, array):
+            column = columns[i] = _extend_array(column, values)
+        else:
+            column.extend(values)
+
+
+def _new_column(values: Sequence):
+    first = values[0]
+    if type(first) is int:
+        return array("q")
+    elif type(first) is float:
+        return array("d")
+    return []
+
+
+def _extend_array(column: array, values: Sequence):
+    """Extends the typed column, widening int to double or falling back
+    to a list when a value does not fit."""
+    size = len(column)
+    try:
+        column.extend(values)
+        return column
+    except (TypeError, OverflowError):
+        del column[size:]
+
+    if column.typecode == "q" and \
+            all(type(v) in (int, float) for v in values) and \
+            all(abs(v) <= _MAX_EXACT_FLOAT_INT for v in column) and \
+            all(type(v) is float or abs(v) <= _MAX_EXACT_FLOAT_INT
+                for v in values):
+        widened = array("d", column)
+        widened.extend(values)
+        return widened
+
+    result = column.tolist()
+    result.extend(values)
+    return result
+
+
+def _finish(column):
+    if column is None:
+        return []
+    if not isinstance(column, array):
+        return column
+    numpy = _get_numpy()
+    if not numpy:
+        return column
+    dtype = numpy.int64 if column.typecode == "q" else numpy.float64
+    return numpy.frombuffer(column, dtype=dtype)
+
+
+def _get_numpy():
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy
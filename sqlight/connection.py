@@ -1,33 +1,52 @@
-from typing import NoReturn, Iterator, List, Dict
+from itertools import chain, islice
+from typing import Callable, NoReturn, Iterable, Iterator, List, Dict, \
+        Sequence
+
+import sqlight.inlist as inlist
 
 from sqlight.dburl import DBUrl
 from sqlight.err import ProgrammingError
+from sqlight.events import Listener
 from sqlight.platforms.factory import get_driver
 from sqlight.platforms.db import DB
-from sqlight.row import Row
+from sqlight.platforms.keywords import Platform
+from sqlight.row import Row, default_row_factory
 
 
 class Connection:
 
     @classmethod
-    def create_from_dburl(cls, url: str) -> 'Connection':
+    def create_from_dburl(cls, url: str, **kwargs) -> 'Connection':
         """
-        create connect from dburl
+        create connect from dburl, kwargs are passed to the constructor.
         """
         dburl = DBUrl.get_from_url(url)
         driver_cls = get_driver(dburl.driver)
         driver = driver_cls(**dburl.get_args())
-        c = cls(driver)
+        c = cls(driver, **kwargs)
         c.dburl = dburl
         return c
 
-    def __init__(self, driver: DB):
+    def __init__(self, driver: DB, row_factory: Callable = None):
+        """
+        row_factory is called with the column names of each result set and
+        returns the callable that builds a row from a driver tuple,
+        see sqlight.row. It can be overridden per call.
+        """
         self._db = driver
         self.dburl = None
+        self.row_factory = row_factory
 
     def __del__(self):
         self.close()
 
+    @property
+    def platform(self) -> Platform:
+        """The platform of dburl, else the one the driver speaks to."""
+        if self.dburl is not None and self.dburl.platform is not None:
+            return self.dburl.platform
+        return self._db.platform
+
     def connect(self) -> NoReturn:
         """
         connect to DB
@@ -53,20 +72,126 @@ class Connection:
         """
         self._db.rollback()
 
-    def iter(self, query: str, *parameters, **kwparameters) -> Iterator[Row]:
+    def iter(self, query: str, *parameters, row_factory: Callable = None,
+             **kwparameters) -> Iterator[Row]:
         """Returns an iterator for the given query and parameters."""
-        return self._db.iter(query, *parameters, **kwparameters)
+        if inlist.has_lists(parameters, kwparameters):
+            return self._in_lists("iter", query, parameters, kwparameters,
+                                  row_factory=row_factory or self.row_factory)
+        return self._db.iter(query, *parameters,
+                             row_factory=row_factory or self.row_factory,
+                             **kwparameters)
 
-    def query(self, query: str, *parameters, **kwparameters) -> List[Row]:
-        """Returns a row list for the given query and parameters."""
-        return self._db.query(query, *parameters, **kwparameters)
+    def iter_batches(self, query: str, *parameters, batch_size: int = None,
+                     row_factory: Callable = None,
+                     **kwparameters) -> Iterator[List[Row]]:
+        """Returns an iterator of row lists for the given query, fetched
+        batch_size rows at a time with the driver's streaming cursor."""
+        if inlist.has_lists(parameters, kwparameters):
+            return self._in_lists("iter_batches", query, parameters,
+                                  kwparameters, batch_size=batch_size,
+                                  row_factory=row_factory or self.row_factory)
+        return self._db.iter_batches(
+            query, *parameters, batch_size=batch_size,
+            row_factory=row_factory or self.row_factory, **kwparameters)
 
-    def get(self, query: str, *parameters, **kwparameters) -> Row:
+    def query(self, query: str, *parameters, row_factory: Callable = None,
+              **kwparameters) -> List[Row]:
+        """Returns a row list for the given query and parameters.
+        An InList parameter stands for a list of values, see sqlight.inlist.
+        """
+        if inlist.has_lists(parameters, kwparameters):
+            return self._in_lists("query", query, parameters, kwparameters,
+                                  row_factory=row_factory or self.row_factory)
+        return self._db.query(query, *parameters,
+                              row_factory=row_factory or self.row_factory,
+                              **kwparameters)
+
+    def query_columns(self, query: str, *parameters, chunk_size: int = None,
+                      **kwparameters) -> Dict[str, Sequence]:
+        """Returns a column name to values mapping for the given query.
+        Numeric columns are packed into array.array, or NumPy arrays when
+        NumPy is installed. chunk_size fetches the rows in chunks.
+        """
+        if inlist.has_lists(parameters, kwparameters):
+            return self._in_lists("query_columns", query, parameters,
+                                  kwparameters, chunk_size=chunk_size)
+        return self._db.query_columns(query, *parameters,
+                                      chunk_size=chunk_size, **kwparameters)
+
+    def get(self, query: str, *parameters, row_factory: Callable = None,
+            **kwparameters) -> Row:
         """Returns the (singular) row returned by the given query.
         If the query has no results, returns None.  If it has
         more than one result, raises an exception.
         """
-        return self._db.get(query, *parameters, **kwparameters)
+        if inlist.has_lists(parameters, kwparameters):
+            return self._in_lists("get", query, parameters, kwparameters,
+                                  row_factory=row_factory or self.row_factory)
+        return self._db.get(query, *parameters,
+                            row_factory=row_factory or self.row_factory,
+                            **kwparameters)
+
+    def paginate(self, query: str, key_columns: Sequence[str], *parameters,
+                 page_size: int = 100, descending: bool = False,
+                 row_factory: Callable = None,
+                 **kwparameters) -> Iterator[List[Row]]:
+        """Yields the rows of query page by page, ordered by key_columns.
+
+        Pages after the first seek past the last key read instead of using
+        OFFSET, so every page costs the same index lookup. key_columns must
+        be unique together and be result columns of query, query must not
+        have its own ORDER BY or LIMIT. The seek predicate uses row values
+        on PostgreSQL and SQLite and the equivalent OR expansion on MySQL.
+        """
+        # imported here to keep it out of import sqlight
+        import sqlight.dialects as dialects
+
+        if isinstance(key_columns, str):
+            key_columns = [key_columns]
+        platform = self.platform
+        named = bool(kwparameters)
+        first, _ = dialects.keyset_query(platform, query, key_columns,
+                                         page_size, descending)
+        after, order = dialects.keyset_query(platform, query, key_columns,
+                                             page_size, descending,
+                                             after=True, named=named)
+        factory = row_factory or self.row_factory or default_row_factory
+        positions = []
+        last = [None]
+
+        def keyed(column_names: List[str]) -> Callable:
+            # remembers the driver tuple of the last row for its key
+            if not positions:
+                for column in key_columns:
+                    name = dialects.column_name(column)
+                    if name not in column_names:
+                        raise ProgrammingError(
+                            "Key column [{}] is not in the result.".format(
+                                column))
+                    positions.append(column_names.index(name))
+            build = factory(column_names)
+
+            def row(values):
+                last[0] = values
+                return build(values)
+            return row
+
+        page = self._db.query(first, *parameters, row_factory=keyed,
+                              **kwparameters)
+        while page:
+            yield page
+            if len(page) < page_size:
+                return
+            key = [last[0][i] for i in positions]
+            if named:
+                keys = {"_key{}".format(i): v for i, v in enumerate(key)}
+                page = self._db.query(after, *parameters, row_factory=keyed,
+                                      **kwparameters, **keys)
+            else:
+                page = self._db.query(after, *parameters,
+                                      *[key[i] for i in order],
+                                      row_factory=keyed)
 
     def execute(self, query: str, *parameters, **kwparameters) -> NoReturn:
         """Executes the given query."""
@@ -75,10 +200,16 @@ class Connection:
     def execute_lastrowid(self, query: str, *parameters,
                           **kwparameters) -> int:
         """Executes the given query, returning the lastrowid from the query."""
+        if inlist.has_lists(parameters, kwparameters):
+            return self._in_lists("execute_lastrowid", query, parameters,
+                                  kwparameters)
         return self._db.execute_lastrowid(query, *parameters, **kwparameters)
 
     def execute_rowcount(self, query: str, *parameters, **kwparameters) -> int:
         """Executes the given query, returning the rowcount from the query."""
+        if inlist.has_lists(parameters, kwparameters):
+            return self._in_lists("execute_rowcount", query, parameters,
+                                  kwparameters)
         return self._db.execute_rowcount(query, *parameters, **kwparameters)
 
     def executemany(self, query: str, parameters: Iterator[Dict]) -> int:
@@ -91,6 +222,134 @@ class Connection:
             raise ProgrammingError("Parameters are not allowed to be empty.")
         return self._db.executemany_rowcount(query, parameters)
 
+    def copy_from(self, table: str, rows: Iterator,
+                  columns: List[str] = None) -> int:
+        """Bulk loads rows, sequences in column order, into table and
+        returns the number of rows loaded. rows is consumed lazily, so it
+        can be a generator of any size. PostgreSQL streams it through
+        COPY ... FROM STDIN, other drivers insert it in batches.
+        """
+        return self._db.copy_from(table, rows, columns)
+
+    def executemany_stream(self, query: str, parameters: Iterable,
+                           chunk_size: int = 1000, commit_every: int = None,
+                           progress: Callable[[int, int], None] = None
+                           ) -> int:
+        """Executes the given query against every param sequence of any
+        iterable, chunk_size at a time, so generators of any size run in
+        bounded memory. Empty input is allowed.
+        commit_every commits after every N chunks and once at the end.
+        progress is called after each chunk with the number of parameter
+        sets sent so far and the total rowcount.
+        We return the total rowcount.
+        """
+        total = 0
+        sent = 0
+        chunks = 0
+        parameters = iter(parameters)
+        while True:
+            chunk = list(islice(parameters, chunk_size))
+            if not chunk:
+                break
+            rowcount = self._db.executemany_rowcount(query, chunk)
+            if rowcount > 0:
+                total += rowcount
+            sent += len(chunk)
+            chunks += 1
+            if commit_every and chunks % commit_every == 0:
+                self.commit()
+            if progress is not None:
+                progress(sent, total)
+        if commit_every and chunks % commit_every:
+            self.commit()
+        return total
+
+    def upsertmany(self, table: str, rows: Iterable[Dict],
+                   conflict_keys: Sequence[str],
+                   update_columns: Sequence[str] = None,
+                   batch_size: int = 1000) -> int:
+        """Inserts rows, mappings of column name to value, into table and
+        updates the rows whose conflict_keys (a unique index) already
+        exist, in one round trip per multi-row statement.
+        update_columns defaults to every column of the first row but the
+        conflict keys, empty leaves existing rows alone. Statements hold
+        at most batch_size rows and stay within the driver's parameter
+        limit and MySQL's max_allowed_packet.
+        Rows repeating the conflict keys of an earlier row in the same
+        statement replace it. We return the total rowcount, which on
+        MySQL counts an updated row twice.
+        """
+        import sqlight.dialects as dialects
+
+        if isinstance(conflict_keys, str):
+            conflict_keys = [conflict_keys]
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            return 0
+        columns = list(first.keys())
+        missing = [c for c in conflict_keys if c not in columns]
+        if missing:
+            raise ProgrammingError(
+                "Conflict keys {} not in the rows to upsert.".format(
+                    ", ".join(missing)))
+        if update_columns is None:
+            update_columns = [c for c in columns if c not in conflict_keys]
+        platform = self.platform
+
+        per_statement = batch_size
+        if self._db.max_parameters:
+            per_statement = min(per_statement,
+                                self._db.max_parameters // len(columns))
+        budget = self._statement_bytes(platform)
+        if budget is not None:
+            # the statement text besides the values
+            budget -= len(dialects.upsert_query(
+                platform, table, columns, conflict_keys, update_columns, 1))
+
+        # a statement may touch a row once on PostgreSQL, so rows are
+        # deduplicated by conflict key within a page, the last one wins
+        keys = [columns.index(c) for c in conflict_keys]
+        total = 0
+        page = {}
+        size = 0
+        for row in chain([first], rows):
+            try:
+                values = [row[c] for c in columns]
+            except KeyError as e:
+                raise ProgrammingError(
+                    "Row without column {} to upsert.".format(e))
+            row_size = _literal_size(values) if budget is not None else 0
+            key = tuple(values[i] for i in keys)
+            if key in page:
+                size -= page.pop(key)[1]
+            full = len(page) >= per_statement or (
+                budget is not None and size + row_size > budget)
+            if page and full:
+                total += self._upsert(platform, table, columns,
+                                      conflict_keys, update_columns,
+                                      [v for v, _ in page.values()])
+                page = {}
+                size = 0
+            page[key] = (values, row_size)
+            size += row_size
+        return total + self._upsert(platform, table, columns, conflict_keys,
+                                    update_columns,
+                                    [v for v, _ in page.values()])
+
+    def get_settings(self) -> Dict[str, object]:
+        """Returns the driver's effective settings, for SQLite the profile
+        and pragma values."""
+        return self._db.get_settings()
+
+    def add_listener(self, listener: Listener) -> NoReturn:
+        """Calls listener's before_execute/after_execute/on_error hooks
+        for every statement, see sqlight.events."""
+        self._db.add_listener(listener)
+
+    def remove_listener(self, listener: Listener) -> NoReturn:
+        self._db.remove_listener(listener)
+
     def close(self):
         """Closes connection."""
         self._db.close()
@@ -99,7 +358,48 @@ class Connection:
         """Get last executed."""
         return self._db.get_last_executed()
 
+    def _upsert(self, platform: Platform, table: str, columns, conflict_keys,
+                update_columns, page: List[List]) -> int:
+        import sqlight.dialects as dialects
+
+        query = dialects.upsert_query(platform, table, columns, conflict_keys,
+                                      update_columns, len(page))
+        # through self, so subclasses see the write
+        rowcount = self.execute_rowcount(
+            query, *[value for values in page for value in values])
+        return max(rowcount, 0)
+
+    def _statement_bytes(self, platform: Platform) -> int:
+        """The statement size limit of the server, asked once per driver
+        on MySQL. PostgreSQL and SQLite have none worth paging for."""
+        db = self._db
+        if db.max_statement_bytes is None and platform in (
+                Platform.MySQL, Platform.MariaDB):
+            db.max_statement_bytes = db.get(
+                "SELECT @@max_allowed_packet AS n")["n"]
+        return db.max_statement_bytes
+
+    def _in_lists(self, method: str, query: str, parameters, kwparameters,
+                  **options):
+        import sqlight.expansion as expansion
+
+        return expansion.run(self._db, self.platform, method, query,
+                             parameters, kwparameters, options)
+
     update = delete = execute_rowcount
     updatemany = executemany
     insert = execute_lastrowid
     insertmany = executemany
+
+
+def _literal_size(values: List) -> int:
+    """An upper bound of the bytes values take as escaped SQL literals."""
+    size = 2  # the parentheses, + 4 per value covers quotes and ", "
+    for value in values:
+        if isinstance(value, str):
+            size += len(value.encode("utf-8")) * 2 + 4
+        elif isinstance(value, (bytes, bytearray)):
+            size += len(value) * 2 + 4
+        else:
+            size += len(str(value)) + 4
+    return size
@@ -1,6 +1,7 @@
 from urllib.parse import urlparse, parse_qs
 from typing import List, Dict
 
+from sqlight.err import NotSupportedError
 from sqlight.platforms import Platform, Driver
 
 
@@ -31,7 +32,8 @@ class DBUrl(object):
         self.parse_query(url_info.query)
 
     def parse_path(self, path: str):
-        self.database = path.lstrip("/")
+        # only the separator slash, so sqlite:////tmp/foo.db is absolute
+        self.database = path[1:] if path.startswith("/") else path
 
     def parse_query(self, query: str):
         if not query:
@@ -44,12 +46,18 @@ class DBUrl(object):
 
     def parse_scheme(self, scheme: str):
         scheme_info = scheme.split("+")
-        self.platform = Platform.get_platform(scheme_info[0])
         driver = None
         if len(scheme_info) > 1:
             driver = scheme_info[1]
-
-        self.driver = Driver.get_driver(self.platform, driver)
+        try:
+            self.platform = Platform.get_platform(scheme_info[0])
+            self.driver = Driver.get_driver(self.platform, driver)
+        except NotSupportedError:
+            # a driver registered for the scheme, see factory.register_driver
+            from sqlight.platforms.factory import has_driver
+            if not has_driver(scheme):
+                raise
+            self.driver = scheme.lower()
 
     def args_type_conver(self, values: List[str]) -> object:
         value = values[0]
@@ -60,7 +68,7 @@ class DBUrl(object):
         return value
 
     def get_args(self) -> Dict:
-        if self.driver is Driver.SQLITE:
+        if self.driver in (Driver.SQLITE, Driver.SQLITE_THREADED):
             return self._get_sqlite_args()
         elif self.driver is Driver.PYMYSQL:
             return self._get_pymysql_args()
@@ -68,6 +76,7 @@ class DBUrl(object):
             return self._get_mysqlclient_args()
         elif self.driver is Driver.PSYCOPG:
             return self._get_psycopg_args()
+        return self._get_default_args()
 
     def _get_sqlite_args(self):
         args = dict()
@@ -109,6 +118,18 @@ class DBUrl(object):
             args.update(self.args)
         return args
 
+    def _get_default_args(self):
+        # registered drivers get the DB-API connect() keywords
+        args = dict()
+        args["host"] = self.hostname
+        args["port"] = self.port
+        args["user"] = self.username
+        args["password"] = self.password
+        args["database"] = self.database
+        if self.args is not None:
+            args.update(self.args)
+        return args
+
     @staticmethod
     def string2bool(v: str) -> bool:
         if v == "False":
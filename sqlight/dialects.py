@@ -0,0 +1,200 @@
+"""SQL that differs between platforms, built with sqlight's %s and
+%(name)s placeholders."""
+from typing import List, Sequence, Tuple
+
+import datetime
+import decimal
+
+import sqlight.err as err
+import sqlight.lexer as lexer
+
+from sqlight.platforms.keywords import Platform
+
+# words ending the WHERE clause of a simple SELECT
+_AFTER_WHERE = {"GROUP", "HAVING", "ORDER", "LIMIT", "OFFSET", "UNION",
+                "INTERSECT", "EXCEPT", "WINDOW", "FETCH", "FOR"}
+
+
+def supports_row_values(platform: Platform) -> bool:
+    """Whether (a, b) > (x, y) compares rows and can use an index.
+    MySQL parses it but does not turn it into an index range, so it gets
+    the expanded OR form. SQLite has row values since 3.15."""
+    if platform is Platform.PostgreSQL:
+        return True
+    if platform is Platform.SQLite:
+        import sqlite3
+        return sqlite3.sqlite_version_info >= (3, 15, 0)
+    return False
+
+
+def keyset_predicate(platform: Platform, columns: Sequence[str],
+                     descending: bool = False,
+                     named: bool = False) -> Tuple[str, List[int]]:
+    """Returns the condition selecting rows after a key, and for each of
+    its placeholders the index of the key value it takes. With named the
+    placeholders are %(_key0)s, %(_key1)s..."""
+    op = "<" if descending else ">"
+
+    def mark(i):
+        return "%(_key{})s".format(i) if named else "%s"
+
+    if len(columns) == 1:
+        return "{} {} {}".format(columns[0], op, mark(0)), [0]
+    if supports_row_values(platform):
+        return "({}) {} ({})".format(
+            ", ".join(columns), op,
+            ", ".join(mark(i) for i in range(len(columns)))), \
+            list(range(len(columns)))
+
+    # (a > x) OR (a = x AND b > y) OR ...
+    terms = []
+    order = []
+    for i, column in enumerate(columns):
+        parts = []
+        for j in range(i):
+            parts.append("{} = {}".format(columns[j], mark(j)))
+            order.append(j)
+        parts.append("{} {} {}".format(column, op, mark(i)))
+        order.append(i)
+        terms.append("(" + " AND ".join(parts) + ")")
+    return "(" + " OR ".join(terms) + ")", order
+
+
+def order_by(columns: Sequence[str], descending: bool = False) -> str:
+    direction = " DESC" if descending else ""
+    return ", ".join(column + direction for column in columns)
+
+
+def column_name(column: str) -> str:
+    """The name a result column gets for column, without table qualifier
+    and quotes."""
+    name = column.rsplit(".", 1)[-1]
+    if name[:1] in "\"`[" and len(name) > 1:
+        name = name[1:-1]
+    return name
+
+
+def _where_position(query: str, platform: Platform):
+    """Returns the tokens of query and the index of its top level WHERE,
+    or None for the tokens when query has more than a WHERE to filter,
+    GROUP BY, ORDER BY, LIMIT or a set operation."""
+    tokens = list(lexer.tokenize(query, platform))
+    depth = 0
+    where = None
+    for i, (kind, text) in enumerate(tokens):
+        if text == "(":
+            depth += 1
+        elif text == ")":
+            depth -= 1
+        elif depth == 0 and kind == lexer.WORD:
+            word = text.upper()
+            if word in _AFTER_WHERE:
+                return None, None
+            if word == "WHERE":
+                where = i
+    return tokens, where
+
+
+def keyset_query(platform: Platform, query: str, columns: Sequence[str],
+                 page_size: int, descending: bool = False,
+                 after: bool = False,
+                 named: bool = False) -> Tuple[str, List[int]]:
+    """Returns the query of a page of query, ordered by the key columns,
+    and for each placeholder it adds the index of the key value it takes.
+
+    With after set the page starts after a key, the condition is ANDed to
+    the WHERE of a simple SELECT, queries with GROUP BY, ORDER BY, LIMIT
+    or set operations are wrapped into a subquery, so columns must then
+    be result column names. The added placeholders come after those of
+    query, %(_key0)s, %(_key1)s... with named.
+    """
+    if page_size < 1:
+        raise err.ProgrammingError("page_size must be at least 1.")
+    query = query.strip().rstrip(";").rstrip()
+    tokens, where = _where_position(query, platform)
+    if tokens is None:
+        query = "SELECT * FROM ({}) AS _sqlight_page".format(query)
+        columns = [column_name(c) for c in columns]
+        where = None
+
+    order = []
+    if after:
+        condition, order = keyset_predicate(platform, columns, descending,
+                                            named)
+        if where is None:
+            query = "{} WHERE {}".format(query, condition)
+        else:
+            query = "{} ({}) AND {}".format(
+                "".join(text for _, text in tokens[:where + 1]),
+                "".join(text for _, text in tokens[where + 1:]).strip(),
+                condition)
+    return "{} ORDER BY {} LIMIT {}".format(
+        query, order_by(columns, descending), int(page_size)), order
+
+
+def empty_set(platform: Platform) -> str:
+    """A subquery without rows, what IN () would mean."""
+    if platform in (Platform.MySQL, Platform.MariaDB):
+        return "SELECT 1 FROM DUAL WHERE 1 = 0"
+    return "SELECT 1 WHERE 1 = 0"
+
+
+def column_type(platform: Platform, values: Sequence) -> str:
+    """The column type to store values in, by the type of the first one
+    that is not None, text for unknown types."""
+    value = next((v for v in values if v is not None), None)
+    mysql = platform in (Platform.MySQL, Platform.MariaDB)
+    if isinstance(value, int):
+        return "BIGINT"
+    if isinstance(value, float):
+        return "DOUBLE" if mysql else "DOUBLE PRECISION"
+    if isinstance(value, decimal.Decimal):
+        return "DECIMAL(65, 30)" if mysql else "NUMERIC"
+    if isinstance(value, datetime.datetime):
+        return "DATETIME(6)" if mysql else "TIMESTAMP"
+    if isinstance(value, datetime.date):
+        return "DATE"
+    if isinstance(value, (bytes, bytearray)):
+        if platform is Platform.PostgreSQL:
+            return "BYTEA"
+        return "LONGBLOB" if mysql else "BLOB"
+    return "LONGTEXT" if mysql else "TEXT"
+
+
+def create_temp_table(platform: Platform, table: str, sql_type: str) -> str:
+    """A session temporary table of one column v."""
+    if platform in (Platform.MySQL, Platform.MariaDB):
+        return "CREATE TEMPORARY TABLE {} (v {})".format(table, sql_type)
+    return "CREATE TEMP TABLE {} (v {})".format(table, sql_type)
+
+
+def drop_temp_table(platform: Platform, table: str) -> str:
+    # a plain DROP TABLE would commit the transaction on MySQL
+    if platform in (Platform.MySQL, Platform.MariaDB):
+        return "DROP TEMPORARY TABLE {}".format(table)
+    return "DROP TABLE {}".format(table)
+
+
+def upsert_query(platform: Platform, table: str, columns: Sequence[str],
+                 conflict_keys: Sequence[str], update_columns: Sequence[str],
+                 rows: int) -> str:
+    """A multi-row INSERT of rows rows that updates update_columns of the
+    rows already there, ON CONFLICT on PostgreSQL and SQLite (3.24+),
+    ON DUPLICATE KEY on MySQL. Without update_columns existing rows are
+    left as they are."""
+    values = ", ".join(["(" + ", ".join(["%s"] * len(columns)) + ")"] * rows)
+    query = "INSERT INTO {} ({}) VALUES {}".format(
+        table, ", ".join(columns), values)
+
+    if platform in (Platform.MySQL, Platform.MariaDB):
+        # VALUES() is what both MySQL and MariaDB understand
+        sets = ["{0} = VALUES({0})".format(c) for c in update_columns]
+        if not sets:
+            sets = ["{0} = {0}".format(conflict_keys[0])]
+        return query + " ON DUPLICATE KEY UPDATE " + ", ".join(sets)
+
+    query += " ON CONFLICT ({})".format(", ".join(conflict_keys))
+    if not update_columns:
+        return query + " DO NOTHING"
+    return query + " DO UPDATE SET " + ", ".join(
+        "{0} = excluded.{0}".format(c) for c in update_columns)
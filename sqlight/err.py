@@ -61,3 +61,8 @@ class NotSupportedError(DatabaseError):
     which is not supported by the database, e.g. requesting a
     .rollback() on a connection that does not support transaction or
     has transactions turned off."""
+
+
+class PoolTimeoutError(OperationalError):
+    """Exception raised when no pooled connection became available
+    within the checkout timeout."""
@@ -0,0 +1,172 @@
+import threading
+
+from functools import wraps
+from time import perf_counter
+from typing import Callable, Iterator
+
+# keyword-only options of the DB methods, never SQL parameters
+_OPTIONS = ("row_factory", "batch_size", "chunk_size")
+
+# DB methods reporting events, and how each counts its rows
+HOOKED_METHODS = {
+    "query": len,
+    "get": lambda row: 0 if row is None else 1,
+    "query_columns": lambda columns: len(next(iter(columns.values()), ())),
+    "execute_lastrowid": None,  # the driver's last_rowcount
+    "execute_rowcount": lambda rowcount: rowcount,
+    "executemany_rowcount": lambda rowcount: rowcount,
+}
+HOOKED_ITERATORS = {
+    "iter": lambda row: 1,
+    "iter_batches": len,
+}
+
+
+class ExecuteEvent:
+    """One statement run through a DB method.
+
+    duration (seconds spent in the driver) and rowcount are None until
+    the statement finished, exception is set when it failed. For iter and
+    iter_batches the event ends when the iterator is exhausted or closed.
+    parameters of executemany_rowcount is the iterable as passed, which
+    may be a generator the listener must not consume.
+    """
+
+    __slots__ = ("sql", "parameters", "method", "duration", "rowcount",
+                 "exception")
+
+    def __init__(self, sql: str, parameters, method: str):
+        self.sql = sql
+        self.parameters = parameters
+        self.method = method
+        self.duration = None
+        self.rowcount = None
+        self.exception = None
+
+    def __repr__(self) -> str:
+        return "ExecuteEvent({}, sql={!r}, duration={}, rowcount={})".format(
+            self.method, self.sql, self.duration, self.rowcount)
+
+
+class Listener:
+    """Base class of execution listeners, override the hooks needed.
+
+    after_execute runs when the statement succeeded, on_error when it
+    raised, with event.exception set. Hooks run on the thread executing
+    the statement and add to its latency, so they should be quick.
+    """
+
+    def before_execute(self, event: ExecuteEvent):
+        pass
+
+    def after_execute(self, event: ExecuteEvent):
+        pass
+
+    def on_error(self, event: ExecuteEvent):
+        pass
+
+
+def install_hooks(db):
+    """Shadows db's hooked methods with instance attributes that report
+    to db's listeners. Without listeners the class methods run as is."""
+    state = threading.local()
+    for name, count in HOOKED_METHODS.items():
+        setattr(db, name, _hook(db, state, name, getattr(db, name), count))
+    for name, count in HOOKED_ITERATORS.items():
+        setattr(db, name,
+                _hook_iterator(db, state, name, getattr(db, name), count))
+
+
+def uninstall_hooks(db):
+    for name in list(HOOKED_METHODS) + list(HOOKED_ITERATORS):
+        db.__dict__.pop(name, None)
+
+
+def _event(query: str, parameters, kwparameters, method: str) -> ExecuteEvent:
+    if kwparameters:
+        kwparameters = {k: v for k, v in kwparameters.items()
+                        if k not in _OPTIONS}
+    return ExecuteEvent(query, kwparameters or parameters, method)
+
+
+def _finish(db, event: ExecuteEvent, exception: Exception):
+    if exception is None:
+        for listener in db._listeners:
+            listener.after_execute(event)
+    else:
+        event.exception = exception
+        for listener in db._listeners:
+            listener.on_error(event)
+
+
+def _hook(db, state, name: str, func: Callable, count: Callable) -> Callable:
+    @wraps(func)
+    def hooked(query, *parameters, **kwparameters):
+        # statements run by another hooked method, like get calling
+        # query, are reported once by the outer method
+        if getattr(state, "depth", 0):
+            return func(query, *parameters, **kwparameters)
+        if name == "executemany_rowcount":
+            event = ExecuteEvent(query, parameters[0], name)
+        else:
+            event = _event(query, parameters, kwparameters, name)
+        for listener in db._listeners:
+            listener.before_execute(event)
+
+        state.depth = 1
+        start = perf_counter()
+        try:
+            result = func(query, *parameters, **kwparameters)
+        except Exception as e:
+            event.duration = perf_counter() - start
+            state.depth = 0
+            _finish(db, event, e)
+            raise
+        event.duration = perf_counter() - start
+        state.depth = 0
+        event.rowcount = db.last_rowcount if count is None else count(result)
+        _finish(db, event, None)
+        return result
+    return hooked
+
+
+def _hook_iterator(db, state, name: str, func: Callable,
+                   count: Callable) -> Callable:
+    @wraps(func)
+    def hooked(query, *parameters, **kwparameters):
+        if getattr(state, "depth", 0):
+            return func(query, *parameters, **kwparameters)
+        event = _event(query, parameters, kwparameters, name)
+        return _iterate(db, state, event,
+                        func(query, *parameters, **kwparameters), count)
+    return hooked
+
+
+def _iterate(db, state, event: ExecuteEvent, items: Iterator,
+             count: Callable) -> Iterator:
+    for listener in db._listeners:
+        listener.before_execute(event)
+    duration = 0.0
+    rowcount = 0
+    exception = None
+    try:
+        while True:
+            state.depth = 1
+            start = perf_counter()
+            try:
+                item = next(items)
+            except StopIteration:
+                break
+            finally:
+                duration += perf_counter() - start
+                state.depth = 0
+            rowcount += count(item)
+            yield item
+    except Exception as e:
+        exception = e
+        raise
+    finally:
+        items.close()
+        event.duration = duration
+        event.rowcount = rowcount
+        _finish(db, event, exception)
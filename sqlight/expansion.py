@@ -0,0 +1,270 @@
+"""Runs statements with InList parameters: expanded into placeholders,
+once per chunk of values, or joined with a temporary table."""
+import itertools
+
+from typing import Dict, Iterator, List
+
+import sqlight.dialects as dialects
+import sqlight.err as err
+import sqlight.lexer as lexer
+
+from sqlight.inlist import InList
+from sqlight.platforms.db import DB
+from sqlight.platforms.keywords import Platform
+
+# methods whose results can be put together from one call per chunk
+_CHUNKED = {"query", "iter", "iter_batches", "get", "execute_lastrowid",
+            "execute_rowcount"}
+# top level words after which the chunks' results do not add up
+_NOT_CHUNKED = {"GROUP", "HAVING", "ORDER", "LIMIT", "OFFSET", "UNION",
+                "INTERSECT", "EXCEPT", "DISTINCT", "FETCH", "WINDOW", "OR"}
+_AGGREGATES = {"COUNT", "SUM", "AVG", "MIN", "MAX", "TOTAL", "GROUP_CONCAT",
+               "STRING_AGG", "ARRAY_AGG", "JSON_AGG", "JSON_ARRAYAGG",
+               "BIT_AND", "BIT_OR", "BOOL_AND", "BOOL_OR", "EVERY"}
+
+_names = itertools.count()
+
+
+class _Slot:
+    """An InList placeholder of the statement."""
+
+    def __init__(self, index: int, in_list: InList, wrapped: bool):
+        self.index = index  # of the placeholder token
+        self.in_list = in_list
+        self.wrapped = wrapped  # written as IN (%s)
+        self.sql = None  # replacement text, when not the values
+
+
+def run(db: DB, platform: Platform, method: str, query: str, parameters,
+        kwparameters: Dict, options: Dict):
+    """Runs db.method for query with its InList parameters expanded,
+    chunked or joined as a temporary table. options are passed on to the
+    method (row_factory, batch_size...)."""
+    tokens = list(lexer.tokenize(query, platform))
+    slots = _slots(tokens, parameters, kwparameters)
+    others = len(parameters) + len(kwparameters) - len(slots)
+
+    large = []
+    inlined = others
+    for slot in sorted(slots, key=lambda s: len(s.in_list)):
+        n = len(slot.in_list)
+        if n > slot.in_list.expand_limit or (
+                db.max_parameters and inlined + n > db.max_parameters):
+            large.append(slot)
+        else:
+            inlined += n
+    for slot in slots:
+        if not slot.in_list.values:
+            slot.sql = dialects.empty_set(platform)
+
+    if not large:
+        return _call(db, method, tokens, parameters, kwparameters, slots,
+                     options)
+
+    chunked = len(large) == 1 and _chunkable(method, tokens, large[0])
+    if db.temp_tables and (not chunked or len(large[0].in_list) >=
+                           large[0].in_list.temp_table_limit):
+        return _with_temp_tables(db, platform, method, tokens, parameters,
+                                 kwparameters, slots, large, options)
+    if not chunked:
+        raise err.ProgrammingError(
+            "InList too large to expand and the driver has no temporary "
+            "tables for it.")
+
+    slot = large[0]
+    size = slot.in_list.expand_limit
+    if db.max_parameters:
+        size = min(size, db.max_parameters - inlined)
+    if size < 1:
+        raise err.ProgrammingError("Too many parameters for the driver.")
+    return _chunked(db, method, tokens, parameters, kwparameters, slots,
+                    slot, size, options)
+
+
+def _slots(tokens: List, parameters, kwparameters: Dict) -> List[_Slot]:
+    slots = []
+    position = 0
+    for i, (kind, text) in enumerate(tokens):
+        if kind != lexer.PLACEHOLDER:
+            continue
+        name = lexer.placeholder_name(text)
+        if name is None:
+            value = parameters[position] if position < len(parameters) \
+                else None
+            position += 1
+        else:
+            value = kwparameters.get(name)
+        if isinstance(value, InList):
+            slots.append(_Slot(i, value, _wrapped(tokens, i)))
+    return slots
+
+
+def _neighbour(tokens: List, i: int, step: int) -> int:
+    i += step
+    while 0 <= i < len(tokens) and tokens[i][0] in (lexer.SPACE,
+                                                    lexer.COMMENT):
+        i += step
+    return i
+
+
+def _wrapped(tokens: List, i: int) -> bool:
+    before, after = _neighbour(tokens, i, -1), _neighbour(tokens, i, 1)
+    return before >= 0 and after < len(tokens) and \
+        tokens[before][1] == "(" and tokens[after][1] == ")"
+
+
+def _chunkable(method: str, tokens: List, slot: _Slot) -> bool:
+    """Whether running the statement once per chunk of the slot's values
+    gives the rows of the whole list: the IN must be a top level AND term
+    of the WHERE, and no grouping, ordering or limit may span chunks."""
+    if method not in _CHUNKED:
+        return False
+    depth = 0
+    where = False
+    for i, (kind, text) in enumerate(tokens):
+        if i == slot.index:
+            if depth > (1 if slot.wrapped else 0) or not where:
+                return False
+            continue
+        if text == "(":
+            depth += 1
+        elif text == ")":
+            depth -= 1
+        elif kind == lexer.WORD and depth == 0:
+            word = text.upper()
+            if word in _NOT_CHUNKED:
+                return False
+            if word == "WHERE":
+                where = True
+            elif word in _AGGREGATES:
+                after = _neighbour(tokens, i, 1)
+                if after < len(tokens) and tokens[after][1] == "(":
+                    return False
+
+    before = _neighbour(tokens, slot.index, -1)
+    if slot.wrapped:
+        before = _neighbour(tokens, before, -1)
+    before = _neighbour(tokens, before, -1)  # the word before IN
+    return before < 0 or tokens[before][1].upper() != "NOT"
+
+
+def _render(tokens: List, parameters, kwparameters: Dict, slots: List[_Slot],
+            chunk: Dict[int, List] = None):
+    """Returns the query and parameters with every slot replaced by its
+    sql, or by one placeholder per value (of chunk for the chunked slot).
+    """
+    by_index = {slot.index: slot for slot in slots}
+    chunk = chunk or {}
+    parts = []
+    positional = []
+    named = dict(kwparameters)
+    position = 0
+    for i, (kind, text) in enumerate(tokens):
+        if kind != lexer.PLACEHOLDER:
+            parts.append(text)
+            continue
+        name = lexer.placeholder_name(text)
+        slot = by_index.get(i)
+        if slot is None:
+            parts.append(text)
+            if name is None:
+                positional.append(parameters[position])
+        else:
+            values = chunk.get(i, slot.in_list.values)
+            if slot.sql is not None:
+                sql = slot.sql
+            elif name is None:
+                sql = ", ".join(["%s"] * len(values))
+                positional.extend(values)
+            else:
+                del named[name]
+                marks = []
+                for n, value in enumerate(values):
+                    key = "{}__{}".format(name, n)
+                    named[key] = value
+                    marks.append("%({})s".format(key))
+                sql = ", ".join(marks)
+            parts.append(sql if slot.wrapped else "(" + sql + ")")
+        if name is None:
+            position += 1
+    return "".join(parts), positional, named
+
+
+def _call(db: DB, method: str, tokens, parameters, kwparameters, slots,
+          options, chunk=None):
+    query, positional, named = _render(tokens, parameters, kwparameters,
+                                       slots, chunk)
+    return getattr(db, method)(query, *positional, **options, **named)
+
+
+def _chunked(db: DB, method: str, tokens, parameters, kwparameters, slots,
+             slot: _Slot, size: int, options: Dict):
+    values = slot.in_list.values
+    chunks = [{slot.index: values[i:i + size]}
+              for i in range(0, len(values), size)]
+
+    def each():
+        for chunk in chunks:
+            yield _call(db, method, tokens, parameters, kwparameters, slots,
+                        options, chunk)
+
+    if method in ("iter", "iter_batches"):
+        return (item for result in each() for item in result)
+    if method == "query":
+        return [row for rows in each() for row in rows]
+    if method == "get":
+        rows = [row for row in each() if row is not None]
+        if len(rows) > 1:
+            raise err.ProgrammingError(
+                "Multiple rows returned for Database.get() query")
+        return rows[0] if rows else None
+    if method == "execute_rowcount":
+        return sum(max(count, 0) for count in each())
+    lastrowid = None  # execute_lastrowid
+    rowcount = 0
+    for result in each():
+        lastrowid = result or lastrowid
+        rowcount += max(db.last_rowcount, 0)
+    db.last_rowcount = rowcount
+    return lastrowid
+
+
+def _with_temp_tables(db: DB, platform: Platform, method: str, tokens,
+                      parameters, kwparameters, slots, large, options):
+    tables = []
+    try:
+        for slot in large:
+            name = "_sqlight_in_{}".format(next(_names))
+            db.execute_rowcount(dialects.create_temp_table(
+                platform, name, slot.in_list.sql_type or
+                dialects.column_type(platform, slot.in_list.values)))
+            tables.append(name)
+            db.copy_from(name, ((v,) for v in slot.in_list.values), ["v"])
+            slot.sql = "SELECT v FROM {}".format(name)
+        if method in ("iter", "iter_batches"):
+            rows = _call(db, method, tokens, parameters, kwparameters, slots,
+                         options)
+            dropping, tables = tables, []
+            return _drop_after(db, platform, rows, dropping)
+        return _call(db, method, tokens, parameters, kwparameters, slots,
+                     options)
+    finally:
+        _drop(db, platform, tables)
+
+
+def _drop_after(db: DB, platform: Platform, rows: Iterator,
+                tables: List[str]) -> Iterator:
+    try:
+        yield from rows
+    finally:
+        _drop(db, platform, tables)
+
+
+def _drop(db: DB, platform: Platform, tables: List[str]):
+    for name in tables:
+        try:
+            db.execute_rowcount(dialects.drop_temp_table(platform, name))
+        except err.Error:
+            # a failed PostgreSQL transaction refuses it, the table goes
+            # with the session
+            pass
@@ -0,0 +1,54 @@
+from typing import Dict, Iterable, Iterator, Tuple
+
+
+class InList:
+    """A list parameter for IN, as in ``WHERE id IN %s`` or
+    ``WHERE id IN %(ids)s``. Duplicate values are dropped.
+
+    Up to expand_limit values become one placeholder each. Larger lists
+    run the statement once per chunk of values and put the results
+    together, or load the values into a temporary table the statement
+    joins, from temp_table_limit values on or whenever chunks would
+    change the result (NOT IN, OR, GROUP BY, ORDER BY, LIMIT...).
+    sql_type is the temporary table's column type, guessed from the
+    values by default. The statements are built by sqlight.expansion.
+    """
+
+    __slots__ = ("values", "sql_type", "expand_limit", "temp_table_limit")
+
+    EXPAND_LIMIT = 1000
+    TEMP_TABLE_LIMIT = 10000
+
+    def __init__(self, values: Iterable, sql_type: str = None,
+                 expand_limit: int = None, temp_table_limit: int = None):
+        self.values = list(dict.fromkeys(values))
+        self.sql_type = sql_type
+        self.expand_limit = expand_limit or self.EXPAND_LIMIT
+        self.temp_table_limit = temp_table_limit or self.TEMP_TABLE_LIMIT
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __iter__(self) -> Iterator:
+        return iter(self.values)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, InList) and self.values == other.values
+
+    def __hash__(self) -> int:
+        return hash(tuple(self.values))
+
+    def __repr__(self) -> str:
+        return "InList({!r})".format(self.values)
+
+
+def has_lists(parameters: Tuple, kwparameters: Dict) -> bool:
+    """Whether any parameter is an InList, cheap enough for every call."""
+    for p in parameters:
+        if isinstance(p, InList):
+            return True
+    if kwparameters:
+        for p in kwparameters.values():
+            if isinstance(p, InList):
+                return True
+    return False
@@ -0,0 +1,153 @@
+import re
+
+from typing import Iterator, Tuple
+
+
+COMMENT = "comment"
+STRING = "string"
+QUOTED = "quoted"  # quoted identifier
+PLACEHOLDER = "placeholder"
+PERCENT = "percent"  # an escaped %%
+NUMBER = "number"
+WORD = "word"
+SPACE = "space"
+OP = "op"
+
+_TOKEN_PATTERN = r"""
+    (?P<comment>--[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<string>{string})
+  | (?P<quoted>{quoted})
+  | (?P<placeholder>%s|%\([^)]+\)s)
+  | (?P<percent>%%)
+  | (?P<number>(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<word>[^\W\d]\w*)
+  | (?P<space>\s+)
+  | (?P<op>.)
+"""
+_STANDARD_STRING = r"'(?:[^']|'')*(?:'|\Z)"
+# a quote is escaped by doubling it or with a backslash
+_BACKSLASH_STRING = r"{0}(?:[^{0}\\]|\\.|{0}{0})*(?:{0}|\Z)"
+_DOUBLE_QUOTED = r'"(?:[^"]|"")*(?:"|\Z)'
+_BACKTICK_QUOTED = r"`(?:[^`]|``)*(?:`|\Z)"
+
+# string and identifier quoting by Platform value, standard SQL (and
+# SQLite) for the others
+_QUOTING = {
+    None: (_STANDARD_STRING, _DOUBLE_QUOTED + "|" + _BACKTICK_QUOTED),
+    # E'' strings take backslash escapes, $tag$...$tag$ quotes anything
+    "postgresql": ("[eE]" + _BACKSLASH_STRING.format("'") +
+                   r"|\$(?P<tag>(?:[^\W\d]\w*)?)\$.*?\$(?P=tag)\$|" +
+                   _STANDARD_STRING, _DOUBLE_QUOTED),
+    # "" is a string too unless ANSI_QUOTES is set
+    "mysql": (_BACKSLASH_STRING.format("'") + "|" +
+              _BACKSLASH_STRING.format('"'), _BACKTICK_QUOTED),
+}
+_QUOTING["mariadb"] = _QUOTING["mysql"]
+_token_res = {}
+
+
+def _token_re(platform):
+    key = getattr(platform, "value", None)
+    if key not in _QUOTING:
+        key = None
+    token_re = _token_res.get(key)
+    if token_re is None:
+        string, quoted = _QUOTING[key]
+        token_re = _token_res[key] = re.compile(
+            _TOKEN_PATTERN.format(string=string, quoted=quoted),
+            re.VERBOSE | re.DOTALL)
+    return token_re
+
+
+def tokenize(query: str, platform=None) -> Iterator[Tuple[str, str]]:
+    """Splits query into (kind, text) tokens. The texts joined together
+    give back the query. Literals follow the quoting of platform, a
+    sqlight Platform: standard SQL by default, where a quote is escaped
+    by doubling it, backslash escapes in MySQL strings and PostgreSQL
+    E'' strings, PostgreSQL dollar quoting."""
+    for m in _token_re(platform).finditer(query):
+        yield m.lastgroup, m.group()
+
+
+def placeholder_name(text: str) -> str:
+    """Returns the key of a %(name)s placeholder, None for %s."""
+    if text == "%s":
+        return None
+    return text[2:-2]
+
+
+def unescape_percent(text: str) -> str:
+    """%% in literals and comments stands for %, as it does for the
+    pyformat drivers."""
+    return text.replace("%%", "%")
+
+
+def unescape_query(query: str, platform=None) -> str:
+    """Turns every %% outside of placeholders into %, the way
+    %-formatting a query would."""
+    return "".join(text.replace("%%", "%") if kind != OP else text
+                   for kind, text in tokenize(query, platform))
+
+
+def split_insert_values(query: str,
+                        platform=None) -> Tuple[str, str, str]:
+    """Splits ``INSERT ... VALUES (row template) rest`` into its three
+    parts. Returns None when query is not an INSERT with exactly one
+    VALUES row."""
+    tokens = list(tokenize(query, platform))
+    significant = [i for i, (kind, _) in enumerate(tokens)
+                   if kind not in (SPACE, COMMENT)]
+    if not significant or tokens[significant[0]][1].upper() != "INSERT":
+        return None
+
+    depth = 0
+    for n, i in enumerate(significant):
+        kind, text = tokens[i]
+        if text == "(":
+            depth += 1
+        elif text == ")":
+            depth -= 1
+        elif depth == 0 and kind == WORD and text.upper() == "VALUES":
+            break
+    else:
+        return None
+
+    if n + 1 >= len(significant) or tokens[significant[n + 1]][1] != "(":
+        return None
+    start = significant[n + 1]
+    depth = 0
+    for end in range(start, len(tokens)):
+        text = tokens[end][1]
+        if text == "(":
+            depth += 1
+        elif text == ")":
+            depth -= 1
+            if depth == 0:
+                break
+    else:
+        return None
+
+    rest = [t for t in tokens[end + 1:] if t[0] not in (SPACE, COMMENT)]
+    if rest and rest[0][1] == ",":
+        return None
+
+    def join(part):
+        return "".join(text for _, text in part)
+
+    return (join(tokens[:start]), join(tokens[start:end + 1]),
+            join(tokens[end + 1:]))
+
+
+_READ_STATEMENTS = {"SELECT", "VALUES", "EXPLAIN"}
+_WRITE_WORDS = {"INSERT", "UPDATE", "DELETE", "REPLACE", "MERGE", "UPSERT"}
+
+
+def is_read_only(query: str) -> bool:
+    """Whether query only reads, judged by its first keyword. A WITH
+    query reads unless it contains a data changing keyword."""
+    words = [text.upper() for kind, text in tokenize(query) if kind == WORD]
+    if not words:
+        return False
+    if words[0] == "WITH":
+        return _WRITE_WORDS.isdisjoint(words)
+    return words[0] in _READ_STATEMENTS
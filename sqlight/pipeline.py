@@ -0,0 +1,142 @@
+import queue
+import threading
+import time
+
+from typing import Callable, List, Sequence
+
+from sqlight.connection import Connection
+
+_DONE = object()  # end of the source rows
+
+
+class CopyStats:
+    """Counters of a copy_table run, times in seconds.
+
+    lag is how long batches waited in the queue between reader and
+    writer, queue_depth how many were waiting when the writer took one.
+    A writer keeping up shows lag near 0, a slow one a full queue.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.batches = 0
+        self.commits = 0
+        self.elapsed = 0.0
+        self.read_time = 0.0  # reader waiting on the source
+        self.write_time = 0.0  # writer waiting on the sink
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self.max_queue_depth = 0
+        self._started = time.perf_counter()
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def mean_lag(self) -> float:
+        return self.total_lag / self.batches if self.batches else 0.0
+
+    def __repr__(self) -> str:
+        return ("CopyStats(rows={}, batches={}, commits={}, elapsed={:.3f}, "
+                "rows_per_second={:.0f}, mean_lag={:.4f}, max_lag={:.4f})"
+                ).format(self.rows, self.batches, self.commits, self.elapsed,
+                         self.rows_per_second, self.mean_lag, self.max_lag)
+
+
+def copy_table(source: Connection, query: str, sink: Connection, table: str,
+               *parameters, columns: Sequence[str] = None,
+               batch_size: int = 1000, queue_size: int = 4,
+               commit_every: int = 10000,
+               progress: Callable[[CopyStats], None] = None,
+               **kwparameters) -> CopyStats:
+    """Copies the rows of query on source into table on sink.
+
+    A reader thread streams source.iter_batches into a queue of at most
+    queue_size batches, the calling thread takes them out and loads them
+    with sink.copy_from, so memory stays flat whatever the table size.
+    Both sides use sqlight's %s paramstyle and each driver translates it
+    to its own. The sink commits every commit_every rows and at the end.
+    columns names the sink columns, the query's column names by default.
+    progress is called with the stats after every batch.
+
+    source is used from the reader thread, open a SQLite source with
+    check_same_thread=False.
+    """
+    stats = CopyStats()
+    batches = queue.Queue(queue_size)
+    stop = threading.Event()
+    names = []
+
+    def tuple_rows(column_names: List[str]) -> Callable:
+        names.extend(column_names)
+        return tuple
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                batches.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def read():
+        try:
+            rows = source.iter_batches(query, *parameters,
+                                       batch_size=batch_size,
+                                       row_factory=tuple_rows,
+                                       **kwparameters)
+            while True:
+                start = time.perf_counter()
+                batch = next(rows, None)
+                stats.read_time += time.perf_counter() - start
+                if batch is None:
+                    break
+                if not put((time.perf_counter(), batch)):
+                    rows.close()
+                    return
+        except BaseException as e:
+            put((None, e))
+            return
+        put((None, _DONE))
+
+    reader = threading.Thread(target=read, name="sqlight-copy-reader",
+                              daemon=True)
+    reader.start()
+    uncommitted = 0
+    try:
+        while True:
+            depth = batches.qsize()
+            queued_at, batch = batches.get()
+            if batch is _DONE:
+                break
+            if queued_at is None:
+                raise batch
+            lag = time.perf_counter() - queued_at
+            stats.total_lag += lag
+            stats.max_lag = max(stats.max_lag, lag)
+            stats.max_queue_depth = max(stats.max_queue_depth, depth)
+
+            start = time.perf_counter()
+            sink.copy_from(table, batch, columns or names)
+            uncommitted += len(batch)
+            if commit_every and uncommitted >= commit_every:
+                sink.commit()
+                stats.commits += 1
+                uncommitted = 0
+            stats.write_time += time.perf_counter() - start
+
+            stats.rows += len(batch)
+            stats.batches += 1
+            stats.elapsed = time.perf_counter() - stats._started
+            if progress is not None:
+                progress(stats)
+        if uncommitted or not stats.commits:
+            sink.commit()
+            stats.commits += 1
+    finally:
+        stop.set()
+        reader.join()
+        stats.elapsed = time.perf_counter() - stats._started
+    return stats
@@ -1,11 +1,22 @@
 from abc import ABCMeta, abstractmethod
-from typing import NoReturn, Iterator, List
+from itertools import chain, islice
+from typing import Callable, Dict, NoReturn, Iterator, List, Sequence
 
-from sqlight.row import Row
+from sqlight.columns import build_columns
+from sqlight.events import Listener, install_hooks, uninstall_hooks
+from sqlight.row import Row, default_row_factory
 
 
 class DB(metaclass=ABCMeta):
 
+    platform = None  # the Platform this driver speaks to
+    itersize = 1000  # default batch size of iter_batches
+    last_rowcount = -1  # rowcount of the last execute_lastrowid
+    max_parameters = None  # bound parameters per statement, if limited
+    max_statement_bytes = None  # statement size limit, if known
+    temp_tables = True  # whether statements see the session's temp tables
+    _listeners = ()
+
     @abstractmethod
     def connect(self) -> NoReturn:
         pass
@@ -31,15 +42,29 @@ class DB(metaclass=ABCMeta):
         pass
 
     @abstractmethod
-    def iter(self, query: str, *parameters, **kwparameters) -> Iterator[Row]:
+    def iter(self, query: str, *parameters, row_factory: Callable = None,
+             **kwparameters) -> Iterator[Row]:
+        pass
+
+    @abstractmethod
+    def iter_batches(self, query: str, *parameters, batch_size: int = None,
+                     row_factory: Callable = None,
+                     **kwparameters) -> Iterator[List[Row]]:
+        pass
+
+    @abstractmethod
+    def query(self, query: str, *parameters, row_factory: Callable = None,
+              **kwparameters) -> List[Row]:
         pass
 
     @abstractmethod
-    def query(self, query: str, *parameters, **kwparameters) -> List[Row]:
+    def query_columns(self, query: str, *parameters, chunk_size: int = None,
+                      **kwparameters) -> Dict[str, Sequence]:
         pass
 
     @abstractmethod
-    def get(self, query: str, *parameters, **kwparameters) -> Row:
+    def get(self, query: str, *parameters, row_factory: Callable = None,
+            **kwparameters) -> Row:
         pass
 
     @abstractmethod
@@ -54,3 +79,54 @@ class DB(metaclass=ABCMeta):
     @abstractmethod
     def executemany_rowcount(self, query: str, parameters: Iterator) -> int:
         pass
+
+    def get_settings(self) -> Dict[str, object]:
+        """Returns the driver's effective tuning settings, drivers without
+        any return an empty dict."""
+        return {}
+
+    def add_listener(self, listener: Listener) -> NoReturn:
+        """Reports every statement to listener, see sqlight.events.
+        Methods are only wrapped while a listener is registered."""
+        self._listeners = self._listeners + (listener,)
+        if len(self._listeners) == 1:
+            install_hooks(self)
+
+    def remove_listener(self, listener: Listener) -> NoReturn:
+        listeners = list(self._listeners)
+        listeners.remove(listener)
+        self._listeners = tuple(listeners)
+        if not listeners:
+            uninstall_hooks(self)
+
+    def copy_from(self, table: str, rows: Iterator,
+                  columns: List[str] = None) -> int:
+        """Loads rows (sequences) into table and returns the row count.
+        Drivers with a native bulk path override this, the default
+        inserts itersize rows per executemany."""
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            return 0
+        query = "INSERT INTO {}".format(table)
+        if columns:
+            query += " ({})".format(", ".join(columns))
+        query += " VALUES ({})".format(", ".join(["%s"] * len(first)))
+
+        total = 0
+        rows = chain([first], rows)
+        while True:
+            page = list(islice(rows, self.itersize))
+            if not page:
+                return total
+            total += self.executemany_rowcount(query, page)
+
+    def _row_builder(self, cursor, row_factory: Callable = None) -> Callable:
+        """Returns the callable turning the cursor's tuples into rows.
+        row_factory gets the column names once per result set."""
+        column_names = [d[0] for d in cursor.description]
+        return (row_factory or default_row_factory)(column_names)
+
+    def _build_columns(self, cursor,
+                       chunk_size: int = None) -> Dict[str, Sequence]:
+        return build_columns(cursor, chunk_size)
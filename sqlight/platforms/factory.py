@@ -1,58 +1,99 @@
+import importlib
+
+from typing import Union
+
 from sqlight.platforms.keywords import Driver
 from sqlight.platforms.db import DB
 from sqlight.err import ProgrammingError, NotSupportedError
 
-try:
-    import MySQLdb.cursors
-except ImportError:
-    MySQLDB = None
-else:
-    from sqlight.platforms.mysqlclient import MySQLDB
-
-try:
-    import pymysql.cursors
-except ImportError:
-    PyMySQL = None
-else:
-    from sqlight.platforms.pymysql import PyMySQL
-
-try:
-    import psycopg2
-except ImportError:
-    Psycopg2 = None
-else:
-    from sqlight.platforms.psycopg import Psycopg2
-
-try:
-    import sqlite3
-except ImportError:
-    SQLite = None
-else:
-    from sqlight.platforms.sqlite import SQLite
-
-
-def get_driver(driver: Driver) -> DB:
-    if driver is Driver.MYSQLCLIENT:
-        if MySQLDB is None:
-            _raise_not_supported_driver(driver)
-        return MySQLDB
-    elif driver is Driver.PYMYSQL:
-        if PyMySQL is None:
-            _raise_not_supported_driver(driver)
-        return PyMySQL
-    elif driver is Driver.PSYCOPG:
-        if Psycopg2 is None:
-            _raise_not_supported_driver(driver)
-        return Psycopg2
-    elif driver is Driver.SQLITE:
-        if SQLite is None:
-            _raise_not_supported_driver(driver)
-        return SQLite
-
-    raise ProgrammingError("Unknown driver [{}]".format(driver))
-
-
-def _raise_not_supported_driver(driver: Driver):
+ENTRY_POINT_GROUP = "sqlight.drivers"
+
+# driver name, or URL scheme "platform+driver" of drivers for platforms
+# sqlight does not know, -> DB class or the "module:Class" path importing
+# it on first use
+_drivers = {
+    Driver.MYSQLCLIENT.value[0]: "sqlight.platforms.mysqlclient:MySQLDB",
+    Driver.PYMYSQL.value[0]: "sqlight.platforms.pymysql:PyMySQL",
+    Driver.PSYCOPG.value[0]: "sqlight.platforms.psycopg:Psycopg2",
+    Driver.SQLITE.value[0]: "sqlight.platforms.sqlite:SQLite",
+    Driver.SQLITE_THREADED.value[0]:
+        "sqlight.platforms.sqlite_threaded:ThreadedSQLite",
+}
+_entry_points_loaded = False
+
+
+def register_driver(name: str, target: Union[str, type]):
+    """Registers the DB class of a driver, either the class itself or a
+    "module:Class" path imported when get_driver first asks for it.
+    name is a Driver's name, replacing its class, or a URL scheme such as
+    "cockroachdb+cockroach" that DBUrl then accepts."""
+    _drivers[name.lower()] = target
+
+
+def has_driver(name: str) -> bool:
+    """Whether a driver is registered under name, reading the installed
+    packages' entry points if it is not."""
+    name = name.lower()
+    if name not in _drivers:
+        load_entry_points()
+    return name in _drivers
+
+
+def get_driver(driver: Union[Driver, str]) -> DB:
+    name = driver.value[0] if isinstance(driver, Driver) else driver
+    if not isinstance(name, str) or not has_driver(name):
+        raise ProgrammingError("Unknown driver [{}]".format(driver))
+    name = name.lower()
+
+    target = _drivers[name]
+    if isinstance(target, str):
+        module_name, _, class_name = target.partition(":")
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError:
+            _raise_not_supported_driver(name)
+        target = _drivers[name] = getattr(module, class_name)
+    return target
+
+
+def load_entry_points() -> bool:
+    """Registers the drivers installed packages declare in the
+    "sqlight.drivers" entry point group, once per process. Each entry
+    point is named after its URL scheme, "platform+driver", and points
+    to the DB class, which is not imported until it is used:
+
+        [options.entry_points]
+        sqlight.drivers =
+            cockroachdb+cockroach = sqlight_cockroach:CockroachDB
+
+    Registered names keep their class. Returns whether any driver was
+    registered.
+    """
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return False
+    _entry_points_loaded = True
+
+    registered = False
+    for entry_point in _entry_points():
+        name = entry_point.name.lower()
+        if name not in _drivers:
+            _drivers[name] = entry_point.value
+            registered = True
+    return registered
+
+
+def _entry_points():
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:  # Python < 3.8
+        return []
+    eps = entry_points()
+    if hasattr(eps, "select"):
+        return eps.select(group=ENTRY_POINT_GROUP)
+    return eps.get(ENTRY_POINT_GROUP, [])
+
+
+def _raise_not_supported_driver(name: str):
     raise NotSupportedError(
-            "driver [{}] is not installed. please install".format(
-                driver.value[0]))
+            "driver [{}] is not installed. please install".format(name))
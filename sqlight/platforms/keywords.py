@@ -23,6 +23,7 @@ class Driver(Enum):
     MYSQLCLIENT = ("mysqlclient", (Platform.MySQL, Platform.MariaDB,))
     PSYCOPG = ("psycopg", (Platform.PostgreSQL,))
     SQLITE = ("sqlite", (Platform.SQLite,))
+    SQLITE_THREADED = ("threaded", (Platform.SQLite,))
 
     @classmethod
     def get_driver(cls, platform: Platform, driver: str) -> 'Driver':
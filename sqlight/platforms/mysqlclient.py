@@ -1,7 +1,7 @@
 import time
 
 from functools import wraps
-from typing import NoReturn, Iterator, List
+from typing import Callable, Dict, NoReturn, Iterator, List, Sequence
 
 import MySQLdb.cursors
 
@@ -9,6 +9,7 @@ import sqlight.err as err
 
 from sqlight.row import Row
 from sqlight.platforms.db import DB
+from sqlight.platforms.keywords import Platform
 
 
 def exce_converter(func):
@@ -44,6 +45,9 @@ def exce_converter(func):
 
 
 class MySQLDB(DB):
+
+    platform = Platform.MySQL
+
     def __init__(self,
                  host: str = None,
                  port: int = None,
@@ -109,29 +113,60 @@ class MySQLDB(DB):
         return self._last_executed
 
     @exce_converter
-    def iter(self, query: str, *parameters, **kwparameters) -> Iterator[Row]:
+    def iter(self, query: str, *parameters, row_factory: Callable = None,
+             **kwparameters) -> Iterator[Row]:
         self._ensure_connected()
         cursor = MySQLdb.cursors.SSCursor(self._db)
         try:
             self._execute(cursor, query, parameters, kwparameters)
-            column_names = [d[0] for d in cursor.description]
+            build = self._row_builder(cursor, row_factory)
             for row in cursor:
-                yield Row(zip(column_names, row))
+                yield build(row)
+        finally:
+            self._cursor_close(cursor)
+
+    @exce_converter
+    def iter_batches(self, query: str, *parameters, batch_size: int = None,
+                     row_factory: Callable = None,
+                     **kwparameters) -> Iterator[List[Row]]:
+        batch_size = batch_size or self.itersize
+        self._ensure_connected()
+        cursor = MySQLdb.cursors.SSCursor(self._db)
+        try:
+            self._execute(cursor, query, parameters, kwparameters)
+            build = self._row_builder(cursor, row_factory)
+            rows = cursor.fetchmany(batch_size)
+            while rows:
+                yield list(map(build, rows))
+                rows = cursor.fetchmany(batch_size)
+        finally:
+            self._cursor_close(cursor)
+
+    @exce_converter
+    def query(self, query: str, *parameters, row_factory: Callable = None,
+              **kwparameters) -> List[Row]:
+        cursor = self._cursor()
+        try:
+            self._execute(cursor, query, parameters, kwparameters)
+            build = self._row_builder(cursor, row_factory)
+            return [build(row) for row in cursor]
         finally:
             self._cursor_close(cursor)
 
     @exce_converter
-    def query(self, query: str, *parameters, **kwparameters) -> List[Row]:
+    def query_columns(self, query: str, *parameters, chunk_size: int = None,
+                      **kwparameters) -> Dict[str, Sequence]:
         cursor = self._cursor()
         try:
             self._execute(cursor, query, parameters, kwparameters)
-            column_names = [d[0] for d in cursor.description]
-            return [Row(zip(column_names, row)) for row in cursor]
+            return self._build_columns(cursor, chunk_size)
         finally:
             self._cursor_close(cursor)
 
-    def get(self, query: str, *parameters, **kwparameters) -> Row:
-        rows = self.query(query, *parameters, **kwparameters)
+    def get(self, query: str, *parameters, row_factory: Callable = None,
+            **kwparameters) -> Row:
+        rows = self.query(query, *parameters, row_factory=row_factory,
+                          **kwparameters)
         if not rows:
             return None
         elif len(rows) > 1:
@@ -146,6 +181,7 @@ class MySQLDB(DB):
         cursor = self._cursor()
         try:
             self._execute(cursor, query, parameters, kwparameters)
+            self.last_rowcount = cursor.rowcount
             return cursor.lastrowid
         finally:
             self._cursor_close(cursor)
@@ -1,11 +1,21 @@
+import io
+import itertools
+import weakref
+
 from functools import wraps
-from typing import NoReturn, Iterator, List
+from typing import Callable, Dict, NoReturn, Iterator, List, Sequence
 
 import psycopg2
+import psycopg2.extensions
 
 import sqlight.err as err
+import sqlight.lexer as lexer
 from sqlight.row import Row
 from sqlight.platforms.db import DB
+from sqlight.platforms.keywords import Platform
+
+
+_cursor_ids = itertools.count()
 
 
 def exce_converter(func):
@@ -41,6 +51,9 @@ def exce_converter(func):
 
 
 class Psycopg2(DB):
+
+    platform = Platform.PostgreSQL
+
     def __init__(self,
                  host: str = None,
                  port: int = None,
@@ -49,11 +62,15 @@ class Psycopg2(DB):
                  password: str = None,
                  autocommit: bool = False,
                  init_command: str = None,
+                 itersize: int = 2000,
+                 page_size: int = 1000,
                  **kwargs):
         self.host = host
         self.database = database
         self.autocommit = autocommit
         self.init_command = init_command
+        self.itersize = itersize  # rows per round trip of a server cursor
+        self.page_size = page_size  # VALUES rows per executemany INSERT
 
         args = dict(database=database, **kwargs)
         if user is not None:
@@ -72,6 +89,7 @@ class Psycopg2(DB):
         self._db = None
         self._db_args = args
         self._closed = False  # connect close flag
+        self._server_cursors = weakref.WeakSet()  # open named cursors
 
     @exce_converter
     def connect(self) -> NoReturn:
@@ -82,8 +100,7 @@ class Psycopg2(DB):
             self._db.autocommit = self.autocommit
         self._closed = False
         if self.init_command is not None:
-            cursor = self._cursor()
-            self.execute_rowcount(cursor, self.init_command)
+            self.execute_rowcount(self.init_command)
             if not self.autocommit:
                 self.commit()
 
@@ -94,11 +111,13 @@ class Psycopg2(DB):
 
     @exce_converter
     def commit(self) -> NoReturn:
+        self._close_server_cursors(keep_withhold=True)
         cursor = self._cursor()
         self._execute(cursor, "COMMIT", [], {})
 
     @exce_converter
     def rollback(self) -> NoReturn:
+        self._close_server_cursors(keep_withhold=False)
         cursor = self._cursor()
         self._execute(cursor, "ROLLBACK", [], {})
 
@@ -106,28 +125,57 @@ class Psycopg2(DB):
         return self._last_executed
 
     @exce_converter
-    def iter(self, query: str, *parameters, **kwparameters) -> Iterator[Row]:
+    def iter(self, query: str, *parameters, row_factory: Callable = None,
+             **kwparameters) -> Iterator[Row]:
+        for rows in self.iter_batches(query, *parameters,
+                                      row_factory=row_factory,
+                                      **kwparameters):
+            yield from rows
+
+    @exce_converter
+    def iter_batches(self, query: str, *parameters, batch_size: int = None,
+                     row_factory: Callable = None,
+                     **kwparameters) -> Iterator[List[Row]]:
+        """Streams the result through a named server-side cursor, yielding
+        lists of at most batch_size (default itersize) rows."""
+        batch_size = batch_size or self.itersize
+        cursor = self._server_cursor()
+        try:
+            self._execute(cursor, query, parameters, kwparameters)
+            rows = cursor.fetchmany(batch_size)
+            # a named cursor has no description before the first fetch
+            build = self._row_builder(cursor, row_factory)
+            while rows:
+                yield list(map(build, rows))
+                rows = cursor.fetchmany(batch_size)
+        finally:
+            self._close_server_cursor(cursor)
+
+    @exce_converter
+    def query(self, query: str, *parameters, row_factory: Callable = None,
+              **kwparameters) -> List[Row]:
         cursor = self._cursor()
         try:
             self._execute(cursor, query, parameters, kwparameters)
-            column_names = [d[0] for d in cursor.description]
-            for row in cursor:
-                yield Row(zip(column_names, row))
+            build = self._row_builder(cursor, row_factory)
+            return [build(row) for row in cursor]
         finally:
             self._cursor_close(cursor)
 
     @exce_converter
-    def query(self, query: str, *parameters, **kwparameters) -> List[Row]:
+    def query_columns(self, query: str, *parameters, chunk_size: int = None,
+                      **kwparameters) -> Dict[str, Sequence]:
         cursor = self._cursor()
         try:
             self._execute(cursor, query, parameters, kwparameters)
-            column_names = [d[0] for d in cursor.description]
-            return [Row(zip(column_names, row)) for row in cursor]
+            return self._build_columns(cursor, chunk_size)
         finally:
             self._cursor_close(cursor)
 
-    def get(self, query: str, *parameters, **kwparameters) -> Row:
-        rows = self.query(query, *parameters, **kwparameters)
+    def get(self, query: str, *parameters, row_factory: Callable = None,
+            **kwparameters) -> Row:
+        rows = self.query(query, *parameters, row_factory=row_factory,
+                          **kwparameters)
         if not rows:
             return None
         elif len(rows) > 1:
@@ -142,6 +190,7 @@ class Psycopg2(DB):
         cursor = self._cursor()
         try:
             self._execute(cursor, query, parameters, kwparameters)
+            self.last_rowcount = cursor.rowcount
             return cursor.lastrowid
         finally:
             self._cursor_close(cursor)
@@ -157,13 +206,51 @@ class Psycopg2(DB):
 
     @exce_converter
     def executemany_rowcount(self, query: str, parameters: Iterator) -> int:
+        """INSERT ... VALUES statements are sent page_size rows at a time
+        as one multi-row VALUES statement, others run per parameter set.
+        """
+        parts = lexer.split_insert_values(query, self.platform)
+        cursor = self._cursor()
+        try:
+            if parts is None or self.page_size <= 1:
+                cursor.executemany(query, parameters)
+                return cursor.rowcount
+            return self._insert_pages(cursor, parts, parameters)
+        finally:
+            self._cursor_close(cursor)
+
+    @exce_converter
+    def copy_from(self, table: str, rows: Iterator,
+                  columns: List[str] = None) -> int:
+        """Streams rows into table with COPY ... FROM STDIN. rows may be
+        any iterable, it is read while the data is sent."""
+        query = "COPY {}".format(table)
+        if columns:
+            query += " ({})".format(", ".join(columns))
+        query += " FROM STDIN"
         cursor = self._cursor()
         try:
-            cursor.executemany(query, parameters)
+            cursor.copy_expert(query, _CopyReader(rows))
             return cursor.rowcount
         finally:
             self._cursor_close(cursor)
 
+    def _insert_pages(self, cursor, parts, parameters: Iterator) -> int:
+        prefix, template, suffix = parts
+        encoding = psycopg2.extensions.encodings[self._db.encoding]
+        prefix = lexer.unescape_query(prefix, self.platform).encode(encoding)
+        suffix = lexer.unescape_query(suffix, self.platform).encode(encoding)
+
+        total = 0
+        parameters = iter(parameters)
+        while True:
+            page = list(itertools.islice(parameters, self.page_size))
+            if not page:
+                return total
+            values = b",".join(cursor.mogrify(template, p) for p in page)
+            cursor.execute(prefix + values + suffix)
+            total += cursor.rowcount
+
     @exce_converter
     def close(self) -> NoReturn:
         if self._db is not None:
@@ -173,6 +260,33 @@ class Psycopg2(DB):
     def _cursor(self) -> psycopg2.extensions.cursor:
         return self._db.cursor()
 
+    def _server_cursor(self) -> psycopg2.extensions.cursor:
+        """A named cursor, so rows stay on the server until fetched. In
+        autocommit mode there is no transaction to live in, so it is
+        declared WITH HOLD."""
+        name = "sqlight_{}_{}".format(id(self), next(_cursor_ids))
+        cursor = self._db.cursor(name=name, withhold=self.autocommit)
+        cursor.itersize = self.itersize
+        self._server_cursors.add(cursor)
+        return cursor
+
+    def _close_server_cursor(self, cursor) -> NoReturn:
+        self._server_cursors.discard(cursor)
+        if cursor.closed:
+            return
+        try:
+            self._cursor_close(cursor)
+        except psycopg2.Error:
+            pass  # the server dropped it together with its transaction
+
+    def _close_server_cursors(self, keep_withhold: bool) -> NoReturn:
+        """Closes the named cursors a transaction end would invalidate.
+        Iterators still reading them fail with InterfaceError."""
+        for cursor in list(self._server_cursors):
+            if keep_withhold and cursor.withhold:
+                continue
+            self._close_server_cursor(cursor)
+
     def _cursor_close(self, cursor) -> NoReturn:
         if getattr(cursor, "query", None):
             self._last_executed = cursor.query.decode()
@@ -180,3 +294,41 @@ class Psycopg2(DB):
 
     def _execute(self, cursor, query, parameters, kwparameters) -> int:
         return cursor.execute(query, kwparameters or parameters)
+
+
+class _CopyReader(io.TextIOBase):
+    """A file object producing rows in COPY text format on demand."""
+
+    def __init__(self, rows: Iterator):
+        self._rows = iter(rows)
+        self._buffer = ""
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._buffer) < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self._buffer += "\t".join(map(_copy_value, row)) + "\n"
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+_COPY_ESCAPES = str.maketrans({
+    "\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _copy_value(value) -> str:
+    if value is None:
+        return "\\N"
+    elif value is True:
+        return "t"
+    elif value is False:
+        return "f"
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        return "\\\\x" + bytes(value).hex()
+    return str(value).translate(_COPY_ESCAPES)
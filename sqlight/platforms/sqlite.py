@@ -1,11 +1,18 @@
 import sqlite3
+import threading
+import warnings
 
+from collections import OrderedDict
 from functools import wraps
-from typing import NoReturn, Iterator, List, Dict
+from itertools import chain
+from typing import Callable, NoReturn, Iterator, List, Dict, Sequence, \
+    Union
 
 import sqlight.err as err
+import sqlight.lexer as lexer
 
 from sqlight.platforms.db import DB
+from sqlight.platforms.keywords import Platform
 from sqlight.row import Row
 
 
@@ -35,20 +42,101 @@ def exce_converter(func):
     return wrapper
 
 
+# Tuning profiles, picked with ?profile= in the dburl. cache_size is in
+# KiB when negative, mmap_size in bytes and busy_timeout in milliseconds.
+PROFILES = {
+    # WAL with fsync only at checkpoints: fast, a power loss may lose the
+    # last commits but never corrupts the database
+    "wal_fast": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64000,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    # WAL with an fsync per commit
+    "wal_safe": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -16000,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    # one-off loads of a database that can be rebuilt after a crash
+    "bulk_load": {
+        "journal_mode": "MEMORY",
+        "synchronous": "OFF",
+        "cache_size": -256000,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+}
+PRAGMAS = ("journal_mode", "synchronous", "cache_size", "mmap_size",
+           "temp_store", "busy_timeout")
+
+# PRAGMA reads return the numbers of these names
+_PRAGMA_NAMES = {
+    "synchronous": {"OFF": 0, "NORMAL": 1, "FULL": 2, "EXTRA": 3},
+    "temp_store": {"DEFAULT": 0, "FILE": 1, "MEMORY": 2},
+}
+
+
 class SQLite(DB):
+
+    platform = Platform.SQLite
+    # SQLITE_MAX_VARIABLE_NUMBER, raised from 999 in 3.32
+    max_parameters = 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) \
+        else 999
+
     def __init__(self,
                  database: str = None,
-                 init_command: str = None,
+                 init_command: Union[str, Sequence[str]] = None,
                  autocommit: bool = False,
+                 translate_cache_size: int = 256,
+                 profile: str = None,
+                 journal_mode: str = None,
+                 synchronous: Union[str, int] = None,
+                 cache_size: int = None,
+                 mmap_size: int = None,
+                 temp_store: Union[str, int] = None,
+                 busy_timeout: int = None,
                  **kwargs):
+        """
+        profile names one of PROFILES, the pragma arguments override its
+        values. Pragmas are set and verified on connect, before
+        init_command, which may hold several statements separated by ;
+        or be a list of statements.
+        """
         if "isolation_level" not in kwargs and autocommit:
             kwargs["isolation_level"] = None
+        if profile is not None and profile not in PROFILES:
+            raise err.ProgrammingError(
+                "Unknown SQLite profile [{}]".format(profile))
         self._database = database
         self._args = kwargs
         self._db = None
         self.init_command = init_command
         self.autocommit = autocommit
 
+        self.profile = profile
+        self.pragmas = dict(PROFILES.get(profile, {}))
+        for name, value in (("journal_mode", journal_mode),
+                            ("synchronous", synchronous),
+                            ("cache_size", cache_size),
+                            ("mmap_size", mmap_size),
+                            ("temp_store", temp_store),
+                            ("busy_timeout", busy_timeout)):
+            if value is not None:
+                self.pragmas[name] = value
+
+        # LRU of pyformat queries translated to sqlite3 paramstyles
+        self.translate_cache_size = translate_cache_size
+        self.translate_cache_hits = 0
+        self.translate_cache_misses = 0
+        self._translate_cache = OrderedDict()
+        self._translate_lock = threading.Lock()
+
         self._last_executed = None
         self._closed = False  # connect close flag
 
@@ -59,12 +147,65 @@ class SQLite(DB):
         self._db = sqlite3.connect(self._database, **self._args)
         self._db.set_trace_callback(self._trace_callback)
         self._closed = False
+        if self.pragmas:
+            self._apply_pragmas()
         if self.init_command is not None:
             cursor = self._cursor()
-            self.execute_rowcount(cursor, self.init_command)
+            try:
+                for statement in self._init_statements():
+                    self._execute(cursor, statement, [], {})
+            finally:
+                cursor.close()
             if not self.autocommit:
                 self.commit()
 
+    @exce_converter
+    def get_settings(self) -> Dict[str, object]:
+        """Returns the connection's current PRAGMAS values and the
+        profile."""
+        cursor = self._cursor()
+        try:
+            settings = {"profile": self.profile}
+            for name in PRAGMAS:
+                cursor.execute("PRAGMA {}".format(name))
+                row = cursor.fetchone()
+                settings[name] = row[0] if row else None
+            return settings
+        finally:
+            cursor.close()
+
+    def _apply_pragmas(self):
+        """Sets the pragmas and warns about those SQLite did not take,
+        like WAL on an in-memory database."""
+        cursor = self._cursor()
+        try:
+            for name, value in self.pragmas.items():
+                cursor.execute("PRAGMA {} = {}".format(name, value))
+        finally:
+            cursor.close()
+
+        settings = self.get_settings()
+        for name, value in self.pragmas.items():
+            expected = _pragma_value(name, value)
+            if settings[name] != expected:
+                warnings.warn(
+                    "SQLite PRAGMA {} is {!r}, not {!r}".format(
+                        name, settings[name], value), err.Warning)
+
+    def _init_statements(self) -> List[str]:
+        if not isinstance(self.init_command, str):
+            return list(self.init_command)
+        statements = []
+        current = []
+        for kind, text in lexer.tokenize(self.init_command):
+            if kind == lexer.OP and text == ";":
+                statements.append("".join(current))
+                current = []
+            else:
+                current.append(text)
+        statements.append("".join(current))
+        return [s for s in statements if s.strip()]
+
     @exce_converter
     def begin(self) -> NoReturn:
         if self.autocommit:
@@ -92,29 +233,59 @@ class SQLite(DB):
         return self._last_executed
 
     @exce_converter
-    def iter(self, query: str, *parameters, **kwparameters) -> Iterator[Row]:
+    def iter(self, query: str, *parameters, row_factory: Callable = None,
+             **kwparameters) -> Iterator[Row]:
         cursor = self._cursor()
         try:
             self._execute(cursor, query, parameters, kwparameters)
-            column_names = [d[0] for d in cursor.description]
+            build = self._row_builder(cursor, row_factory)
             for row in cursor:
-                yield Row(zip(column_names, row))
+                yield build(row)
         finally:
             cursor.close()
 
     @exce_converter
-    def query(self, query: str, *parameters, **kwparameters) -> List[Row]:
+    def iter_batches(self, query: str, *parameters, batch_size: int = None,
+                     row_factory: Callable = None,
+                     **kwparameters) -> Iterator[List[Row]]:
+        batch_size = batch_size or self.itersize
         cursor = self._cursor()
         try:
             self._execute(cursor, query, parameters, kwparameters)
-            column_names = [d[0] for d in cursor.description]
-            return [Row(zip(column_names, row)) for row in cursor]
+            build = self._row_builder(cursor, row_factory)
+            rows = cursor.fetchmany(batch_size)
+            while rows:
+                yield list(map(build, rows))
+                rows = cursor.fetchmany(batch_size)
         finally:
             cursor.close()
 
     @exce_converter
-    def get(self, query: str, *parameters, **kwparameters) -> Row:
-        rows = self.query(query, *parameters, **kwparameters)
+    def query(self, query: str, *parameters, row_factory: Callable = None,
+              **kwparameters) -> List[Row]:
+        cursor = self._cursor()
+        try:
+            self._execute(cursor, query, parameters, kwparameters)
+            build = self._row_builder(cursor, row_factory)
+            return [build(row) for row in cursor]
+        finally:
+            cursor.close()
+
+    @exce_converter
+    def query_columns(self, query: str, *parameters, chunk_size: int = None,
+                      **kwparameters) -> Dict[str, Sequence]:
+        cursor = self._cursor()
+        try:
+            self._execute(cursor, query, parameters, kwparameters)
+            return self._build_columns(cursor, chunk_size)
+        finally:
+            cursor.close()
+
+    @exce_converter
+    def get(self, query: str, *parameters, row_factory: Callable = None,
+            **kwparameters) -> Row:
+        rows = self.query(query, *parameters, row_factory=row_factory,
+                          **kwparameters)
         if not rows:
             return None
         elif len(rows) > 1:
@@ -129,6 +300,7 @@ class SQLite(DB):
         cursor = self._cursor()
         try:
             self._execute(cursor, query, parameters, kwparameters)
+            self.last_rowcount = cursor.rowcount
             return cursor.lastrowid
         finally:
             cursor.close()
@@ -153,24 +325,47 @@ class SQLite(DB):
 
     def _execute(self, cursor: sqlite3.Cursor, query: str, parameters: List,
                  kwparameters: Dict) -> NoReturn:
-        if kwparameters:
-            query = self.pyformat_to_named(query, kwparameters)
-        else:
-            query = self.format_to_qmark(query, parameters)
+        query = self._translate(query, kwparameters or parameters)
         cursor.execute(query, kwparameters or parameters)
 
     def _executemany(self, cursor: sqlite3.Cursor, query: str,
                      parameters: Iterator) -> NoReturn:
-        if parameters:
-            p = None
-            for p in parameters:
-                break
-            # 获取 Iterable 的第一个元素，为了确定是named 还是 qmark
-            if isinstance(p, dict):
-                query = self.pyformat_to_named(query, p)
-            else:
-                query = self.format_to_qmark(query, p)
-        cursor.executemany(query, parameters)
+        # 获取 Iterable 的第一个元素，为了确定是named 还是 qmark
+        parameters = iter(parameters)
+        first = next(parameters, None)
+        if first is None:
+            return
+        query = self._translate(query, first)
+        cursor.executemany(query, chain([first], parameters))
+
+    def _translate(self, query: str, parameters) -> str:
+        """Translates query to the sqlite3 paramstyle through the LRU cache,
+        keyed by the query and the shape of its parameters."""
+        named = isinstance(parameters, dict)
+        if named:
+            key = (query, tuple(sorted(parameters)))
+        else:
+            key = (query, len(parameters) if parameters is not None else 0)
+
+        with self._translate_lock:
+            translated = self._translate_cache.get(key)
+            if translated is not None:
+                self._translate_cache.move_to_end(key)
+                self.translate_cache_hits += 1
+                return translated
+            self.translate_cache_misses += 1
+
+        if named:
+            translated = self.pyformat_to_named(query, parameters)
+        else:
+            translated = self.format_to_qmark(query, parameters or ())
+
+        if self.translate_cache_size > 0:
+            with self._translate_lock:
+                self._translate_cache[key] = translated
+                if len(self._translate_cache) > self.translate_cache_size:
+                    self._translate_cache.popitem(last=False)
+        return translated
 
     def _trace_callback(self, last_executed: str):
         self._last_executed = last_executed
@@ -184,21 +379,61 @@ class SQLite(DB):
     def close(self):
         if self._db is not None:
             self._db.close()
+            # a closed handle must not be closed again, possibly from the
+            # thread collecting the Connection
+            self._db = None
             self._closed = True
 
     @classmethod
     def format_to_qmark(cls, query: str, parameters: List) -> str:
-        # return re.compile(r'(?<!%)%s', 0).sub('?', query).replace('%%', '%')
-        try:
-            query = query % tuple('?' for _ in range(len(parameters)))
-        except Exception as e:
-            raise err.ProgrammingError(e) from e
-        return query.replace('%%', '%')
+        """Replaces %s placeholders with ?. String literals and comments
+        are left alone, except that %% stands for % everywhere."""
+        result = []
+        count = 0
+        for kind, text in lexer.tokenize(query):
+            if kind == lexer.PLACEHOLDER:
+                if lexer.placeholder_name(text) is not None:
+                    raise err.ProgrammingError(
+                        "Named placeholder {} needs named parameters".format(
+                            text))
+                count += 1
+                text = "?"
+            elif kind != lexer.OP:
+                text = lexer.unescape_percent(text)
+            result.append(text)
+        if count != len(parameters):
+            raise err.ProgrammingError(
+                "Query has {} placeholders but {} parameters were "
+                "given".format(count, len(parameters)))
+        return "".join(result)
 
     @classmethod
     def pyformat_to_named(cls, query: str, parameters: Dict) -> str:
-        try:
-            query = query % {i: ":" + i for i in parameters.keys()}
-        except Exception as e:
-            raise err.ProgrammingError(e) from e
-        return query
+        """Replaces %(name)s placeholders with :name."""
+        result = []
+        for kind, text in lexer.tokenize(query):
+            if kind == lexer.PLACEHOLDER:
+                name = lexer.placeholder_name(text)
+                if name is None:
+                    raise err.ProgrammingError(
+                        "Placeholder %s needs positional parameters")
+                if name not in parameters:
+                    raise err.ProgrammingError(
+                        "Missing parameter [{}]".format(name))
+                text = ":" + name
+            elif kind != lexer.OP:
+                text = lexer.unescape_percent(text)
+            result.append(text)
+        return "".join(result)
+
+
+def _pragma_value(name: str, value):
+    """Returns value the way PRAGMA name reads it back."""
+    if name == "journal_mode":
+        return str(value).lower()
+    if isinstance(value, str):
+        value = _PRAGMA_NAMES.get(name, {}).get(value.upper(), value)
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
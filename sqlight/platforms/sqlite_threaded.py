@@ -0,0 +1,296 @@
+import os
+import queue
+import threading
+
+from concurrent.futures import Future
+from itertools import islice
+from typing import Callable, Dict, Iterator, List, NoReturn, Sequence
+from urllib.parse import quote
+
+import sqlight.err as err
+import sqlight.lexer as lexer
+
+from sqlight.platforms.db import DB
+from sqlight.platforms.keywords import Platform
+from sqlight.platforms.sqlite import PROFILES, SQLite
+from sqlight.row import Row
+
+# settings a read-only connection can take
+_READER_PRAGMAS = ("cache_size", "mmap_size", "temp_store", "busy_timeout")
+
+
+class _Writer(threading.Thread):
+    """The thread owning the write connection, it runs calls one at a
+    time in submission order."""
+
+    def __init__(self):
+        super().__init__(name="sqlight-sqlite-writer", daemon=True)
+        self.jobs = queue.Queue()
+
+    def call(self, func: Callable, *args, **kwargs):
+        future = Future()
+        self.jobs.put((future, func, args, kwargs))
+        return future.result()
+
+    def stop(self):
+        self.jobs.put(None)
+        self.join()
+
+    def run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            future, func, args, kwargs = job
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+
+class ThreadedSQLite(DB):
+    """SQLite for threaded servers: a pool of up to readers read-only
+    connections and one writer thread owning the only write connection.
+
+    Statements are routed by their first keyword, SELECT/VALUES/EXPLAIN
+    and WITH without data changes read from the pool, everything else runs
+    on the writer. Outside a transaction every write commits on its own.
+    begin() gives the calling thread the writer until commit() or
+    rollback(): its reads go to the writer too, so they see its own
+    writes, and writes of other threads wait.
+
+    Reads only run next to writes with journal_mode WAL, the default
+    here. Select it with sqlite+threaded:///path.db in a dburl, other
+    arguments are those of SQLite. In-memory databases can not be shared
+    between connections and are refused.
+    """
+
+    platform = Platform.SQLite
+    max_parameters = SQLite.max_parameters
+    temp_tables = False  # reads and writes run on different connections
+    autocommit = True  # writes outside begin() commit on their own
+
+    def __init__(self,
+                 database: str = None,
+                 readers: int = None,
+                 journal_mode: str = "WAL",
+                 **kwargs):
+        if not database or database == ":memory:" or \
+                database.startswith("file::memory:"):
+            raise err.ProgrammingError(
+                "ThreadedSQLite needs a database file.")
+        for name in ("autocommit", "isolation_level", "check_same_thread"):
+            kwargs.pop(name, None)
+        self._database = database
+        self.readers = readers or os.cpu_count() or 4
+        self._writer_args = dict(kwargs, journal_mode=journal_mode)
+        # readers take the profile's read-safe pragmas, not the profile
+        pragmas = dict(PROFILES.get(kwargs.get("profile"), {}))
+        pragmas.update((k, v) for k, v in kwargs.items() if v is not None)
+        self._reader_args = {k: v for k, v in pragmas.items()
+                             if k in _READER_PRAGMAS or k in (
+                                 "timeout", "detect_types",
+                                 "translate_cache_size")}
+
+        self._writer = None
+        self._writer_db = None
+        self._idle_readers = queue.LifoQueue()
+        self._all_readers = []
+        self._readers_lock = threading.Lock()
+
+        self._transaction_lock = threading.Lock()
+        self._transaction_owner = None
+        self._local = threading.local()
+
+    @property
+    def in_transaction(self) -> bool:
+        """Whether the calling thread holds the writer."""
+        return self._transaction_owner == threading.get_ident()
+
+    def connect(self) -> NoReturn:
+        self.close()
+        writer = _Writer()
+        writer.start()
+        db = SQLite(self._database, autocommit=True,
+                    check_same_thread=False, **self._writer_args)
+        try:
+            writer.call(db.connect)
+        except BaseException:
+            writer.stop()
+            raise
+        self._writer = writer
+        self._writer_db = db
+
+    def begin(self) -> NoReturn:
+        if self.in_transaction:
+            raise err.ProgrammingError("Transaction already begun.")
+        self._transaction_lock.acquire()
+        try:
+            self._call(self._writer_db.execute_rowcount, "BEGIN IMMEDIATE")
+        except BaseException:
+            self._transaction_lock.release()
+            raise
+        self._transaction_owner = threading.get_ident()
+
+    def commit(self) -> NoReturn:
+        if self.in_transaction:
+            self._end("COMMIT")
+
+    def rollback(self) -> NoReturn:
+        if self.in_transaction:
+            self._end("ROLLBACK")
+
+    def close(self) -> NoReturn:
+        with self._readers_lock:
+            readers, self._all_readers = self._all_readers, []
+            self._idle_readers = queue.LifoQueue()
+        for reader in readers:
+            reader.close()
+        if self._writer is not None:
+            writer, db = self._writer, self._writer_db
+            self._writer = self._writer_db = None
+            try:
+                writer.call(db.close)
+            finally:
+                writer.stop()
+
+    def get_last_executed(self) -> str:
+        return getattr(self._local, "last_executed", None)
+
+    def get_settings(self) -> Dict[str, object]:
+        settings = self._call(self._writer_db.get_settings)
+        settings["readers"] = self.readers
+        return settings
+
+    def iter(self, query: str, *parameters, row_factory: Callable = None,
+             **kwparameters) -> Iterator[Row]:
+        if self._use_writer(query):
+            yield from self.query(query, *parameters,
+                                  row_factory=row_factory, **kwparameters)
+            return
+        reader = self._acquire_reader()
+        try:
+            yield from reader.iter(query, *parameters,
+                                   row_factory=row_factory, **kwparameters)
+        finally:
+            self._release_reader(reader)
+
+    def iter_batches(self, query: str, *parameters, batch_size: int = None,
+                     row_factory: Callable = None,
+                     **kwparameters) -> Iterator[List[Row]]:
+        if self._use_writer(query):
+            rows = iter(self.query(query, *parameters,
+                                   row_factory=row_factory, **kwparameters))
+            batch_size = batch_size or self.itersize
+            batch = list(islice(rows, batch_size))
+            while batch:
+                yield batch
+                batch = list(islice(rows, batch_size))
+            return
+        reader = self._acquire_reader()
+        try:
+            yield from reader.iter_batches(
+                query, *parameters, batch_size=batch_size,
+                row_factory=row_factory, **kwparameters)
+        finally:
+            self._release_reader(reader)
+
+    def query(self, query: str, *parameters, row_factory: Callable = None,
+              **kwparameters) -> List[Row]:
+        return self._route("query", query, parameters,
+                           dict(kwparameters, row_factory=row_factory))
+
+    def query_columns(self, query: str, *parameters, chunk_size: int = None,
+                      **kwparameters) -> Dict[str, Sequence]:
+        return self._route("query_columns", query, parameters,
+                           dict(kwparameters, chunk_size=chunk_size))
+
+    def get(self, query: str, *parameters, row_factory: Callable = None,
+            **kwparameters) -> Row:
+        return self._route("get", query, parameters,
+                           dict(kwparameters, row_factory=row_factory))
+
+    def execute_lastrowid(self, query: str, *parameters,
+                          **kwparameters) -> int:
+        db = self._writer_db
+        lastrowid = self._write(db.execute_lastrowid, query, *parameters,
+                                **kwparameters)
+        self.last_rowcount = db.last_rowcount
+        return lastrowid
+
+    def execute_rowcount(self, query: str, *parameters, **kwparameters) -> int:
+        return self._write(self._writer_db.execute_rowcount, query,
+                           *parameters, **kwparameters)
+
+    def executemany_rowcount(self, query: str, parameters: Iterator) -> int:
+        return self._write(self._writer_db.executemany_rowcount, query,
+                           parameters)
+
+    def _use_writer(self, query: str) -> bool:
+        return self.in_transaction or not lexer.is_read_only(query)
+
+    def _route(self, method: str, query: str, parameters, kwparameters):
+        if self._use_writer(query):
+            return self._write(getattr(self._writer_db, method), query,
+                               *parameters, **kwparameters)
+        reader = self._acquire_reader()
+        try:
+            return getattr(reader, method)(query, *parameters,
+                                           **kwparameters)
+        finally:
+            self._release_reader(reader)
+
+    def _write(self, func: Callable, *args, **kwargs):
+        if self.in_transaction:
+            return self._call(func, *args, **kwargs)
+        # wait for another thread's transaction to end
+        with self._transaction_lock:
+            return self._call(func, *args, **kwargs)
+
+    def _call(self, func: Callable, *args, **kwargs):
+        if self._writer is None:
+            raise err.Error("not connected.")
+        try:
+            return self._writer.call(func, *args, **kwargs)
+        finally:
+            self._local.last_executed = self._writer_db.get_last_executed()
+
+    def _end(self, statement: str):
+        try:
+            self._call(self._writer_db.execute_rowcount, statement)
+        finally:
+            self._transaction_owner = None
+            self._transaction_lock.release()
+
+    def _acquire_reader(self) -> SQLite:
+        if self._writer is None:
+            raise err.Error("not connected.")
+        idle = self._idle_readers
+        try:
+            return idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._readers_lock:
+            create = len(self._all_readers) < self.readers
+            if create:
+                reader = SQLite(
+                    "file:{}?mode=ro".format(quote(self._database)),
+                    uri=True, autocommit=True, check_same_thread=False,
+                    **self._reader_args)
+                self._all_readers.append(reader)
+        if not create:
+            return idle.get()
+        try:
+            reader.connect()
+        except BaseException:
+            with self._readers_lock:
+                self._all_readers.remove(reader)
+            raise
+        return reader
+
+    def _release_reader(self, reader: SQLite):
+        self._local.last_executed = reader.get_last_executed()
+        if reader in self._all_readers:
+            self._idle_readers.put(reader)
@@ -0,0 +1,291 @@
+import threading
+import time
+
+from collections import deque
+from typing import NoReturn, Union
+
+import sqlight.err as err
+
+from sqlight.connection import Connection
+from sqlight.dburl import DBUrl
+
+
+class PooledConnection(Connection):
+    """A Connection checked out of a ConnectionPool.
+
+    ``release``, ``close`` and leaving a ``with`` block hand the connection
+    back to its pool instead of closing the underlying driver.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pool = None
+        self._checked_out = False
+        self._created_at = time.monotonic()
+        self._last_used_at = self._created_at
+
+    def __enter__(self) -> 'PooledConnection':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+    def release(self) -> NoReturn:
+        """Returns the connection to its pool."""
+        if self._checked_out:
+            self._pool.release(self)
+
+    def close(self):
+        """Returns the connection to its pool. Once a pool owns the
+        connection only the pool closes it, so closing a stale reference
+        after ``release`` does nothing."""
+        if self._pool is None:
+            super().close()
+        elif self._checked_out:
+            self._pool.release(self)
+
+
+_DEFAULT_TIMEOUT = object()
+
+
+class ConnectionPool:
+    """A thread-safe pool of connections created from one dburl.
+
+    Args:
+        url: dburl string or DBUrl the connections are created from.
+        min_size: connections opened up front and kept while idle.
+        max_size: upper bound of open connections.
+        timeout: seconds ``acquire`` waits for a free connection,
+            None waits forever.
+        max_idle_time: idle connections older than this are closed,
+            down to ``min_size``.
+        max_lifetime: connections older than this are closed when they
+            come back to the pool or are about to be checked out.
+        validate: run ``SELECT 1`` before handing out an idle connection.
+
+    SQLite connections are bound to the thread that opened them, so add
+    ``check_same_thread=False`` to the url when sharing a pool between
+    threads.
+    """
+
+    def __init__(self,
+                 url: Union[str, DBUrl],
+                 min_size: int = 0,
+                 max_size: int = 10,
+                 timeout: float = 30.0,
+                 max_idle_time: float = 600.0,
+                 max_lifetime: float = 3600.0,
+                 validate: bool = False):
+        if isinstance(url, DBUrl):
+            url = url.raw_url
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise err.ProgrammingError(
+                "Invalid pool size min_size={} max_size={}".format(
+                    min_size, max_size))
+
+        self.url = url
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle_time = max_idle_time
+        self.max_lifetime = max_lifetime
+        self.validate = validate
+
+        self._idle = deque()  # right end is the most recently used
+        self._size = 0  # idle + checked out + being opened
+        self._cond = threading.Condition(threading.Lock())
+        self._closed = False
+        self.fill()
+
+    def __enter__(self) -> 'ConnectionPool':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def size(self) -> int:
+        """Number of open connections, idle or checked out."""
+        return self._size
+
+    @property
+    def available(self) -> int:
+        """Number of idle connections."""
+        return len(self._idle)
+
+    def acquire(self, timeout: float = _DEFAULT_TIMEOUT) -> PooledConnection:
+        """Checks out a connection, waiting at most ``timeout`` seconds
+        (the pool's timeout by default, forever when None).
+        Raises:
+            PoolTimeoutError: when no connection got free in time.
+            InterfaceError: when the pool is closed.
+        """
+        if timeout is _DEFAULT_TIMEOUT:
+            timeout = self.timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            conn, expired = self._checkout(deadline)
+            self._close_expired(expired)
+            if conn is None:
+                conn = self._open_reserved()
+            elif self.validate and not self._is_alive(conn):
+                self._discard(conn)
+                continue
+            conn._checked_out = True
+            return conn
+
+    def release(self, conn: PooledConnection) -> NoReturn:
+        """Returns a checked out connection to the pool."""
+        if conn._pool is not self or not conn._checked_out:
+            raise err.ProgrammingError("Connection is not checked out here.")
+        conn._checked_out = False
+
+        if not self._reset(conn):
+            self._discard(conn)
+            return
+
+        now = time.monotonic()
+        expired = []
+        with self._cond:
+            if self._closed or self._is_too_old(conn, now):
+                self._size -= 1
+                expired.append(conn)
+            else:
+                conn._last_used_at = now
+                self._idle.append(conn)
+            expired.extend(self._evict_idle(now))
+            self._cond.notify()
+        self._close_expired(expired)
+
+    def fill(self) -> NoReturn:
+        """Evicts expired idle connections and opens new ones until
+        ``min_size`` connections exist."""
+        with self._cond:
+            expired = self._evict_idle(time.monotonic())
+        for c in expired:
+            self._close_connection(c)
+
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            conn = self._open_reserved()
+            with self._cond:
+                self._idle.append(conn)
+                self._cond.notify()
+
+    def close(self) -> NoReturn:
+        """Closes idle connections; checked out connections are closed
+        when they are released."""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for c in idle:
+            self._close_connection(c)
+
+    def _checkout(self, deadline):
+        """Pops an idle connection, or reserves a slot for a new one when
+        None is returned."""
+        expired = []
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise err.InterfaceError("Connection pool is closed.")
+                now = time.monotonic()
+                while self._idle:
+                    conn = self._idle.pop()
+                    if self._is_too_old(conn, now) or (
+                            self._size > self.min_size and
+                            now - conn._last_used_at > self.max_idle_time):
+                        self._size -= 1
+                        expired.append(conn)
+                        continue
+                    return conn, expired
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None, expired
+
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        break
+                self._cond.wait(remaining)
+
+        self._close_expired(expired)
+        raise err.PoolTimeoutError(
+            "Timed out waiting for a connection from the pool.")
+
+    def _open_reserved(self) -> PooledConnection:
+        """Opens a connection for a slot already counted in ``_size``."""
+        try:
+            conn = PooledConnection.create_from_dburl(self.url)
+            conn.connect()
+        except BaseException:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        conn._pool = self
+        return conn
+
+    def _evict_idle(self, now: float) -> list:
+        """Removes idle connections past their lifetime, and those idle
+        for too long while above ``min_size``. Must hold the lock."""
+        expired = []
+        for conn in list(self._idle):
+            if self._is_too_old(conn, now) or (
+                    self._size > self.min_size and
+                    now - conn._last_used_at > self.max_idle_time):
+                self._idle.remove(conn)
+                self._size -= 1
+                expired.append(conn)
+        return expired
+
+    def _is_too_old(self, conn: PooledConnection, now: float) -> bool:
+        return now - conn._created_at > self.max_lifetime
+
+    def _is_alive(self, conn: PooledConnection) -> bool:
+        try:
+            conn.get("SELECT 1")
+        except err.Error:
+            return False
+        return True
+
+    def _reset(self, conn: PooledConnection) -> bool:
+        """Rolls back whatever the borrower left open. sqlite3 refuses a
+        ROLLBACK outside a transaction, other drivers do not mind it."""
+        raw = getattr(conn._db, "_db", None)
+        if getattr(raw, "in_transaction", None) is False:
+            return True
+        try:
+            conn.rollback()
+        except err.Error:
+            return False
+        return True
+
+    def _discard(self, conn: PooledConnection) -> NoReturn:
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+        self._close_connection(conn)
+
+    def _close_expired(self, expired: list) -> NoReturn:
+        """Closes evicted connections, then tops the pool back up to
+        ``min_size``."""
+        for c in expired:
+            self._close_connection(c)
+        if expired and self._size < self.min_size:
+            self.fill()
+
+    def _close_connection(self, conn: PooledConnection) -> NoReturn:
+        conn._checked_out = False
+        try:
+            Connection.close(conn)
+        except err.Error:
+            pass
@@ -0,0 +1,282 @@
+import itertools
+import threading
+import time
+
+from typing import Callable, Dict, Iterable, Iterator, List, NoReturn, \
+    Sequence, Union
+
+import sqlight.err as err
+
+from sqlight.dburl import DBUrl
+from sqlight.pool import ConnectionPool, PooledConnection
+from sqlight.row import Row
+
+ROUND_ROBIN = "round_robin"
+LEAST_OUTSTANDING = "least_outstanding"
+
+
+class _Replica:
+
+    def __init__(self, pool: ConnectionPool):
+        self.pool = pool
+        self.outstanding = 0  # reads running on it
+        self.ejected_until = 0.0
+
+
+class RoutingConnection:
+    """Splits reads and writes between a primary and its replicas.
+
+    query/get/iter/iter_batches/query_columns go to a replica picked by
+    balance, ROUND_ROBIN or LEAST_OUTSTANDING. Writes go to the primary.
+    Outside begin() each write commits on its own. Between begin() and
+    commit()/rollback() every statement of the calling thread runs on
+    one primary connection.
+
+    After a write, the thread reads from the primary for sticky_window
+    seconds so it sees its own writes despite replication lag. A replica
+    raising OperationalError is skipped for eject_time seconds and the
+    read is retried elsewhere, the primary being the last resort. A
+    replica whose pool times out is only passed over for that read.
+
+    Every url gets a ConnectionPool built with pool_kwargs, so one
+    RoutingConnection can be shared by threads.
+    """
+
+    def __init__(self,
+                 primary: Union[str, DBUrl],
+                 replicas: Sequence[Union[str, DBUrl]] = (),
+                 balance: str = ROUND_ROBIN,
+                 sticky_window: float = 1.0,
+                 eject_time: float = 30.0,
+                 **pool_kwargs):
+        if balance not in (ROUND_ROBIN, LEAST_OUTSTANDING):
+            raise err.ProgrammingError(
+                "Unknown balance [{}]".format(balance))
+        self.balance = balance
+        self.sticky_window = sticky_window
+        self.eject_time = eject_time
+
+        self.primary = ConnectionPool(primary, **pool_kwargs)
+        self.replicas = [_Replica(ConnectionPool(url, **pool_kwargs))
+                         for url in replicas]
+        self._next = itertools.count()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def __enter__(self) -> 'RoutingConnection':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def connect(self) -> NoReturn:
+        """Opens the pools' min_size connections, others open on use."""
+        self.primary.fill()
+        for replica in self.replicas:
+            replica.pool.fill()
+
+    def begin(self) -> NoReturn:
+        """Pins the thread to a primary connection until commit or
+        rollback."""
+        if self._transaction() is not None:
+            raise err.ProgrammingError("Transaction already begun.")
+        conn = self.primary.acquire()
+        try:
+            conn.begin()
+        except BaseException:
+            conn.release()
+            raise
+        self._local.transaction = conn
+
+    def commit(self) -> NoReturn:
+        self._end(PooledConnection.commit)
+
+    def rollback(self) -> NoReturn:
+        self._end(PooledConnection.rollback)
+
+    def iter(self, query: str, *parameters, row_factory: Callable = None,
+             **kwparameters) -> Iterator[Row]:
+        """Returns an iterator for the given query and parameters."""
+        conn, replica = self._read_connection()
+        try:
+            yield from conn.iter(query, *parameters,
+                                 row_factory=row_factory, **kwparameters)
+        except err.OperationalError:
+            self._eject(replica)
+            raise
+        finally:
+            self._done(conn, replica)
+
+    def iter_batches(self, query: str, *parameters, batch_size: int = None,
+                     row_factory: Callable = None,
+                     **kwparameters) -> Iterator[List[Row]]:
+        conn, replica = self._read_connection()
+        try:
+            yield from conn.iter_batches(
+                query, *parameters, batch_size=batch_size,
+                row_factory=row_factory, **kwparameters)
+        except err.OperationalError:
+            self._eject(replica)
+            raise
+        finally:
+            self._done(conn, replica)
+
+    def query(self, query: str, *parameters, row_factory: Callable = None,
+              **kwparameters) -> List[Row]:
+        """Returns a row list for the given query and parameters."""
+        return self._read("query", query, parameters,
+                          dict(kwparameters, row_factory=row_factory))
+
+    def query_columns(self, query: str, *parameters, chunk_size: int = None,
+                      **kwparameters) -> Dict[str, Sequence]:
+        return self._read("query_columns", query, parameters,
+                          dict(kwparameters, chunk_size=chunk_size))
+
+    def get(self, query: str, *parameters, row_factory: Callable = None,
+            **kwparameters) -> Row:
+        """Returns the (singular) row returned by the given query.
+        If the query has no results, returns None.  If it has
+        more than one result, raises an exception.
+        """
+        return self._read("get", query, parameters,
+                          dict(kwparameters, row_factory=row_factory))
+
+    def execute(self, query: str, *parameters, **kwparameters) -> NoReturn:
+        """Executes the given query."""
+        return self.execute_lastrowid(query, *parameters, **kwparameters)
+
+    def execute_lastrowid(self, query: str, *parameters,
+                          **kwparameters) -> int:
+        """Executes the given query, returning the lastrowid from the query."""
+        return self._write("execute_lastrowid", query, *parameters,
+                           **kwparameters)
+
+    def execute_rowcount(self, query: str, *parameters, **kwparameters) -> int:
+        """Executes the given query, returning the rowcount from the query."""
+        return self._write("execute_rowcount", query, *parameters,
+                           **kwparameters)
+
+    def executemany(self, query: str, parameters: Iterator[Dict]) -> int:
+        """Executes the given query against all the given param sequences.
+        We return the rowcount from the query.
+        """
+        return self._write("executemany", query, parameters)
+
+    def executemany_stream(self, query: str, parameters: Iterable,
+                           *args, **kwargs) -> int:
+        return self._write("executemany_stream", query, parameters,
+                           *args, **kwargs)
+
+    def copy_from(self, table: str, rows: Iterator,
+                  columns: List[str] = None) -> int:
+        return self._write("copy_from", table, rows, columns)
+
+    def close(self):
+        """Closes the pools."""
+        self.primary.close()
+        for replica in self.replicas:
+            replica.pool.close()
+
+    def get_last_executed(self):
+        """Get the statement the calling thread executed last."""
+        return getattr(self._local, "last_executed", None)
+
+    update = delete = execute_rowcount
+    updatemany = executemany
+    insert = execute_lastrowid
+    insertmany = executemany
+
+    def _transaction(self) -> PooledConnection:
+        return getattr(self._local, "transaction", None)
+
+    def _end(self, method: Callable):
+        conn = self._transaction()
+        if conn is None:
+            raise err.ProgrammingError("No transaction begun.")
+        try:
+            method(conn)
+            self._local.last_write = time.monotonic()
+        finally:
+            self._local.transaction = None
+            conn.release()
+
+    def _write(self, method: str, *args, **kwargs):
+        conn = self._transaction()
+        if conn is not None:
+            try:
+                return getattr(conn, method)(*args, **kwargs)
+            finally:
+                self._local.last_executed = conn.get_last_executed()
+
+        with self.primary.acquire() as conn:
+            try:
+                result = getattr(conn, method)(*args, **kwargs)
+                conn.commit()
+            finally:
+                self._local.last_executed = conn.get_last_executed()
+                self._local.last_write = time.monotonic()
+        return result
+
+    def _read(self, method: str, query: str, parameters, kwparameters):
+        tried = set()
+        while True:
+            conn, replica = self._read_connection(tried)
+            try:
+                return getattr(conn, method)(query, *parameters,
+                                             **kwparameters)
+            except err.OperationalError:
+                if replica is None:
+                    raise
+                self._eject(replica)
+                tried.add(replica)
+            finally:
+                self._done(conn, replica)
+
+    def _read_connection(self, tried=()):
+        """Returns the connection for a read and the replica it belongs
+        to, None for the primary."""
+        conn = self._transaction()
+        if conn is not None:
+            return conn, None
+        last_write = getattr(self._local, "last_write", None)
+        replica = None
+        if last_write is None or \
+                time.monotonic() - last_write >= self.sticky_window:
+            replica = self._pick_replica(tried)
+        if replica is None:
+            return self.primary.acquire(), None
+        try:
+            return replica.pool.acquire(), replica
+        except err.OperationalError as e:
+            # a full pool means a busy replica, not a broken one
+            if not isinstance(e, err.PoolTimeoutError):
+                self._eject(replica)
+            with self._lock:
+                replica.outstanding -= 1
+            return self._read_connection(set(tried) | {replica})
+
+    def _pick_replica(self, tried) -> _Replica:
+        now = time.monotonic()
+        with self._lock:
+            healthy = [r for r in self.replicas
+                       if r.ejected_until <= now and r not in tried]
+            if not healthy:
+                return None
+            if self.balance == LEAST_OUTSTANDING:
+                replica = min(healthy, key=lambda r: r.outstanding)
+            else:
+                replica = healthy[next(self._next) % len(healthy)]
+            replica.outstanding += 1
+        return replica
+
+    def _done(self, conn: PooledConnection, replica: _Replica):
+        self._local.last_executed = conn.get_last_executed()
+        if replica is not None:
+            with self._lock:
+                replica.outstanding -= 1
+        if conn is not self._transaction():
+            conn.release()
+
+    def _eject(self, replica: _Replica):
+        if replica is not None:
+            replica.ejected_until = time.monotonic() + self.eject_time
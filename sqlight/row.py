@@ -1,4 +1,9 @@
-from typing import List
+from collections import namedtuple
+from functools import lru_cache
+from typing import (Callable, Dict, Iterator, KeysView, List, Sequence,
+                    Tuple)
+
+from sqlight.err import ProgrammingError
 
 
 class Row(dict):
@@ -26,6 +31,12 @@ class Row(dict):
             return
         self._row_original[name] = self[name]
 
+    def __copy__(self) -> 'Row':
+        row = type(self)(self)
+        if self._row_original is not None:
+            dict.__setattr__(row, "_row_original", dict(self._row_original))
+        return row
+
     def __getattr__(self, name):
         try:
             return self[name]
@@ -40,3 +51,181 @@ class Row(dict):
             raise AttributeError(name)
         self._before_change_value(name, value)
         super().__setitem__(name, value)
+
+
+class CompactRow:
+    """A read-mostly row backed by the driver tuple.
+
+    All rows of a result set share one column name to index map, so a row
+    costs one small object instead of a dict. Access and change tracking
+    work as they do on Row.
+    """
+
+    __slots__ = ("_index", "_values", "_row_original")
+
+    def __init__(self, index: Dict[str, int], values: Sequence):
+        object.__setattr__(self, "_index", index)
+        object.__setattr__(self, "_values", values)
+
+    def get_changed(self) -> List[str]:
+        result = []
+        original = getattr(self, "_row_original", None)
+        if original is None:
+            return result
+
+        for k, v in original.items():
+            if v != self[k]:
+                result.append(k)
+
+        return result
+
+    def keys(self) -> KeysView:
+        return self._index.keys()
+
+    def values(self) -> List:
+        return list(self._values)
+
+    def items(self) -> List[Tuple[str, object]]:
+        return list(zip(self._index, self._values))
+
+    def get(self, name: str, default=None):
+        i = self._index.get(name)
+        if i is None:
+            return default
+        return self._values[i]
+
+    def __getitem__(self, name: str):
+        return self._values[self._index[name]]
+
+    def __getattr__(self, name):
+        try:
+            return self._values[self._index[name]]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        self.__setitem__(name, value)
+
+    def __setitem__(self, name, value):
+        i = self._index.get(name)
+        if i is None:
+            raise AttributeError(name)
+        values = self._values
+        if values[i] == value:
+            return
+        original = getattr(self, "_row_original", None)
+        if original is None:
+            original = {}
+            object.__setattr__(self, "_row_original", original)
+        if name not in original:
+            original[name] = values[i]
+        if not isinstance(values, list):
+            values = list(values)
+            object.__setattr__(self, "_values", values)
+        values[i] = value
+
+    def __copy__(self) -> 'CompactRow':
+        values = self._values
+        row = type(self)(self._index,
+                         list(values) if isinstance(values, list) else values)
+        original = getattr(self, "_row_original", None)
+        if original is not None:
+            object.__setattr__(row, "_row_original", dict(original))
+        return row
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, name) -> bool:
+        return name in self._index
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, CompactRow):
+            return self.items() == other.items()
+        if isinstance(other, dict):
+            return dict(self.items()) == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return "{}({!r})".format(type(self).__name__, dict(self.items()))
+
+
+def default_row_factory(column_names: List[str]) -> Callable[[Sequence], Row]:
+    """Builds a Row per driver tuple."""
+    def build(row):
+        return Row(zip(column_names, row))
+    return build
+
+
+def compact_row_factory(
+        column_names: List[str]) -> Callable[[Sequence], CompactRow]:
+    """Builds a CompactRow per driver tuple, all sharing one index map."""
+    index = {name: i for i, name in enumerate(column_names)}
+
+    def build(row):
+        return CompactRow(index, row)
+    return build
+
+
+def tuple_factory(column_names: List[str]) -> Callable[[Sequence], tuple]:
+    """Returns the driver rows as plain tuples."""
+    return tuple
+
+
+def dict_factory(column_names: List[str]) -> Callable[[Sequence], dict]:
+    """Builds a plain dict per driver tuple."""
+    def build(row):
+        return dict(zip(column_names, row))
+    return build
+
+
+def namedtuple_factory(column_names: List[str]) -> Callable[[Sequence], tuple]:
+    """Builds namedtuples, one class per column signature. Column names
+    that are not identifiers are renamed to _0, _1, ..."""
+    return _namedtuple_class(tuple(column_names))._make
+
+
+@lru_cache(maxsize=256)
+def _namedtuple_class(column_names: Tuple[str]) -> type:
+    return namedtuple("Row", column_names, rename=True)
+
+
+@lru_cache(maxsize=256)
+def dataclass_factory(cls: type) -> Callable[[List[str]], Callable]:
+    """Returns a row_factory building instances of the dataclass cls.
+    Every column must be an init field of cls. The constructor call is
+    compiled once per column list, and cls always gets the same factory,
+    so results cached by factory are found again."""
+    import dataclasses
+
+    if not dataclasses.is_dataclass(cls) or not isinstance(cls, type):
+        raise ProgrammingError("{!r} is not a dataclass".format(cls))
+
+    def factory(column_names):
+        return _dataclass_builder(cls, tuple(column_names))
+    return factory
+
+
+@lru_cache(maxsize=256)
+def _dataclass_builder(cls: type, column_names: Tuple[str]) -> Callable:
+    import dataclasses
+
+    fields = {f.name for f in dataclasses.fields(cls) if f.init}
+    if len(set(column_names)) != len(column_names):
+        raise ProgrammingError(
+            "Duplicate column names {}".format(column_names))
+    for name in column_names:
+        if name not in fields:
+            raise ProgrammingError(
+                "Column [{}] is not a field of {}".format(
+                    name, cls.__name__))
+    args = ", ".join("{}=row[{}]".format(name, i)
+                     for i, name in enumerate(column_names))
+    namespace = {"cls": cls}
+    exec("def build(row):\n    return cls({})".format(args), namespace)
+    return namespace["build"]
@@ -0,0 +1,219 @@
+import queue
+import threading
+
+from typing import Callable, Iterator, List, Tuple, Union
+
+import sqlight.err as err
+
+from sqlight.connection import Connection
+from sqlight.dburl import DBUrl
+from sqlight.row import Row
+
+RANGE = "range"
+QUANTILE = "quantile"
+
+_DONE = object()  # end of a partition
+
+
+def parallel_scan(url: Union[str, DBUrl],
+                  table: str,
+                  key: str,
+                  parallelism: int = 4,
+                  columns: str = "*",
+                  where: str = None,
+                  partitioning: str = RANGE,
+                  ordered: bool = False,
+                  batch_size: int = 1000,
+                  queue_size: int = 4,
+                  row_factory: Callable = None) -> Iterator[Row]:
+    """Reads table on parallelism connections at once, each scanning one
+    range of key, and yields the rows of all of them.
+
+    RANGE partitioning splits [min(key), max(key)] of an integer key into
+    equal spans. QUANTILE splits any ordered key at values that cut the
+    table into parts of equal row count. Rows with a NULL key are not
+    read. table, key, columns and where are put into the SQL as they are.
+
+    Every partition runs on its own thread and connection from url, and
+    hands batches of batch_size rows over a queue of at most queue_size
+    batches, so at most parallelism * (queue_size + 1) batches are held.
+    Rows come as they arrive, or in key order when ordered is True.
+    Closing the generator early stops the scan.
+    """
+    if isinstance(url, DBUrl):
+        url = url.raw_url
+    if parallelism < 1:
+        raise err.ProgrammingError("parallelism must be at least 1.")
+    condition = "({})".format(where) if where else None
+
+    conn = Connection.create_from_dburl(url)
+    conn.connect()
+    try:
+        if partitioning == RANGE:
+            bounds = _range_bounds(conn, table, key, condition, parallelism)
+        elif partitioning == QUANTILE:
+            bounds = _quantile_bounds(conn, table, key, condition,
+                                      parallelism)
+        else:
+            raise err.ProgrammingError(
+                "Unknown partitioning [{}]".format(partitioning))
+    finally:
+        conn.close()
+    if not bounds:
+        return
+
+    scan = _Scan(url, table, key, columns, condition, bounds, ordered,
+                 batch_size, queue_size, row_factory)
+    yield from scan.rows()
+
+
+def _range_bounds(conn: Connection, table: str, key: str, condition: str,
+                  parallelism: int) -> List[Tuple]:
+    row = conn.get("SELECT MIN({0}) AS lo, MAX({0}) AS hi FROM {1}{2}".format(
+        key, table, " WHERE " + condition if condition else ""))
+    lo, hi = row["lo"], row["hi"]
+    if lo is None:
+        return []
+    if not isinstance(lo, int) or not isinstance(hi, int):
+        raise err.ProgrammingError(
+            "RANGE partitioning needs an integer key, use QUANTILE.")
+    span = hi - lo + 1
+    parallelism = min(parallelism, span)
+    cuts = [lo + span * i // parallelism for i in range(1, parallelism)]
+    return _bounds_from_cuts(cuts)
+
+
+def _quantile_bounds(conn: Connection, table: str, key: str, condition: str,
+                     parallelism: int) -> List[Tuple]:
+    where = " WHERE {} IS NOT NULL".format(key)
+    if condition:
+        where += " AND " + condition
+    count = conn.get("SELECT COUNT(*) AS n FROM {}{}".format(
+        table, where))["n"]
+    if not count:
+        return []
+    cuts = []
+    for i in range(1, min(parallelism, count)):
+        row = conn.get("SELECT {0} AS k FROM {1}{2} ORDER BY {0} "
+                       "LIMIT 1 OFFSET {3}".format(
+                           key, table, where, count * i // parallelism))
+        if not cuts or row["k"] > cuts[-1]:
+            cuts.append(row["k"])
+    return _bounds_from_cuts(cuts)
+
+
+def _bounds_from_cuts(cuts: List) -> List[Tuple]:
+    """Turns cut values into (lower, upper) pairs, None meaning open."""
+    edges = [None] + cuts + [None]
+    return list(zip(edges[:-1], edges[1:]))
+
+
+class _Scan:
+    """The partition threads of one parallel_scan and their queues."""
+
+    def __init__(self, url, table, key, columns, condition, bounds,
+                 ordered, batch_size, queue_size, row_factory):
+        self.url = url
+        self.ordered = ordered
+        self.batch_size = batch_size
+        self.row_factory = row_factory
+        self.queues = [queue.Queue(queue_size) for _ in bounds]
+        # released once per batch put on any queue
+        self.ready = threading.Semaphore(0)
+        self.stopped = threading.Event()
+        self.threads = [
+            threading.Thread(
+                target=self._run, name="sqlight-scan-{}".format(i),
+                args=(self.queues[i],
+                      *self._statement(table, key, columns, condition,
+                                       lower, upper)),
+                daemon=True)
+            for i, (lower, upper) in enumerate(bounds)]
+
+    def _statement(self, table, key, columns, condition, lower, upper):
+        predicates = ["{} IS NOT NULL".format(key)]
+        parameters = []
+        if lower is not None:
+            predicates.append("{} >= %s".format(key))
+            parameters.append(lower)
+        if upper is not None:
+            predicates.append("{} < %s".format(key))
+            parameters.append(upper)
+        if condition:
+            predicates.append(condition)
+        query = "SELECT {} FROM {} WHERE {}".format(
+            columns, table, " AND ".join(predicates))
+        if self.ordered:
+            query += " ORDER BY {}".format(key)
+        return query, parameters
+
+    def rows(self) -> Iterator[Row]:
+        for t in self.threads:
+            t.start()
+        try:
+            batches = self._ordered() if self.ordered else self._unordered()
+            for batch in batches:
+                yield from batch
+        finally:
+            self.stopped.set()
+            for t in self.threads:
+                t.join()
+
+    def _ordered(self) -> Iterator[List[Row]]:
+        # partitions are disjoint key ranges in key order
+        for q in self.queues:
+            while True:
+                item = q.get()
+                self.ready.acquire()
+                if item is _DONE:
+                    break
+                yield self._check(item)
+
+    def _unordered(self) -> Iterator[List[Row]]:
+        active = list(self.queues)
+        while active:
+            self.ready.acquire()
+            for q in active:
+                try:
+                    item = q.get_nowait()
+                except queue.Empty:
+                    continue
+                if item is _DONE:
+                    active.remove(q)
+                else:
+                    yield self._check(item)
+                break
+
+    @staticmethod
+    def _check(item):
+        if isinstance(item, BaseException):
+            raise item
+        return item
+
+    def _run(self, q: queue.Queue, query: str, parameters: List):
+        try:
+            conn = Connection.create_from_dburl(self.url)
+            conn.connect()
+            try:
+                for batch in conn.iter_batches(
+                        query, *parameters, batch_size=self.batch_size,
+                        row_factory=self.row_factory):
+                    if not self._put(q, batch):
+                        return
+            finally:
+                conn.close()
+        except Exception as e:
+            self._put(q, e)
+        self._put(q, _DONE)
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        """Blocks until item fits in q, returns False if the scan was
+        stopped meanwhile."""
+        while not self.stopped.is_set():
+            try:
+                q.put(item, timeout=0.1)
+            except queue.Full:
+                continue
+            self.ready.release()
+            return True
+        return False
@@ -0,0 +1,169 @@
+import zlib
+
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, islice
+from typing import Callable, Dict, Iterator, List, NoReturn, Sequence, Union
+
+import sqlight.err as err
+
+from sqlight.dburl import DBUrl
+from sqlight.pool import ConnectionPool, PooledConnection
+from sqlight.row import Row
+
+
+def crc32_shard(key, shard_count: int) -> int:
+    """The default shard function, stable across processes unlike
+    hash()."""
+    if not isinstance(key, bytes):
+        key = str(key).encode("utf-8")
+    return zlib.crc32(key) % shard_count
+
+
+class ShardedConnection:
+    """Routes statements to one of several databases by shard key.
+
+    shard_func(shard_key, shard_count) returns the index in urls of the
+    shard holding shard_key, crc32_shard by default. Every statement
+    takes shard_key= and runs on a connection of that shard's
+    ConnectionPool, writes commit on their own. For several statements in
+    one transaction use connection(shard_key).
+
+    query_all_shards runs a query on every shard at once on a pool of
+    max_workers threads and merges the rows.
+    """
+
+    def __init__(self,
+                 urls: Sequence[Union[str, DBUrl]],
+                 shard_func: Callable = crc32_shard,
+                 max_workers: int = None,
+                 **pool_kwargs):
+        if not urls:
+            raise err.ProgrammingError("At least one shard url is required.")
+        self.shard_func = shard_func
+        self.pools = [ConnectionPool(url, **pool_kwargs) for url in urls]
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or len(self.pools),
+            thread_name_prefix="sqlight-shard")
+
+    def __enter__(self) -> 'ShardedConnection':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def shard_count(self) -> int:
+        return len(self.pools)
+
+    def shard_for(self, shard_key) -> int:
+        """Returns the index of the shard holding shard_key."""
+        if shard_key is None:
+            raise err.ProgrammingError("shard_key is required.")
+        shard = self.shard_func(shard_key, len(self.pools))
+        if not 0 <= shard < len(self.pools):
+            raise err.ProgrammingError(
+                "shard_func returned shard {} of {}".format(
+                    shard, len(self.pools)))
+        return shard
+
+    def connection(self, shard_key) -> PooledConnection:
+        """Checks out a connection of shard_key's shard, give it back
+        with release() or a with block."""
+        return self.pools[self.shard_for(shard_key)].acquire()
+
+    def query(self, query: str, *parameters, shard_key=None,
+              row_factory: Callable = None, **kwparameters) -> List[Row]:
+        """Returns a row list for the given query and parameters."""
+        with self.connection(shard_key) as conn:
+            return conn.query(query, *parameters, row_factory=row_factory,
+                              **kwparameters)
+
+    def get(self, query: str, *parameters, shard_key=None,
+            row_factory: Callable = None, **kwparameters) -> Row:
+        """Returns the (singular) row returned by the given query.
+        If the query has no results, returns None.  If it has
+        more than one result, raises an exception.
+        """
+        with self.connection(shard_key) as conn:
+            return conn.get(query, *parameters, row_factory=row_factory,
+                            **kwparameters)
+
+    def iter(self, query: str, *parameters, shard_key=None,
+             row_factory: Callable = None, **kwparameters) -> Iterator[Row]:
+        """Returns an iterator for the given query and parameters."""
+        with self.connection(shard_key) as conn:
+            yield from conn.iter(query, *parameters,
+                                 row_factory=row_factory, **kwparameters)
+
+    def execute(self, query: str, *parameters, shard_key=None,
+                **kwparameters) -> NoReturn:
+        """Executes the given query."""
+        return self.execute_lastrowid(query, *parameters,
+                                      shard_key=shard_key, **kwparameters)
+
+    def execute_lastrowid(self, query: str, *parameters, shard_key=None,
+                          **kwparameters) -> int:
+        """Executes the given query, returning the lastrowid from the query."""
+        return self._write(shard_key, "execute_lastrowid", query,
+                           *parameters, **kwparameters)
+
+    def execute_rowcount(self, query: str, *parameters, shard_key=None,
+                         **kwparameters) -> int:
+        """Executes the given query, returning the rowcount from the query."""
+        return self._write(shard_key, "execute_rowcount", query,
+                           *parameters, **kwparameters)
+
+    def executemany(self, query: str, parameters: Iterator[Dict],
+                    shard_key=None) -> int:
+        """Executes the given query against all the given param sequences
+        on one shard. We return the rowcount from the query.
+        """
+        return self._write(shard_key, "executemany", query, parameters)
+
+    update = delete = execute_rowcount
+    updatemany = executemany
+    insert = execute_lastrowid
+    insertmany = executemany
+
+    def query_all_shards(self, query: str, *parameters,
+                         order_by: Union[str, int, Callable] = None,
+                         reverse: bool = False, limit: int = None,
+                         row_factory: Callable = None,
+                         **kwparameters) -> List[Row]:
+        """Runs query on every shard in parallel and returns the rows of
+        all shards, in shard order unless order_by is given.
+        order_by is a column name or index, or a key function of a row.
+        limit cuts the merged rows, put a LIMIT in query as well so every
+        shard only sends that many.
+        """
+        futures = [self._executor.submit(self._query_shard, pool, query,
+                                         parameters, row_factory,
+                                         kwparameters)
+                   for pool in self.pools]
+        results = [f.result() for f in futures]
+
+        rows = chain.from_iterable(results)
+        if order_by is not None:
+            key = order_by if callable(order_by) else \
+                lambda row: row[order_by]
+            rows = sorted(rows, key=key, reverse=reverse)
+        return list(islice(rows, limit))
+
+    def close(self):
+        """Closes the thread pool and the shards' pools."""
+        self._executor.shutdown(wait=True)
+        for pool in self.pools:
+            pool.close()
+
+    def _write(self, shard_key, method: str, *args, **kwargs):
+        with self.connection(shard_key) as conn:
+            result = getattr(conn, method)(*args, **kwargs)
+            conn.commit()
+            return result
+
+    @staticmethod
+    def _query_shard(pool: ConnectionPool, query: str, parameters,
+                     row_factory: Callable, kwparameters: Dict) -> List[Row]:
+        with pool.acquire() as conn:
+            return conn.query(query, *parameters, row_factory=row_factory,
+                              **kwparameters)
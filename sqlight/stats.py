@@ -0,0 +1,207 @@
+import logging
+import math
+import re
+import threading
+
+from collections import OrderedDict
+from typing import Dict, List
+
+import sqlight.lexer as lexer
+
+from sqlight.events import ExecuteEvent, Listener
+
+slow_logger = logging.getLogger("sqlight.slow")
+
+_FINGERPRINT_CACHE_SIZE = 4096
+
+_SPACES_RE = re.compile(r"\s+")
+_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_ROWS_RE = re.compile(r"\(\?\+\)(?:\s*,\s*\(\?\+\))+")
+
+
+def fingerprint(query: str) -> str:
+    """Normalizes query so that statements differing only in literals
+    share a fingerprint: literals and placeholders become ?, IN lists and
+    multi-row VALUES collapse to one item, comments are dropped, words
+    are lowercased and whitespace is squeezed."""
+    result = []
+    for kind, text in lexer.tokenize(query):
+        if kind in (lexer.SPACE, lexer.COMMENT):
+            text = " "
+        elif kind in (lexer.STRING, lexer.NUMBER, lexer.PLACEHOLDER):
+            text = "?"
+        elif kind == lexer.WORD:
+            text = text.lower()
+        result.append(text)
+    normalized = _SPACES_RE.sub(" ", "".join(result)).strip()
+    normalized = _LIST_RE.sub("(?+)", normalized)
+    return _ROWS_RE.sub("(?+)", normalized)
+
+
+class Histogram:
+    """Latency histogram with logarithmic buckets, growth apart, from
+    1 microsecond to about 3 minutes. Percentiles are bucket upper bounds,
+    so they err by at most growth - 1 relative."""
+
+    __slots__ = ("counts",)
+
+    low = 1e-6
+    growth = 1.1
+    size = 200
+
+    _log_growth = math.log(growth)
+
+    def __init__(self):
+        self.counts = [0] * self.size
+
+    def add(self, seconds: float):
+        if seconds <= self.low:
+            index = 0
+        else:
+            index = min(int(math.log(seconds / self.low) / self._log_growth)
+                        + 1, self.size - 1)
+        self.counts[index] += 1
+
+    def percentile(self, p: float) -> float:
+        """Returns the duration below which p percent of the samples
+        fall, None without samples."""
+        total = sum(self.counts)
+        if not total:
+            return None
+        rank = math.ceil(total * p / 100.0)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.low * self.growth ** index
+        return self.low * self.growth ** (self.size - 1)
+
+
+class StatementStats:
+    """Counters of one statement fingerprint."""
+
+    __slots__ = ("fingerprint", "count", "errors", "total_time", "max_time",
+                 "rows", "histogram", "example")
+
+    def __init__(self, fingerprint: str, example: str):
+        self.fingerprint = fingerprint
+        self.example = example  # the first SQL seen for the fingerprint
+        self.count = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.rows = 0
+        self.histogram = Histogram()
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / self.count if self.count else 0.0
+
+    def percentile(self, p: float) -> float:
+        return self.histogram.percentile(p)
+
+    def as_dict(self) -> Dict:
+        return {
+            "fingerprint": self.fingerprint,
+            "count": self.count,
+            "errors": self.errors,
+            "total_time": self.total_time,
+            "mean_time": self.mean_time,
+            "max_time": self.max_time,
+            "rows": self.rows,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
+
+class StatsCollector(Listener):
+    """Execution listener aggregating statements by fingerprint.
+
+    Register it with Connection.add_listener, one collector can serve
+    several connections. Statements slower than slow_threshold seconds
+    are logged to the "sqlight.slow" logger at WARNING. At most
+    max_fingerprints are tracked, statements of further fingerprints
+    are only counted in dropped.
+    """
+
+    def __init__(self, slow_threshold: float = 1.0,
+                 max_fingerprints: int = 10000):
+        self.slow_threshold = slow_threshold
+        self.max_fingerprints = max_fingerprints
+        self.dropped = 0
+
+        self._stats = {}
+        self._fingerprints = OrderedDict()  # sql -> fingerprint, oldest first
+        self._lock = threading.Lock()
+
+    def after_execute(self, event: ExecuteEvent):
+        self._record(event)
+
+    def on_error(self, event: ExecuteEvent):
+        self._record(event)
+
+    def get(self, query: str) -> StatementStats:
+        """Returns the stats of query's fingerprint, None if not seen."""
+        return self._stats.get(fingerprint(query))
+
+    def top(self, n: int = 10, key: str = "total_time") \
+            -> List[StatementStats]:
+        """Returns the n statements with the largest key, one of count,
+        errors, total_time, mean_time, max_time or rows."""
+        with self._lock:
+            stats = list(self._stats.values())
+        stats.sort(key=lambda s: getattr(s, key), reverse=True)
+        return stats[:n]
+
+    def report(self, n: int = 10, key: str = "total_time") -> str:
+        """Formats top(n, key) as a text table, times in milliseconds."""
+        lines = ["{:>8} {:>6} {:>10} {:>9} {:>9} {:>9} {:>9} {:>9}  {}".format(
+            "count", "errors", "total", "mean", "p50", "p95", "p99", "max",
+            "statement")]
+        for s in self.top(n, key):
+            lines.append(
+                "{:>8} {:>6} {:>10.1f} {:>9.2f} {:>9.2f} {:>9.2f} {:>9.2f} "
+                "{:>9.2f}  {}".format(
+                    s.count, s.errors, s.total_time * 1000,
+                    s.mean_time * 1000, s.percentile(50) * 1000,
+                    s.percentile(95) * 1000, s.percentile(99) * 1000,
+                    s.max_time * 1000, s.fingerprint))
+        return "\n".join(lines)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self.dropped = 0
+
+    def _fingerprint(self, sql: str) -> str:
+        fingerprints = self._fingerprints
+        fp = fingerprints.get(sql)
+        if fp is None:
+            fp = fingerprints[sql] = fingerprint(sql)
+            if len(fingerprints) > _FINGERPRINT_CACHE_SIZE:
+                fingerprints.popitem(last=False)
+        return fp
+
+    def _record(self, event: ExecuteEvent):
+        duration = event.duration
+        with self._lock:
+            fp = self._fingerprint(event.sql)
+            stats = self._stats.get(fp)
+            if stats is None:
+                if len(self._stats) >= self.max_fingerprints:
+                    self.dropped += 1
+                    return
+                stats = self._stats[fp] = StatementStats(fp, event.sql)
+            stats.count += 1
+            stats.total_time += duration
+            if duration > stats.max_time:
+                stats.max_time = duration
+            if event.exception is not None:
+                stats.errors += 1
+            elif event.rowcount is not None and event.rowcount > 0:
+                stats.rows += event.rowcount
+            stats.histogram.add(duration)
+        if duration >= self.slow_threshold:
+            slow_logger.warning("slow %s %.3fs rows=%s: %s", event.method,
+                                duration, event.rowcount, event.sql)
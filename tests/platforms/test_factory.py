@@ -1,10 +1,19 @@
 import unittest
 import importlib
+import pickle
+import subprocess
+import sys
+
+from unittest import mock
+
+import sqlight.platforms.factory as factory
+
+from sqlight.dburl import DBUrl
 
 from sqlight.platforms.sqlite import SQLite
-from sqlight.platforms.keywords import Driver
-from sqlight.err import ProgrammingError
-from sqlight.platforms.factory import get_driver
+from sqlight.platforms.keywords import Driver, Platform
+from sqlight.err import NotSupportedError, ProgrammingError
+from sqlight.platforms.factory import get_driver, register_driver
 
 try:
     importlib.import_module("MySQLdb.cursors")
@@ -39,3 +48,35 @@ class TestFactory(unittest.TestCase):
         if Psycopg2 is not None:
             self.assertEqual(get_driver(Driver.PSYCOPG), Psycopg2)
         self.assertRaises(ProgrammingError, get_driver, "no_driver")
+
+    def test_lazy_import(self):
+        code = ("import sys, sqlight; "
+                "print([m for m in ('sqlight.platforms.sqlite', 'sqlite3', "
+                "'pymysql', 'MySQLdb', 'psycopg2') if m in sys.modules])")
+        out = subprocess.check_output([sys.executable, "-c", code])
+        self.assertEqual(out.strip(), b"[]")
+
+    def test_register_driver(self):
+        # restores the process-wide registry after the test
+        registry = mock.patch.dict(factory._drivers)
+        registry.start()
+        self.addCleanup(registry.stop)
+
+        register_driver("testdb+testdb", "sqlight.platforms.sqlite:SQLite")
+        dburl = DBUrl.get_from_url("testdb+testdb:///:memory:")
+        self.assertIsNone(dburl.platform)
+        self.assertEqual(dburl.driver, "testdb+testdb")
+        self.assertIs(get_driver(dburl.driver), SQLite)
+        self.assertEqual(dburl.get_args()["database"], ":memory:")
+
+        register_driver("testdb+testdb", "no_such_module:DB")
+        self.assertRaises(NotSupportedError, get_driver, "testdb+testdb")
+        self.assertRaises(NotSupportedError, DBUrl.get_from_url,
+                          "testdb+other:///x")
+
+    def test_keywords_are_enums(self):
+        self.assertIs(Platform("sqlite"), Platform.SQLite)
+        self.assertIs(Driver(("threaded", (Platform.SQLite,))),
+                      Driver.SQLITE_THREADED)
+        for member in list(Platform) + list(Driver):
+            self.assertIs(pickle.loads(pickle.dumps(member)), member)
@@ -0,0 +1,133 @@
+import unittest
+import importlib
+
+try:
+    importlib.import_module("psycopg2")
+except ImportError:
+    psycopg2 = None
+else:
+    import psycopg2
+    from sqlight.platforms.psycopg import Psycopg2, _CopyReader, \
+        _copy_value
+
+
+class FakeCursor:
+    """A psycopg2 cursor serving rows, failing like psycopg2 once it is
+    closed."""
+
+    description = [("id",)]
+
+    def __init__(self, rows, name=None, withhold=False):
+        self.rows = list(rows)
+        self.name = name
+        self.withhold = withhold
+        self.closed = False
+        self.query = None
+        self.rowcount = -1
+
+    def execute(self, query, parameters):
+        self.query = query.encode()
+
+    def fetchmany(self, size):
+        if self.closed:
+            raise psycopg2.InterfaceError("cursor already closed")
+        rows, self.rows = self.rows[:size], self.rows[size:]
+        return rows
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.cursors = []
+
+    def cursor(self, name=None, withhold=False):
+        cursor = FakeCursor(self.rows if name else (), name, withhold)
+        self.cursors.append(cursor)
+        return cursor
+
+    def server_cursors(self):
+        return [c for c in self.cursors if c.name]
+
+
+@unittest.skipIf(psycopg2 is None, "psycopg2 is not installed")
+class TestServerCursors(unittest.TestCase):
+
+    def connect(self, autocommit=False):
+        db = Psycopg2(database="test", autocommit=autocommit)
+        db._db = FakeConnection([(i,) for i in range(10)])
+        return db
+
+    def test_early_close_releases_cursor(self):
+        db = self.connect()
+        batches = db.iter_batches("SELECT id FROM t", batch_size=3)
+        self.assertEqual(len(next(batches)), 3)
+        cursor, = db._db.server_cursors()
+        self.assertFalse(cursor.closed)
+        self.assertFalse(cursor.withhold)
+        batches.close()
+        self.assertTrue(cursor.closed)
+        self.assertEqual(len(db._server_cursors), 0)
+
+    def test_transaction_end_closes_cursors(self):
+        for end in ("commit", "rollback"):
+            db = self.connect()
+            rows = db.iter("SELECT id FROM t")
+            self.assertEqual(next(rows)["id"], 0)
+            cursor, = db._db.server_cursors()
+            getattr(db, end)()
+            self.assertTrue(cursor.closed)
+            with self.assertRaises(psycopg2.InterfaceError):
+                list(rows)
+
+    def test_withhold_survives_commit(self):
+        db = self.connect(autocommit=True)
+        batches = db.iter_batches("SELECT id FROM t", batch_size=4)
+        next(batches)
+        cursor, = db._db.server_cursors()
+        self.assertTrue(cursor.withhold)
+        db.commit()
+        self.assertFalse(cursor.closed)
+        self.assertEqual([len(b) for b in batches], [4, 2])
+        self.assertTrue(cursor.closed)
+
+    def test_rollback_closes_withhold(self):
+        db = self.connect(autocommit=True)
+        rows = db.iter("SELECT id FROM t")
+        next(rows)
+        cursor, = db._db.server_cursors()
+        db.rollback()
+        self.assertTrue(cursor.closed)
+
+
+@unittest.skipIf(psycopg2 is None, "psycopg2 is not installed")
+class TestCopyText(unittest.TestCase):
+
+    def test_copy_value(self):
+        self.assertEqual(_copy_value(None), "\\N")
+        self.assertEqual(_copy_value(True), "t")
+        self.assertEqual(_copy_value(False), "f")
+        self.assertEqual(_copy_value(12), "12")
+        self.assertEqual(_copy_value(b"\x00\xff"), "\\\\x00ff")
+        self.assertEqual(_copy_value(memoryview(b"ab")), "\\\\x6162")
+        self.assertEqual(_copy_value("a\tb\nc\rd\\e"),
+                         "a\\tb\\nc\\rd\\\\e")
+        self.assertEqual(_copy_value("\\N"), "\\\\N")
+
+    def test_copy_reader(self):
+        rows = [(1, "x\ty", None), (2, "", b"\x01")]
+        text = "1\tx\\ty\t\\N\n2\t\t\\\\x01\n"
+        self.assertEqual(_CopyReader(rows).read(), text)
+
+        reader = _CopyReader(iter(rows))
+        chunks = []
+        while True:
+            chunk = reader.read(5)
+            if not chunk:
+                break
+            self.assertLessEqual(len(chunk), 5)
+            chunks.append(chunk)
+        self.assertEqual("".join(chunks), text)
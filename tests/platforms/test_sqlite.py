@@ -0,0 +1,97 @@
+import tempfile
+import unittest
+
+from sqlight.connection import Connection
+from sqlight.platforms.sqlite import SQLite
+from sqlight.err import ProgrammingError
+
+
+class TestSQLite(unittest.TestCase):
+
+    def test_format_to_qmark(self):
+        self.assertEqual(
+            SQLite.format_to_qmark(
+                "select * from t where a = %s and b = %s", [1, 2]),
+            "select * from t where a = ? and b = ?")
+        self.assertEqual(
+            SQLite.format_to_qmark(
+                "select '50%', '%s', \"%s\" from t where a like 'x%%' "
+                "and b = %s -- 100%\n", [1]),
+            "select '50%', '%s', \"%s\" from t where a like 'x%' "
+            "and b = ? -- 100%\n")
+        self.assertEqual(SQLite.format_to_qmark("select 'it''s %s'", []),
+                         "select 'it''s %s'")
+        self.assertEqual(SQLite.format_to_qmark("select 7 % 2", []),
+                         "select 7 % 2")
+        with self.assertRaises(ProgrammingError):
+            SQLite.format_to_qmark("select %s, %s", [1])
+        with self.assertRaises(ProgrammingError):
+            SQLite.format_to_qmark("select %(a)s", [1])
+
+    def test_pyformat_to_named(self):
+        self.assertEqual(
+            SQLite.pyformat_to_named(
+                "select * from t where a = %(a)s and b like '%(b)s%'",
+                {"a": 1}),
+            "select * from t where a = :a and b like '%(b)s%'")
+        with self.assertRaises(ProgrammingError):
+            SQLite.pyformat_to_named("select %(a)s", {"b": 1})
+        with self.assertRaises(ProgrammingError):
+            SQLite.pyformat_to_named("select %s", {"b": 1})
+
+    def test_translate_cache(self):
+        db = SQLite(":memory:", translate_cache_size=2)
+        db.connect()
+        db.query("select %s as a", 1)
+        db.query("select %s as a", 2)
+        self.assertEqual(db.translate_cache_misses, 1)
+        self.assertEqual(db.translate_cache_hits, 1)
+
+        row = db.get("select %(a)s as a", a=1)
+        self.assertEqual(row.a, 1)
+        db.get("select %(a)s as a", a=2)
+        self.assertEqual(db.translate_cache_misses, 2)
+        self.assertEqual(db.translate_cache_hits, 2)
+
+        db.get("select %s as a, %s as b", 1, 2)
+        self.assertEqual(len(db._translate_cache), 2)
+        # the least recently used entry was evicted
+        db.query("select %s as a", 3)
+        self.assertEqual(db.translate_cache_misses, 4)
+        db.close()
+
+    def test_executemany_generator(self):
+        db = SQLite(":memory:")
+        db.connect()
+        db.execute_rowcount("create table t (a)")
+        count = db.executemany_rowcount("insert into t values (%s)",
+                                        ((i,) for i in range(3)))
+        self.assertEqual(count, 3)
+        count = db.executemany_rowcount("insert into t values (%(a)s)",
+                                        ({"a": i} for i in range(3)))
+        self.assertEqual(count, 3)
+        self.assertEqual(len(db.query("select * from t")), 6)
+        db.close()
+
+    def test_profile(self):
+        with tempfile.TemporaryDirectory() as d:
+            c = Connection.create_from_dburl(
+                "sqlite:///{}/p.db?profile=wal_fast&cache_size=-2000"
+                "&init_command=create table a (x)%3B insert into a "
+                "values (';')".format(d))
+            c.connect()
+            settings = c.get_settings()
+            self.assertEqual(settings["profile"], "wal_fast")
+            self.assertEqual(settings["journal_mode"], "wal")
+            self.assertEqual(settings["synchronous"], 1)
+            self.assertEqual(settings["cache_size"], -2000)
+            self.assertEqual(settings["busy_timeout"], 5000)
+            self.assertEqual(c.get("select x from a").x, ";")
+            c.close()
+
+        db = SQLite(":memory:", journal_mode="WAL")
+        with self.assertWarns(Warning):
+            db.connect()
+        db.close()
+        with self.assertRaises(ProgrammingError):
+            SQLite(":memory:", profile="nope")
@@ -0,0 +1,90 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from sqlight.connection import Connection
+from sqlight.err import IntegrityError, ProgrammingError
+from sqlight.platforms.sqlite_threaded import ThreadedSQLite
+
+
+class TestThreadedSQLite(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.c = Connection.create_from_dburl(
+            "sqlite+threaded:///{}/t.db?readers=2".format(self.dir.name))
+        self.c.connect()
+        self.c.execute("create table t (id integer primary key, a text)")
+
+    def tearDown(self):
+        self.c.close()
+        self.dir.cleanup()
+
+    def test_driver(self):
+        self.assertIsInstance(self.c._db, ThreadedSQLite)
+        self.assertEqual(self.c.get_settings()["journal_mode"], "wal")
+        with self.assertRaises(ProgrammingError):
+            ThreadedSQLite(":memory:")
+
+    def test_reader_profile(self):
+        db = ThreadedSQLite("{}/p.db".format(self.dir.name), readers=1,
+                            profile="wal_fast", cache_size=-2000)
+        db.connect()
+        try:
+            reader = db._acquire_reader()
+            settings = reader.get_settings()
+            db._release_reader(reader)
+        finally:
+            db.close()
+        self.assertEqual(settings["cache_size"], -2000)
+        self.assertEqual(settings["mmap_size"], 268435456)
+        self.assertEqual(settings["temp_store"], 2)
+        self.assertEqual(settings["busy_timeout"], 5000)
+        # the write pragmas stay with the writer
+        self.assertEqual(settings["synchronous"], 2)
+
+    def test_routing(self):
+        # writes commit on their own and readers see them
+        rowid = self.c.insert("insert into t (a) values (%s)", "x")
+        self.assertEqual(self.c.get("select * from t where id = %s",
+                                    rowid).a, "x")
+        self.assertEqual(len(self.c._db._all_readers), 1)
+        self.assertEqual(self.c.update("update t set a = %s", "y"), 1)
+        self.assertEqual([r.a for r in self.c.iter("select a from t")],
+                         ["y"])
+        with self.assertRaises(IntegrityError):
+            self.c.insert("insert into t (id) values (%s)", rowid)
+
+    def test_transaction(self):
+        self.c.begin()
+        self.c.insert("insert into t (a) values (%s)", "x")
+        # the owner reads its own writes on the writer
+        self.assertEqual(len(self.c.query("select * from t")), 1)
+        seen = []
+        reader = threading.Thread(
+            target=lambda: seen.append(len(self.c.query("select * from t"))))
+        reader.start()
+        reader.join()
+        self.assertEqual(seen, [0])
+        self.c.rollback()
+        self.assertEqual(len(self.c.query("select * from t")), 0)
+
+    def test_threads(self):
+        def work(n):
+            for i in range(20):
+                self.c.insert("insert into t (a) values (%s)", "%d" % n)
+                self.c.query("select * from t")
+
+        threads = [threading.Thread(target=work, args=(n,))
+                   for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(self.c.query("select * from t")), 80)
+        self.assertLessEqual(len(self.c._db._all_readers), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import asyncio
+import threading
+import unittest
+
+from sqlight.aio import AsyncConnection
+from sqlight.err import InterfaceError, ProgrammingError
+from .config import sqlite_test_table
+
+
+class TestAsyncConnection(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def run_async(self, coro):
+        return self.loop.run_until_complete(coro)
+
+    def test_loop(self):
+        self.run_async(self.t_loop())
+
+    async def t_loop(self):
+        c = AsyncConnection.create_from_dburl("sqlite:///:memory:",
+                                              max_pending=2,
+                                              iter_chunk_size=2)
+        async with c:
+            await c.execute(sqlite_test_table)
+            rowid = await c.execute_lastrowid(
+                "insert into test (name) values (%s)", "test1")
+            self.assertEqual(rowid, 1)
+            count = await c.executemany(
+                "insert into test (name) values (%s)",
+                [["test2"], ["test3"], ["test4"], ["test5"]])
+            self.assertEqual(count, 4)
+            await c.commit()
+
+            count = await c.execute_rowcount(
+                "update test set name = %s where id = %s", "test3_after", 3)
+            self.assertEqual(count, 1)
+            row = await c.get("select * from test where id = %(id)s", id=3)
+            self.assertEqual(row.name, "test3_after")
+            rows = await c.query("select * from test")
+            self.assertEqual(len(rows), 5)
+
+            await c.rollback()
+            row = await c.get("select * from test where id = %s", 3)
+            self.assertEqual(row.name, "test3")
+
+            names = [r.name async for r in c.iter("select * from test")]
+            self.assertEqual(names, ["test1", "test2", "test3", "test4",
+                                     "test5"])
+
+            async for r in c.iter("select * from test"):
+                break
+            self.assertEqual(len(await c.query("select * from test")), 5)
+
+            with self.assertRaises(ProgrammingError):
+                await c.get("select * from test")
+
+            # all calls run in parallel but on the worker thread
+            idents = await asyncio.gather(*[
+                c._run(threading.get_ident) for _ in range(10)])
+            self.assertEqual(len(set(idents)), 1)
+            self.assertNotEqual(idents[0], threading.get_ident())
+
+        with self.assertRaises(InterfaceError):
+            await c.query("select * from test")
@@ -0,0 +1,32 @@
+import json
+import os
+import unittest
+
+# The overhead benchmarks take a while and depend on the machine, so they
+# only run with SQLIGHT_BENCH=1. SQLIGHT_BENCH_URLS adds comma separated
+# server URLs to the in-memory SQLite run.
+ENABLED = os.environ.get("SQLIGHT_BENCH") == "1"
+THRESHOLDS = os.path.join(os.path.dirname(__file__), os.pardir,
+                          "benchmarks", "thresholds.json")
+
+
+@unittest.skipUnless(ENABLED, "set SQLIGHT_BENCH=1 to run the benchmarks")
+class TestOverhead(unittest.TestCase):
+
+    def test_thresholds(self):
+        from benchmarks.overhead import check, run
+
+        urls = ["sqlite:///:memory:"]
+        urls += [u for u in os.environ.get("SQLIGHT_BENCH_URLS",
+                                           "").split(",") if u]
+        results = []
+        for url in urls:
+            results.extend(run(url, rows=(10, 1000), widths=(4, 16),
+                               repeat=5))
+        with open(THRESHOLDS) as f:
+            failures = check(results, json.load(f))
+        self.assertEqual(failures, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import time
+import unittest
+
+from dataclasses import dataclass
+
+from sqlight.cache import (ALL_TABLES, CachedConnection, QueryCache,
+                           read_tables, write_tables)
+from sqlight.row import dataclass_factory
+
+
+@dataclass
+class Item:
+    id: int
+    a: str
+
+
+class TestTables(unittest.TestCase):
+
+    def test_read_tables(self):
+        self.assertEqual(read_tables("select * from t where a = 1"), {"t"})
+        self.assertEqual(
+            read_tables("select * from a join \"B\" on a.id = B.id, c"),
+            {"a", "b", "c"})
+        self.assertEqual(read_tables("select 1"), {ALL_TABLES})
+
+    def test_write_tables(self):
+        self.assertEqual(write_tables("insert into t values (1)"), {"t"})
+        self.assertEqual(write_tables("INSERT OR REPLACE INTO `T` (a) "
+                                      "select a from s"), {"t", "s"})
+        self.assertEqual(write_tables("update t set a = 1"), {"t"})
+        self.assertEqual(write_tables("delete from t"), {"t"})
+        self.assertEqual(write_tables("vacuum"), {ALL_TABLES})
+
+    def test_memoized(self):
+        query = "update u set a = (select max(a) from v)"
+        self.assertIs(read_tables(query), read_tables(query))
+        self.assertIs(write_tables(query), write_tables(query))
+        self.assertEqual(write_tables(query), {"u", "v"})
+        self.assertIsInstance(write_tables(query), frozenset)
+
+
+class TestQueryCache(unittest.TestCase):
+
+    def test_lru(self):
+        cache = QueryCache(max_entries=2)
+        cache.put("a", [1], {"t"})
+        cache.put("b", [2], {"t"})
+        cache.get("a")
+        cache.put("c", [3], {"s"})
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), [1])
+        self.assertEqual(cache.evictions, 1)
+
+        cache.invalidate({"t"})
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("c"), [3])
+        self.assertEqual(cache.invalidations, 1)
+
+    def test_ttl_and_bytes(self):
+        cache = QueryCache(max_bytes=10 ** 6)
+        cache.put("a", [1], {"t"}, ttl=0.01)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("a"))
+        cache.put("b", ["x" * 10 ** 6], {"t"})
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.size, 0)
+
+
+class TestCachedConnection(unittest.TestCase):
+
+    def setUp(self):
+        self.c = CachedConnection.create_from_dburl("sqlite:///:memory:")
+        self.c.connect()
+        self.c.execute("create table t (id integer primary key, a text)")
+        self.c.insert("insert into t (a) values (%s)", "x")
+        self.c.commit()
+
+    def tearDown(self):
+        self.c.close()
+
+    def test_hit_and_invalidate(self):
+        row = self.c.get("select * from t where id = %s", 1)
+        row.a = "changed"
+        self.assertEqual(self.c.get("select * from t where id = %s", 1).a, "x")
+        self.assertEqual(self.c.cache.hits, 1)
+
+        self.c.update("update t set a = %s", "y")
+        # uncommitted writes bypass the cache
+        self.assertEqual(self.c.get("select * from t where id = %s", 1).a, "y")
+        self.c.commit()
+        self.assertEqual(self.c.get("select * from t where id = %s", 1).a, "y")
+        self.c.get("select * from t where id = %s", 1, cache_ttl=0)
+        self.assertEqual(self.c.cache.hits, 1)
+
+    def test_dataclass_factory(self):
+        for _ in range(2):
+            row = self.c.get("select * from t where id = %s", 1,
+                             row_factory=dataclass_factory(Item))
+        self.assertEqual(row, Item(1, "x"))
+        self.assertEqual(self.c.cache.hits, 1)
+
+    def test_transaction(self):
+        self.c.query("select * from t")
+        self.c.begin()
+        self.c.insert("insert into t (a) values (%s)", "y")
+        self.assertEqual(len(self.c.query("select * from t")), 2)
+        self.c.rollback()
+        self.assertEqual(len(self.c.query("select * from t")), 1)
+        self.assertEqual(self.c.cache.hits, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
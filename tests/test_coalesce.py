@@ -0,0 +1,98 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from sqlight.coalesce import WriteCoalescer
+from sqlight.connection import Connection
+from sqlight.err import IntegrityError, InterfaceError
+
+
+class TestWriteCoalescer(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.url = "sqlite:///{}".format(self.path)
+        c = Connection.create_from_dburl(self.url)
+        c.connect()
+        c.execute("create table t (id integer primary key, a text unique)")
+        c.commit()
+        c.close()
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def count(self):
+        c = Connection.create_from_dburl(self.url)
+        c.connect()
+        try:
+            return len(c.query("select * from t"))
+        finally:
+            c.close()
+
+    def run_writes(self, url):
+        futures = []
+        with WriteCoalescer(url, max_batch=50, max_delay=0.05) as w:
+            def write(n):
+                for i in range(50):
+                    futures.append(w.insert(
+                        "insert into t (a) values (%s)", "%d-%d" % (n, i)))
+            threads = [threading.Thread(target=write, args=(n,))
+                       for n in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            w.flush()
+            ids = [f.result() for f in futures]
+            self.assertEqual(len(set(ids)), 200)
+            self.assertLess(w.batches, 200)
+        self.assertEqual(self.count(), 200)
+
+    def test_batches(self):
+        self.run_writes(self.url)
+
+    def test_autocommit(self):
+        self.run_writes(self.url + "?autocommit=True")
+
+    def test_failed_statement(self):
+        with WriteCoalescer(self.url, max_delay=0.05) as w:
+            f1 = w.insert("insert into t (a) values (%s)", "x")
+            f2 = w.insert("insert into t (a) values (%s)", "x")
+            f3 = w.update("update t set a = %s where a = %s", "y", "x")
+            w.flush()
+            self.assertIsInstance(f1.result(), int)
+            with self.assertRaises(IntegrityError):
+                f2.result()
+            self.assertEqual(f3.result(), 1)
+            self.assertEqual(w.replays, 1)
+        self.assertEqual(self.count(), 1)
+        with self.assertRaises(InterfaceError):
+            w.insert("insert into t (a) values (%s)", "z")
+
+    def test_close_while_writing(self):
+        # every write is either refused or resolved, none is left pending
+        w = WriteCoalescer(self.url, max_delay=0.001)
+        futures = []
+
+        def write(n):
+            for i in range(200):
+                try:
+                    futures.append(w.insert(
+                        "insert into t (a) values (%s)", "%d-%d" % (n, i)))
+                except InterfaceError:
+                    return
+        threads = [threading.Thread(target=write, args=(n,))
+                   for n in range(4)]
+        for t in threads:
+            t.start()
+        w.close()
+        for t in threads:
+            t.join()
+        self.assertTrue(all(f.done() for f in futures))
+        self.assertEqual(self.count(), len(futures))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+
+from array import array
+
+import sqlight.columns as columns
+from sqlight.connection import Connection
+
+
+class TestQueryColumns(unittest.TestCase):
+
+    def setUp(self):
+        self._numpy = columns._numpy
+        columns._numpy = False  # test the array.array path
+        self.c = Connection.create_from_dburl("sqlite:///:memory:")
+        self.c.connect()
+        self.c.execute("create table t (i integer, f real, s text, "
+                       "n integer, m integer)")
+        self.c.executemany("insert into t values (%s, %s, %s, %s, %s)", [
+            [i, i / 2, "s%d" % i, None if i == 3 else i,
+             2.5 if i == 4 else i]
+            for i in range(5)])
+
+    def tearDown(self):
+        columns._numpy = self._numpy
+        self.c.close()
+
+    def test_query_columns(self):
+        for chunk_size in (None, 2):
+            result = self.c.query_columns("select * from t order by i",
+                                          chunk_size=chunk_size)
+            self.assertEqual(list(result), ["i", "f", "s", "n", "m"])
+            self.assertEqual(result["i"], array("q", range(5)))
+            self.assertEqual(result["f"], array("d", [0, 0.5, 1, 1.5, 2]))
+            self.assertEqual(result["s"], ["s0", "s1", "s2", "s3", "s4"])
+            self.assertEqual(result["n"], [0, 1, 2, None, 4])
+            self.assertEqual(result["m"], array("d", [0, 1, 2, 3, 2.5]))
+
+    def test_empty(self):
+        result = self.c.query_columns("select * from t where i < %s", 0)
+        self.assertEqual(result["i"], [])
+
+    def test_big_int(self):
+        self.c.execute("insert into t (i, m) values (%s, %s)", 1, 2 ** 62)
+        result = self.c.query_columns("select m from t where i = 1")
+        self.assertEqual(result["m"], array("q", [1, 2 ** 62]))
+        self.c.execute("insert into t (i, m) values (%s, %s)", 1, 0.5)
+        result = self.c.query_columns("select m from t where i = 1")
+        self.assertEqual(result["m"], [1, 2 ** 62, 0.5])
+
+    def test_numpy(self):
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest("numpy is not installed")
+        columns._numpy = numpy
+        result = self.c.query_columns("select i, f from t order by i")
+        self.assertEqual(result["i"].dtype, numpy.int64)
+        self.assertEqual(result["f"].tolist(), [0, 0.5, 1, 1.5, 2])
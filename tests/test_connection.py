@@ -55,6 +55,19 @@ class TestConnection(unittest.TestCase):
             self.t_close_rollback(c)
             self.t_close(c)
 
+    def test_executemany_stream_commit(self):
+        for c in self.test_cons:
+            self.t_connect(c)
+            self.t_execute(c)
+            rows = (("test%d" % i,) for i in range(5))
+            count = c.executemany_stream(
+                "insert into test (name) values (%s)", rows,
+                chunk_size=2, commit_every=2)
+            self.assertEqual(count, 5)
+            c.rollback()
+            self.assertEqual(len(c.query("select * from test")), 5)
+            c.close()
+
     def t_connect(self, c):
         c.connect()
 
@@ -4,6 +4,7 @@ import importlib
 
 from sqlight.connection import Connection
 from sqlight.platforms import Platform
+from sqlight.row import tuple_factory
 from sqlight.err import Error, ProgrammingError, DatabaseError
 from .config import MYSQL_CLIENT_URL, PYMYSQL_URL, POSTGRESQL_URL,\
         sqlite_test_table, mysql_test_table, postgresql_test_table
@@ -56,8 +57,11 @@ class TestConnectionAutoCommit(unittest.TestCase):
             self.t_query(c)
             self.t_get(c)
             self.t_iter(c)
+            self.t_iter_batches(c)
             self.t_rollback(c)
             self.t_commit(c)
+            self.t_copy_from(c)
+            self.t_executemany_stream(c)
             self.t_close(c)
             self.t_after_close(c)
 
@@ -139,6 +143,19 @@ class TestConnectionAutoCommit(unittest.TestCase):
                 self.assertEqual(i.name, "test%d" % id)
         self.assertEqual(len(all_rows), 3)
 
+    def t_iter_batches(self, c):
+        """分批查询数据"""
+        batches = list(c.iter_batches("select * from test where id > %s "
+                                      "order by id", 0, batch_size=2))
+        self.assertEqual([len(b) for b in batches], [2, 1])
+        self.assertEqual([r.id for b in batches for r in b], [1, 2, 3])
+        self.assertEqual(batches[1][0].name, "test3_after")
+
+        batches = c.iter_batches("select * from test where id > %(id)s",
+                                 id=0, row_factory=tuple_factory)
+        self.assertEqual(next(batches)[0], (1, "test1"))
+        batches.close()
+
     def t_rollback(self, c):
         name = "test4"
         c.begin()
@@ -157,6 +174,30 @@ class TestConnectionAutoCommit(unittest.TestCase):
         self.assertIn(row.id, [4, 5])
         self.assertEqual(row.name, name)
 
+    def t_copy_from(self, c):
+        """批量导入数据"""
+        rows = (("copy%d" % i,) for i in range(3))
+        count = c.copy_from("test", rows, ["name"])
+        self.assertEqual(count, 3)
+        names = [r.name for r in c.query(
+            "select name from test where name like %s order by name",
+            "copy%%")]
+        self.assertEqual(names, ["copy0", "copy1", "copy2"])
+
+    def t_executemany_stream(self, c):
+        """流式批量插入数据"""
+        progress = []
+        rows = (("stream%d" % i,) for i in range(5))
+        count = c.executemany_stream("insert into test (name) values (%s)",
+                                     rows, chunk_size=2,
+                                     progress=lambda *p: progress.append(p))
+        self.assertEqual(count, 5)
+        self.assertEqual(progress, [(2, 2), (4, 4), (5, 5)])
+        self.assertEqual(len(c.query("select * from test where name like %s",
+                                     "stream%%")), 5)
+        self.assertEqual(c.executemany_stream(
+            "insert into test (name) values (%s)", iter([])), 0)
+
     def t_after_close(self, c):
         with self.assertRaises(Error):
             c.get("select * from test")
@@ -110,6 +110,10 @@ class TestDBUrl(unittest.TestCase):
         args["isolation_level"] = "DEFERRED"
         self.assertEqual(dburl.get_args(), args)
 
+    def test_sqlite_absolute_path(self):
+        dburl = DBUrl.get_from_url("sqlite:////tmp/foo.db")
+        self.assertEqual(dburl.database, "/tmp/foo.db")
+
     def test_string2bool(self):
         self.assertEqual(DBUrl.string2bool("None"), None)
         self.assertEqual(DBUrl.string2bool("True"), True)
@@ -0,0 +1,74 @@
+import unittest
+
+from sqlight.connection import Connection
+from sqlight.err import IntegrityError
+from sqlight.events import Listener
+
+
+class Recorder(Listener):
+
+    def __init__(self):
+        self.before = []
+        self.after = []
+        self.errors = []
+
+    def before_execute(self, event):
+        self.before.append(event.method)
+
+    def after_execute(self, event):
+        self.after.append(event)
+
+    def on_error(self, event):
+        self.errors.append(event)
+
+
+class TestEvents(unittest.TestCase):
+
+    def setUp(self):
+        self.c = Connection.create_from_dburl("sqlite:///:memory:")
+        self.c.connect()
+        self.c.execute("create table t (id integer primary key, a text)")
+        self.listener = Recorder()
+        self.c.add_listener(self.listener)
+
+    def tearDown(self):
+        self.c.close()
+
+    def test_events(self):
+        self.c.insert("insert into t (a) values (%s)", "x")
+        self.c.insertmany("insert into t (a) values (%(a)s)",
+                          [{"a": "y"}, {"a": "z"}])
+        self.c.get("select * from t where id = %(id)s", id=1)
+        self.assertEqual(len(list(self.c.iter("select * from t"))), 3)
+        list(self.c.iter_batches("select * from t", batch_size=2))
+
+        self.assertEqual(self.listener.before, [
+            "execute_lastrowid", "executemany_rowcount", "get", "iter",
+            "iter_batches"])
+        insert, many, get, it, batches = self.listener.after
+        self.assertEqual(insert.sql, "insert into t (a) values (%s)")
+        self.assertEqual(insert.parameters, ("x",))
+        self.assertEqual(insert.rowcount, 1)
+        self.assertEqual(many.rowcount, 2)
+        self.assertEqual(get.parameters, {"id": 1})
+        self.assertEqual(get.rowcount, 1)
+        self.assertEqual(it.rowcount, 3)
+        self.assertEqual(batches.rowcount, 3)
+        self.assertTrue(all(e.duration >= 0 for e in self.listener.after))
+
+    def test_error(self):
+        with self.assertRaises(IntegrityError):
+            self.c.insert("insert into t (id) values (%s)", 1)
+            self.c.insert("insert into t (id) values (%s)", 1)
+        event, = self.listener.errors
+        self.assertIsInstance(event.exception, IntegrityError)
+
+    def test_remove_listener(self):
+        self.c.remove_listener(self.listener)
+        self.assertNotIn("query", vars(self.c._db))
+        self.c.query("select * from t")
+        self.assertEqual(self.listener.before, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+import os
+import tempfile
+import unittest
+
+from sqlight import InList
+from sqlight.connection import Connection
+from sqlight.err import ProgrammingError
+from sqlight.events import Listener
+from sqlight.row import tuple_factory
+
+ROWS = 3000
+
+
+class Statements(Listener):
+
+    def __init__(self):
+        self.queries = []
+
+    def before_execute(self, event):
+        self.queries.append(event.sql)
+
+
+class TestInList(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = Connection.create_from_dburl("sqlite:///:memory:")
+        self.conn.connect()
+        self.conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, k TEXT)")
+        self.conn.executemany("INSERT INTO t VALUES (%s, %s)",
+                              [(i, "k{}".format(i % 7)) for i in range(ROWS)])
+        self.statements = Statements()
+        self.conn.add_listener(self.statements)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def ids(self, rows):
+        return sorted(r[0] if isinstance(r, tuple) else r["id"]
+                      for r in rows)
+
+    def test_expand(self):
+        rows = self.conn.query("SELECT * FROM t WHERE id IN %s AND k = %s",
+                               InList([5, 6, 7, 7]), "k0")
+        self.assertEqual(self.ids(rows), [7])
+        self.assertEqual(self.statements.queries,
+                         ["SELECT * FROM t WHERE id IN (%s, %s, %s) "
+                          "AND k = %s"])
+
+    def test_expand_named_and_wrapped(self):
+        rows = self.conn.query("SELECT * FROM t WHERE id IN (%(ids)s)",
+                               ids=InList([1, 2]))
+        self.assertEqual(self.ids(rows), [1, 2])
+        self.assertEqual(self.statements.queries,
+                         ["SELECT * FROM t WHERE id IN "
+                          "(%(ids__0)s, %(ids__1)s)"])
+
+    def test_empty(self):
+        self.assertEqual(self.conn.query(
+            "SELECT * FROM t WHERE id IN %s", InList([])), [])
+        self.assertEqual(self.conn.get(
+            "SELECT COUNT(*) AS n FROM t WHERE id NOT IN %s",
+            InList([]))["n"], ROWS)
+
+    def test_chunks(self):
+        ids = list(range(0, ROWS * 2, 3))
+        rows = self.conn.query("SELECT * FROM t WHERE k <> %s AND id IN %s",
+                               "k1", InList(ids, expand_limit=300))
+        expected = [i for i in ids if i < ROWS and i % 7 != 1]
+        self.assertEqual(self.ids(rows), expected)
+        self.assertEqual(len(self.statements.queries), 7)
+
+    def test_chunks_iter_and_write(self):
+        in_list = InList(range(1000), expand_limit=100)
+        rows = self.conn.iter("SELECT * FROM t WHERE id IN %s", in_list,
+                              row_factory=tuple_factory)
+        self.assertEqual(self.ids(rows), list(range(1000)))
+        self.assertEqual(self.conn.update(
+            "UPDATE t SET k = %s WHERE id IN %s", "x", in_list), 1000)
+        self.assertEqual(self.conn.get(
+            "SELECT COUNT(*) AS n FROM t WHERE k = 'x'")["n"], 1000)
+
+    def test_chunked_get(self):
+        row = self.conn.get("SELECT * FROM t WHERE id IN %s AND id = %s",
+                            InList(range(500), expand_limit=100), 450)
+        self.assertEqual(row["id"], 450)
+        with self.assertRaises(ProgrammingError):
+            self.conn.get("SELECT * FROM t WHERE id IN %s",
+                          InList(range(500), expand_limit=100))
+
+    def test_temp_table(self):
+        ids = list(range(ROWS // 2, ROWS * 2))
+        rows = self.conn.query("SELECT * FROM t WHERE id IN %s",
+                               InList(ids, expand_limit=100,
+                                      temp_table_limit=1000))
+        self.assertEqual(self.ids(rows), list(range(ROWS // 2, ROWS)))
+        queries = self.statements.queries
+        self.assertTrue(queries[0].startswith("CREATE TEMP TABLE"))
+        self.assertIn("id IN (SELECT v FROM ", queries[-2])
+        self.assertEqual(self.conn.query(
+            "SELECT name FROM sqlite_temp_master"), [])
+
+    def test_temp_table_when_chunks_differ(self):
+        in_list = InList(range(0, ROWS, 2), expand_limit=100)
+        for query, expected in [
+                ("SELECT COUNT(*) AS n FROM t WHERE id IN %s", ROWS // 2),
+                ("SELECT COUNT(*) AS n FROM t WHERE id NOT IN %s",
+                 ROWS // 2),
+                ("SELECT COUNT(*) AS n FROM (SELECT id FROM t "
+                 "WHERE id IN %s OR id < 10) AS s", ROWS // 2 + 5),
+                ("SELECT COUNT(*) AS n FROM (SELECT id FROM t "
+                 "WHERE id IN %s LIMIT 20) AS s", 20)]:
+            self.assertEqual(self.conn.get(query, in_list)["n"], expected)
+
+    def test_temp_table_iter_batches(self):
+        batches = self.conn.iter_batches(
+            "SELECT * FROM t WHERE id IN %s ORDER BY id DESC",
+            InList(range(ROWS), expand_limit=10), batch_size=1000)
+        rows = [row for batch in batches for row in batch]
+        self.assertEqual([r["id"] for r in rows],
+                         list(reversed(range(ROWS))))
+        self.assertEqual(self.statements.queries[-1].split()[:2],
+                         ["DROP", "TABLE"])
+
+    def test_variable_limit(self):
+        self.conn._db.max_parameters = 50
+        rows = self.conn.query("SELECT * FROM t WHERE id IN %s AND k = %s",
+                               InList(range(140)), "k3")
+        self.assertEqual(self.ids(rows), list(range(3, 140, 7)))
+        self.assertEqual(len(self.statements.queries), 3)
+
+
+class TestInListThreaded(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.conn = Connection.create_from_dburl(
+            "sqlite+threaded:///" + os.path.join(self.dir.name, "t.db"))
+        self.conn.connect()
+        self.conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY)")
+        self.conn.executemany("INSERT INTO t VALUES (%s)",
+                              [(i,) for i in range(100)])
+
+    def tearDown(self):
+        self.conn.close()
+        self.dir.cleanup()
+
+    def test_chunks_without_temp_tables(self):
+        in_list = InList(range(0, 200, 2), expand_limit=10,
+                         temp_table_limit=20)
+        self.assertEqual(len(self.conn.query(
+            "SELECT * FROM t WHERE id IN %s", in_list)), 50)
+        with self.assertRaises(ProgrammingError):
+            self.conn.query("SELECT * FROM t WHERE id NOT IN %s", in_list)
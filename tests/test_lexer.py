@@ -0,0 +1,107 @@
+import unittest
+
+import sqlight.lexer as lexer
+
+from sqlight.platforms import Platform
+
+
+def placeholders(query, platform=None):
+    return [text for kind, text in lexer.tokenize(query, platform)
+            if kind == lexer.PLACEHOLDER]
+
+
+class TestTokenize(unittest.TestCase):
+
+    def test_round_trip(self):
+        query = "SELECT 'a''b', \"c\" FROM t WHERE x = %s -- %s\n"
+        for platform in (None,) + tuple(Platform):
+            self.assertEqual("".join(
+                text for _, text in lexer.tokenize(query, platform)), query)
+
+    def test_standard_strings(self):
+        # SQLite and standard PostgreSQL strings take no backslash escapes
+        for platform in (None, Platform.SQLite, Platform.PostgreSQL):
+            self.assertEqual(placeholders(
+                "SELECT 'a\\' , %s, 'it''s %s'", platform), ["%s"])
+
+    def test_mysql_backslash_escapes(self):
+        for platform in (Platform.MySQL, Platform.MariaDB):
+            self.assertEqual(placeholders(
+                "SELECT 'a\\'b %s', \"c\\\"%s\", `d` FROM t WHERE x = %s",
+                platform), ["%s"])
+            tokens = list(lexer.tokenize("SELECT \"x\", `y`", platform))
+            self.assertIn((lexer.STRING, '"x"'), tokens)
+            self.assertIn((lexer.QUOTED, "`y`"), tokens)
+        # without the platform the escaped quote ends the literal
+        self.assertEqual(len(placeholders("SELECT 'a\\'b %s'")), 1)
+
+    def test_postgresql_literals(self):
+        self.assertEqual(placeholders(
+            "SELECT E'a\\'b %s', e'%s', $$it's %s$$, $f$ %s $f$, %s",
+            Platform.PostgreSQL), ["%s"])
+
+
+class TestSplitInsertValues(unittest.TestCase):
+
+    def test_nested_parentheses(self):
+        self.assertEqual(
+            lexer.split_insert_values(
+                "INSERT INTO t (a, b) VALUES (%s, lower(concat(%s, ')')))"),
+            ("INSERT INTO t (a, b) VALUES ",
+             "(%s, lower(concat(%s, ')')))", ""))
+
+    def test_multi_row_values(self):
+        # already multi-row, left to executemany as it is
+        self.assertIsNone(lexer.split_insert_values(
+            "INSERT INTO t VALUES (%s, (%s + 1)), (%s, (%s + 1))"))
+        self.assertIsNone(lexer.split_insert_values(
+            "INSERT INTO t VALUES (%s) , (%s)"))
+
+    def test_trailing_clauses(self):
+        self.assertEqual(
+            lexer.split_insert_values(
+                "INSERT INTO t (a, b) VALUES (%s, %s) ON CONFLICT (a) "
+                "DO UPDATE SET b = excluded.b RETURNING id"),
+            ("INSERT INTO t (a, b) VALUES ", "(%s, %s)",
+             " ON CONFLICT (a) DO UPDATE SET b = excluded.b RETURNING id"))
+        self.assertEqual(
+            lexer.split_insert_values(
+                "insert into t values (%(a)s) returning (id)")[2],
+            " returning (id)")
+
+    def test_not_insert_values(self):
+        for query in ("UPDATE t SET a = %s",
+                      "INSERT INTO t SELECT * FROM u",
+                      "INSERT INTO t VALUES %s",
+                      "INSERT INTO t (a) VALUES (%s",
+                      "-- VALUES (%s)\nSELECT 1"):
+            self.assertIsNone(lexer.split_insert_values(query), query)
+
+    def test_mysql_literals(self):
+        query = "INSERT INTO t (v) VALUES ('a\\')', %s) ON DUPLICATE KEY " \
+                "UPDATE v = VALUES(v)"
+        self.assertEqual(
+            lexer.split_insert_values(query, Platform.MySQL),
+            ("INSERT INTO t (v) VALUES ", "('a\\')', %s)",
+             " ON DUPLICATE KEY UPDATE v = VALUES(v)"))
+
+    def test_keywords_in_literals(self):
+        self.assertEqual(
+            lexer.split_insert_values(
+                "INSERT INTO t (v) /* VALUES (x) */ VALUES ('VALUES (1)')"),
+            ("INSERT INTO t (v) /* VALUES (x) */ VALUES ", "('VALUES (1)')",
+             ""))
+
+
+class TestUnescape(unittest.TestCase):
+
+    def test_unescape_query(self):
+        self.assertEqual(
+            lexer.unescape_query(
+                "SELECT '100%%', a %% 2 FROM t WHERE b = %s -- 5%%"),
+            "SELECT '100%', a % 2 FROM t WHERE b = %s -- 5%")
+
+    def test_placeholders_kept(self):
+        query = "SELECT %s, %(name)s FROM t"
+        self.assertEqual(lexer.unescape_query(query), query)
+        self.assertEqual(lexer.unescape_percent("50%% of %%s"), "50% of %s")
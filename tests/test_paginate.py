@@ -0,0 +1,120 @@
+import unittest
+
+import sqlight.dialects as dialects
+
+from sqlight.connection import Connection
+from sqlight.err import ProgrammingError
+from sqlight.platforms import Platform
+from sqlight.row import tuple_factory
+
+
+class TestKeysetQuery(unittest.TestCase):
+
+    def test_row_values(self):
+        for platform in (Platform.PostgreSQL, Platform.SQLite):
+            query, order = dialects.keyset_query(
+                platform, "SELECT * FROM t", ["a", "b"], 10, after=True)
+            self.assertEqual(
+                query, "SELECT * FROM t WHERE (a, b) > (%s, %s) "
+                       "ORDER BY a, b LIMIT 10")
+            self.assertEqual(order, [0, 1])
+
+    def test_or_expansion(self):
+        for platform in (Platform.MySQL, Platform.MariaDB):
+            query, order = dialects.keyset_query(
+                platform, "SELECT * FROM t WHERE x = %s", ["a", "b"], 10,
+                descending=True, after=True)
+            self.assertEqual(
+                query, "SELECT * FROM t WHERE (x = %s) AND "
+                       "((a < %s) OR (a = %s AND b < %s)) "
+                       "ORDER BY a DESC, b DESC LIMIT 10")
+            self.assertEqual(order, [0, 0, 1])
+
+    def test_first_page(self):
+        query, order = dialects.keyset_query(
+            Platform.MySQL, "SELECT * FROM t;", ["id"], 5)
+        self.assertEqual(query, "SELECT * FROM t ORDER BY id LIMIT 5")
+        self.assertEqual(order, [])
+
+    def test_subquery(self):
+        query, _ = dialects.keyset_query(
+            Platform.PostgreSQL,
+            "SELECT t.k, COUNT(*) AS n FROM t GROUP BY t.k", ["t.k"], 5,
+            after=True, named=True)
+        self.assertEqual(
+            query, "SELECT * FROM (SELECT t.k, COUNT(*) AS n FROM t "
+                   "GROUP BY t.k) AS _sqlight_page WHERE k > %(_key0)s "
+                   "ORDER BY k LIMIT 5")
+
+    def test_nested_where(self):
+        query, _ = dialects.keyset_query(
+            Platform.SQLite,
+            "SELECT * FROM t WHERE id IN (SELECT id FROM u ORDER BY id)",
+            ["id"], 5, after=True)
+        self.assertEqual(
+            query, "SELECT * FROM t WHERE (id IN (SELECT id FROM u ORDER BY "
+                   "id)) AND id > %s ORDER BY id LIMIT 5")
+
+
+class TestPaginate(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = Connection.create_from_dburl("sqlite:///:memory:")
+        self.conn.connect()
+        self.conn.execute("CREATE TABLE t (a INTEGER, b INTEGER, v TEXT, "
+                          "PRIMARY KEY (a, b))")
+        self.conn.executemany("INSERT INTO t VALUES (%s, %s, %s)",
+                              [(a, b, "v{}".format(a * 10 + b))
+                               for a in range(7) for b in range(3)])
+
+    def tearDown(self):
+        self.conn.close()
+
+    def keys(self, pages):
+        return [[(r["a"], r["b"]) for r in page] for page in pages]
+
+    def test_composite_key(self):
+        pages = list(self.conn.paginate("SELECT * FROM t", ["a", "b"],
+                                        page_size=4))
+        self.assertEqual([len(p) for p in pages], [4, 4, 4, 4, 4, 1])
+        self.assertEqual(sum(self.keys(pages), []),
+                         [(a, b) for a in range(7) for b in range(3)])
+
+    def test_descending_with_parameters(self):
+        pages = list(self.conn.paginate(
+            "SELECT a, b FROM t WHERE a >= %s OR b = %s", ["a", "b"], 5, 0,
+            page_size=3, descending=True))
+        expected = sorted([(a, b) for a in range(7) for b in range(3)
+                           if a >= 5 or b == 0], reverse=True)
+        self.assertEqual(sum(self.keys(pages), []), expected)
+
+    def test_named_parameters(self):
+        pages = list(self.conn.paginate(
+            "SELECT * FROM t WHERE b = %(b)s", "a", page_size=2, b=1))
+        self.assertEqual([r["a"] for r in sum(pages, [])], list(range(7)))
+
+    def test_exact_pages_and_empty(self):
+        pages = list(self.conn.paginate("SELECT * FROM t WHERE b = 2", "a",
+                                        page_size=7))
+        self.assertEqual([len(p) for p in pages], [7])
+        self.assertEqual(list(self.conn.paginate(
+            "SELECT * FROM t WHERE a > 10", "a")), [])
+
+    def test_grouped_query_and_row_factory(self):
+        pages = list(self.conn.paginate(
+            "SELECT t.a, COUNT(*) AS n FROM t GROUP BY t.a", ["t.a"],
+            page_size=3, row_factory=tuple_factory))
+        self.assertEqual(sum(pages, []), [(a, 3) for a in range(7)])
+
+    def test_lazy(self):
+        pages = self.conn.paginate("SELECT * FROM t", ["a", "b"],
+                                   page_size=2)
+        next(pages)
+        self.assertIn("LIMIT 2", self.conn.get_last_executed())
+        self.assertNotIn(">", self.conn.get_last_executed())
+        next(pages)
+        self.assertIn("(a, b) >", self.conn.get_last_executed())
+
+    def test_missing_key_column(self):
+        with self.assertRaises(ProgrammingError):
+            list(self.conn.paginate("SELECT v FROM t", "a"))
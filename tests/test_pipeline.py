@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+
+from sqlight.connection import Connection
+from sqlight.err import ProgrammingError
+from sqlight.pipeline import copy_table
+
+
+class TestCopyTable(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.source = Connection.create_from_dburl(
+            "sqlite:///{}?check_same_thread=False".format(self.path))
+        self.source.connect()
+        self.source.execute("create table src (id integer, name text)")
+        self.source.executemany("insert into src values (%s, %s)",
+                                [(i, "n%d" % i) for i in range(1050)])
+        self.source.commit()
+        self.sink = Connection.create_from_dburl("sqlite:///:memory:")
+        self.sink.connect()
+        self.sink.execute("create table dst (id integer, name text)")
+
+    def tearDown(self):
+        self.source.close()
+        self.sink.close()
+        os.remove(self.path)
+
+    def test_copy(self):
+        seen = []
+        stats = copy_table(self.source, "select * from src where id >= %s",
+                           self.sink, "dst", 50, batch_size=100,
+                           queue_size=2, commit_every=300,
+                           progress=lambda s: seen.append(s.rows))
+        self.assertEqual(stats.rows, 1000)
+        self.assertEqual(stats.batches, 10)
+        self.assertEqual(stats.commits, 4)
+        self.assertEqual(seen[-1], 1000)
+        self.assertGreater(stats.rows_per_second, 0)
+        self.assertEqual(len(self.sink.query("select * from dst")), 1000)
+        self.assertEqual(
+            self.sink.get("select name from dst where id = %s", 70).name,
+            "n70")
+
+    def test_columns_and_errors(self):
+        self.sink.execute("create table other (a integer, b text)")
+        copy_table(self.source, "select * from src", self.sink, "other",
+                   columns=["a", "b"])
+        self.assertEqual(len(self.sink.query("select * from other")), 1050)
+        with self.assertRaises(ProgrammingError):
+            copy_table(self.source, "select * from src where id = %s",
+                       self.sink, "dst")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from sqlight.pool import ConnectionPool, PooledConnection
+from sqlight.err import PoolTimeoutError, InterfaceError, ProgrammingError
+from .config import sqlite_test_table
+
+
+class TestConnectionPool(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.url = "sqlite:///{}?check_same_thread=False".format(self.path)
+        self.pool = ConnectionPool(self.url, min_size=1, max_size=2,
+                                   timeout=0.2)
+        with self.pool.acquire() as c:
+            c.execute(sqlite_test_table)
+            c.commit()
+
+    def tearDown(self):
+        self.pool.close()
+        os.remove(self.path)
+
+    def test_min_size(self):
+        self.assertEqual(self.pool.size, 1)
+        self.assertEqual(self.pool.available, 1)
+
+    def test_acquire_release(self):
+        c = self.pool.acquire()
+        self.assertIsInstance(c, PooledConnection)
+        self.assertEqual(self.pool.available, 0)
+        c.execute("insert into test (name) values (%s)", "test1")
+        c.commit()
+        c.release()
+        self.assertEqual(self.pool.available, 1)
+
+        with self.pool.acquire() as c2:
+            self.assertIs(c2, c)
+            row = c2.get("select * from test where name = %s", "test1")
+            self.assertEqual(row.id, 1)
+
+        with self.assertRaises(ProgrammingError):
+            self.pool.release(c)
+
+    def test_release_rollback(self):
+        with self.pool.acquire() as c:
+            c.execute("insert into test (name) values (%s)", "test1")
+        with self.pool.acquire() as c:
+            self.assertEqual(c.query("select * from test"), [])
+
+    def test_release_rollback_autocommit(self):
+        url = self.url + "&autocommit=True"
+        with ConnectionPool(url, max_size=1) as pool:
+            with pool.acquire() as c:
+                c.begin()
+                c.execute("insert into test (name) values (%s)", "test1")
+            with pool.acquire() as c:
+                self.assertFalse(c._db._db.in_transaction)
+                self.assertEqual(c.query("select * from test"), [])
+
+    def test_close_stale_reference(self):
+        c = self.pool.acquire()
+        c.release()
+        c.close()
+        with self.pool.acquire() as c2:
+            self.assertIs(c2, c)
+            self.assertEqual(c2.get("select 1 as a").a, 1)
+
+    def test_close_returns_to_pool(self):
+        c = self.pool.acquire()
+        c.close()
+        self.assertEqual(self.pool.available, 1)
+        with self.pool.acquire() as c2:
+            self.assertEqual(c2.get("select 1 as a").a, 1)
+
+    def test_timeout(self):
+        c1 = self.pool.acquire()
+        c2 = self.pool.acquire()
+        self.assertEqual(self.pool.size, 2)
+        with self.assertRaises(PoolTimeoutError):
+            self.pool.acquire()
+
+        def release_later():
+            time.sleep(0.05)
+            c1.release()
+
+        t = threading.Thread(target=release_later)
+        t.start()
+        c3 = self.pool.acquire(timeout=1)
+        t.join()
+        self.assertIs(c3, c1)
+        c2.release()
+        c3.release()
+
+    def test_max_lifetime(self):
+        self.pool.max_lifetime = 0
+        c = self.pool.acquire()
+        c.release()
+        # the expired connection is replaced to keep min_size
+        self.assertEqual(self.pool.size, 1)
+        self.pool.max_lifetime = 3600
+        with self.pool.acquire() as c3:
+            self.assertIsNot(c3, c)
+
+    def test_wait_forever(self):
+        c1 = self.pool.acquire()
+        c2 = self.pool.acquire()
+        threading.Timer(0.3, c1.release).start()
+        c3 = self.pool.acquire(timeout=None)
+        self.assertIs(c3, c1)
+        c2.release()
+        c3.release()
+
+    def test_checkout_keeps_min_size(self):
+        self.pool.max_idle_time = 0
+        time.sleep(0.01)
+        with self.pool.acquire() as c:
+            self.assertEqual(self.pool.size, 1)
+        self.pool.max_lifetime = 0
+        with self.pool.acquire() as c2:
+            self.assertIsNot(c2, c)
+        self.assertEqual(self.pool.size, 1)
+
+    def test_idle_eviction(self):
+        c1 = self.pool.acquire()
+        c2 = self.pool.acquire()
+        c1.release()
+        self.pool.max_idle_time = 0
+        time.sleep(0.01)
+        c2.release()
+        self.assertEqual(self.pool.size, 1)
+
+    def test_validate(self):
+        self.pool.validate = True
+        c = self.pool.acquire()
+        c.release()
+        c._db.close()
+        with self.pool.acquire() as c2:
+            self.assertIsNot(c2, c)
+            self.assertEqual(c2.get("select 1 as a").a, 1)
+        self.assertEqual(self.pool.size, 1)
+
+    def test_threads(self):
+        errors = []
+
+        def worker():
+            try:
+                for _ in range(20):
+                    with self.pool.acquire(timeout=5) as c:
+                        c.execute("insert into test (name) values (%s)", "t")
+                        c.commit()
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+        self.assertLessEqual(self.pool.size, 2)
+        with self.pool.acquire() as c:
+            self.assertEqual(len(c.query("select * from test")), 80)
+
+    def test_closed(self):
+        self.pool.close()
+        self.assertEqual(self.pool.size, 0)
+        with self.assertRaises(InterfaceError):
+            self.pool.acquire()
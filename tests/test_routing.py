@@ -0,0 +1,96 @@
+import os
+import tempfile
+import time
+import unittest
+
+from sqlight.connection import Connection
+from sqlight.routing import LEAST_OUTSTANDING, RoutingConnection
+
+
+class TestRoutingConnection(unittest.TestCase):
+    """The databases are separate files, each test row names the database
+    holding it, so reads show where they were routed."""
+
+    def setUp(self):
+        self.paths = []
+        self.urls = []
+        for name in ("primary", "replica1", "replica2"):
+            fd, path = tempfile.mkstemp(suffix=".db")
+            os.close(fd)
+            url = "sqlite:///{}?check_same_thread=False".format(path)
+            c = Connection.create_from_dburl(url)
+            c.connect()
+            c.execute("create table t (name text)")
+            c.execute("insert into t values (%s)", name)
+            c.commit()
+            c.close()
+            self.paths.append(path)
+            self.urls.append(url)
+        self.c = RoutingConnection(self.urls[0], self.urls[1:],
+                                   sticky_window=0.1, eject_time=60)
+
+    def tearDown(self):
+        self.c.close()
+        for path in self.paths:
+            os.remove(path)
+
+    def names(self, count=4):
+        return [self.c.get("select name from t limit 1").name
+                for _ in range(count)]
+
+    def test_round_robin(self):
+        self.assertEqual(sorted(self.names()),
+                         ["replica1", "replica1", "replica2", "replica2"])
+        self.assertEqual(len(list(self.c.iter("select * from t"))), 1)
+
+    def test_least_outstanding(self):
+        c = RoutingConnection(self.urls[0], self.urls[1:],
+                              balance=LEAST_OUTSTANDING)
+        rows = c.iter("select * from t")
+        self.assertEqual(next(rows).name, "replica1")
+        # replica1 is busy streaming
+        self.assertEqual(c.get("select * from t").name, "replica2")
+        rows.close()
+        c.close()
+
+    def test_write_stickiness(self):
+        self.c.execute("insert into t values (%s)", "written")
+        self.assertEqual(
+            self.c.query("select name from t order by rowid")[-1].name,
+            "written")
+        time.sleep(0.15)
+        self.assertNotIn("primary", self.names())
+
+    def test_transaction(self):
+        self.c.begin()
+        self.c.execute("insert into t values (%s)", "tx")
+        self.assertEqual(len(self.c.query("select * from t")), 2)
+        self.c.rollback()
+        with self.c.primary.acquire() as conn:
+            self.assertEqual(len(conn.query("select * from t")), 1)
+
+    def test_eject(self):
+        # a missing table raises OperationalError on sqlite
+        with self.c.replicas[0].pool.acquire() as conn:
+            conn.execute("drop table t")
+            conn.commit()
+        names = self.names(3)
+        self.assertEqual(names, ["replica2"] * 3)
+        self.assertGreater(self.c.replicas[0].ejected_until, 0)
+
+
+    def test_busy_replica_not_ejected(self):
+        c = RoutingConnection(self.urls[0], self.urls[1:], max_size=1,
+                              timeout=0.01)
+        with c.replicas[0].pool.acquire():
+            self.assertEqual(
+                [c.get("select name from t").name for _ in range(2)],
+                ["replica2"] * 2)
+        self.assertEqual(c.replicas[0].ejected_until, 0)
+        self.assertEqual(c.replicas[0].outstanding, 0)
+        self.assertEqual(c.get("select name from t").name, "replica1")
+        c.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
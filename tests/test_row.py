@@ -1,6 +1,11 @@
 import unittest
 
-from sqlight.row import Row
+from dataclasses import dataclass
+
+from sqlight.connection import Connection
+from sqlight.err import ProgrammingError
+from sqlight.row import Row, CompactRow, compact_row_factory, \
+        tuple_factory, dict_factory, namedtuple_factory, dataclass_factory
 
 
 class TestRow(unittest.TestCase):
@@ -26,3 +31,116 @@ class TestRow(unittest.TestCase):
 
         with self.assertRaises(AttributeError):
             row.test_name
+
+
+class TestCompactRow(unittest.TestCase):
+
+    def test_keys(self):
+        row = compact_row_factory(["name", "age"])((1, 19))
+        self.assertEqual(list(row.keys()), ["name", "age"])
+        self.assertEqual(row.name, 1)
+        self.assertEqual(row["name"], 1)
+        self.assertEqual(row.get("age"), 19)
+        self.assertEqual(row.get("test_name", 0), 0)
+        self.assertEqual(dict(row), {"name": 1, "age": 19})
+        self.assertEqual(row, {"name": 1, "age": 19})
+        self.assertIn("age", row)
+        self.assertEqual(len(row), 2)
+        self.assertEqual(list(row.get_changed()), [])
+        row.name = 1
+        self.assertEqual(list(row.get_changed()), [])
+        row.name = 2
+        self.assertEqual(list(row.get_changed()), ["name"])
+        row["name"] = 3
+        self.assertEqual(list(row.get_changed()), ["name"])
+        self.assertEqual(row.name, 3)
+        row.name = 1
+        self.assertEqual(list(row.get_changed()), [])
+        with self.assertRaises(AttributeError):
+            row.test_name = 3
+
+        with self.assertRaises(AttributeError):
+            row["test_name"] = 3
+
+        with self.assertRaises(AttributeError):
+            row.test_name
+
+        with self.assertRaises(KeyError):
+            row["test_name"]
+
+    def test_shared_index(self):
+        build = compact_row_factory(["id", "name"])
+        a, b = build((1, "a")), build((2, "b"))
+        self.assertIs(a._index, b._index)
+        a.name = "c"
+        self.assertEqual(b.name, "b")
+
+    def test_connection(self):
+        c = Connection.create_from_dburl("sqlite:///:memory:",
+                                         row_factory=compact_row_factory)
+        c.connect()
+        row = c.get("select 1 as id, 'a' as name")
+        self.assertIsInstance(row, CompactRow)
+        self.assertEqual(row.name, "a")
+        rows = c.query("select 1 as id", row_factory=None)
+        self.assertIsInstance(rows[0], CompactRow)
+
+        c.row_factory = None
+        row = c.get("select 1 as id")
+        self.assertIsInstance(row, Row)
+        rows = list(c.iter("select 1 as id", row_factory=compact_row_factory))
+        self.assertIsInstance(rows[0], CompactRow)
+        c.close()
+
+
+@dataclass
+class Item:
+    id: int
+    name: str = None
+
+
+class TestRowFactory(unittest.TestCase):
+
+    def setUp(self):
+        self.c = Connection.create_from_dburl("sqlite:///:memory:")
+        self.c.connect()
+
+    def tearDown(self):
+        self.c.close()
+
+    def test_tuple(self):
+        rows = self.c.query("select 1 as id, 'a' as name",
+                            row_factory=tuple_factory)
+        self.assertEqual(rows, [(1, "a")])
+
+    def test_dict(self):
+        row = self.c.get("select 1 as id, 'a' as name",
+                         row_factory=dict_factory)
+        self.assertIs(type(row), dict)
+        self.assertEqual(row, {"id": 1, "name": "a"})
+
+    def test_namedtuple(self):
+        a = self.c.get("select 1 as id, 'a' as name",
+                       row_factory=namedtuple_factory)
+        b = self.c.get("select 2 as id, 'b' as name",
+                       row_factory=namedtuple_factory)
+        self.assertEqual((a.id, a.name), (1, "a"))
+        self.assertIs(type(a), type(b))
+        c = self.c.get("select 1 as id, 2 as 'not valid'",
+                       row_factory=namedtuple_factory)
+        self.assertEqual(c._1, 2)
+
+    def test_dataclass(self):
+        factory = dataclass_factory(Item)
+        rows = list(self.c.iter("select 1 as id, 'a' as name "
+                                "union all select 2, 'b'",
+                                row_factory=factory))
+        self.assertEqual(rows, [Item(1, "a"), Item(2, "b")])
+        self.assertEqual(self.c.get("select 3 as id", row_factory=factory),
+                         Item(3))
+        self.assertIs(factory(["id", "name"]), factory(["id", "name"]))
+        self.assertIs(dataclass_factory(Item), factory)
+        with self.assertRaises(ProgrammingError):
+            self.c.get("select 1 as id, 2 as age", row_factory=factory)
+        with self.assertRaises(ProgrammingError):
+            dataclass_factory(dict)
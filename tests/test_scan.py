@@ -0,0 +1,61 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from sqlight.connection import Connection
+from sqlight.scan import QUANTILE, parallel_scan
+
+
+class TestParallelScan(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.url = "sqlite:///{}".format(self.path)
+        c = Connection.create_from_dburl(self.url)
+        c.connect()
+        c.execute("create table t (id integer primary key, name text)")
+        c.executemany("insert into t values (%s, %s)",
+                      [(i * 3, "n%04d" % (i % 500)) for i in range(1000)])
+        c.commit()
+        c.close()
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_range(self):
+        rows = list(parallel_scan(self.url, "t", "id", parallelism=4,
+                                  batch_size=50, queue_size=2))
+        self.assertEqual(sorted(r.id for r in rows),
+                         [i * 3 for i in range(1000)])
+
+        rows = parallel_scan(self.url, "t", "id", parallelism=3,
+                             ordered=True, where="id > 30")
+        self.assertEqual([r.id for r in rows],
+                         [i * 3 for i in range(11, 1000)])
+
+    def test_quantile(self):
+        rows = list(parallel_scan(self.url, "t", "name", parallelism=3,
+                                  partitioning=QUANTILE, ordered=True,
+                                  batch_size=64))
+        self.assertEqual(len(rows), 1000)
+        names = [r.name for r in rows]
+        self.assertEqual(names, sorted(names))
+
+    def test_close_early(self):
+        rows = parallel_scan(self.url, "t", "id", batch_size=10,
+                             queue_size=1)
+        self.assertIsNotNone(next(rows))
+        rows.close()
+
+    def test_error(self):
+        # partition errors surface in the consuming thread as raised by
+        # the driver, row iterators do not convert them
+        with self.assertRaisesRegex(sqlite3.OperationalError,
+                                    "no such column: nope"):
+            list(parallel_scan(self.url, "t", "id", columns="nope"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+
+from sqlight.err import ProgrammingError
+from sqlight.sharding import ShardedConnection, crc32_shard
+
+
+class TestShardedConnection(unittest.TestCase):
+
+    def setUp(self):
+        self.paths = []
+        urls = []
+        for _ in range(3):
+            fd, path = tempfile.mkstemp(suffix=".db")
+            os.close(fd)
+            self.paths.append(path)
+            urls.append("sqlite:///{}?check_same_thread=False".format(path))
+        self.c = ShardedConnection(urls)
+        for pool in self.c.pools:
+            with pool.acquire() as conn:
+                conn.execute("create table user (id integer, name text)")
+                conn.commit()
+
+    def tearDown(self):
+        self.c.close()
+        for path in self.paths:
+            os.remove(path)
+
+    def test_routing(self):
+        for i in range(20):
+            self.c.insert("insert into user values (%s, %s)", i, "u%d" % i,
+                          shard_key=i)
+        self.assertEqual(self.c.get("select * from user where id = %s", 7,
+                                    shard_key=7).name, "u7")
+        for shard, pool in enumerate(self.c.pools):
+            with pool.acquire() as conn:
+                for row in conn.query("select id from user"):
+                    self.assertEqual(crc32_shard(row.id, 3), shard)
+
+        self.assertEqual(self.c.update("update user set name = %s "
+                                       "where id = %s", "x", 7, shard_key=7),
+                         1)
+        with self.assertRaises(ProgrammingError):
+            self.c.query("select * from user")
+
+    def test_query_all_shards(self):
+        for i in range(20):
+            self.c.insert("insert into user values (%s, %s)", i, "u%d" % i,
+                          shard_key=i)
+        rows = self.c.query_all_shards("select * from user")
+        self.assertEqual(sorted(r.id for r in rows), list(range(20)))
+
+        rows = self.c.query_all_shards(
+            "select * from user order by id desc limit %s", 5,
+            order_by="id", reverse=True, limit=5)
+        self.assertEqual([r.id for r in rows], [19, 18, 17, 16, 15])
+
+    def test_transaction(self):
+        with self.c.connection(1) as conn:
+            conn.begin()
+            conn.insert("insert into user values (%s, %s)", 1, "a")
+            conn.rollback()
+        self.assertIsNone(self.c.get("select * from user where id = %s", 1,
+                                     shard_key=1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+
+from sqlight.connection import Connection
+from sqlight.stats import Histogram, StatsCollector, fingerprint
+
+
+class TestFingerprint(unittest.TestCase):
+
+    def test_fingerprint(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE a IN (1, 2, 3) AND b = 'x' "
+                        "-- note\n"),
+            "select * from t where a in (?+) and b = ?")
+        self.assertEqual(fingerprint("select * from t where a in (%s)"),
+                         fingerprint("select * from t  where a IN (4,5)"))
+        self.assertEqual(
+            fingerprint("insert into t (a, b) values (%s, %s), (%s, %s)"),
+            "insert into t (a, b) values (?+)")
+        self.assertEqual(fingerprint("select f(a, 1.5)"), "select f(a, ?)")
+
+
+class TestHistogram(unittest.TestCase):
+
+    def test_percentile(self):
+        h = Histogram()
+        self.assertIsNone(h.percentile(50))
+        for i in range(1, 101):
+            h.add(i / 1000.0)
+        self.assertAlmostEqual(h.percentile(50), 0.050, delta=0.005)
+        self.assertAlmostEqual(h.percentile(99), 0.099, delta=0.010)
+
+
+class TestStatsCollector(unittest.TestCase):
+
+    def test_collect(self):
+        c = Connection.create_from_dburl("sqlite:///:memory:")
+        c.connect()
+        stats = StatsCollector(slow_threshold=0)
+        c.add_listener(stats)
+        c.execute("create table t (a)")
+        with self.assertLogs("sqlight.slow", "WARNING"):
+            for i in range(3):
+                c.insert("insert into t values (%s)", i)
+        c.query("select * from t where a in (1, 2)")
+        c.close()
+
+        s = stats.get("insert into t values (9)")
+        self.assertEqual(s.count, 3)
+        self.assertEqual(s.rows, 3)
+        self.assertGreater(s.percentile(99), 0)
+        top, = stats.top(1, key="count")
+        self.assertIs(top, s)
+        self.assertIn("select * from t where a in (?+)", stats.report())
+
+
+if __name__ == '__main__':
+    unittest.main()
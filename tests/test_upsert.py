@@ -0,0 +1,118 @@
+import unittest
+
+import sqlight.dialects as dialects
+
+from sqlight.connection import Connection
+from sqlight.err import ProgrammingError
+from sqlight.events import Listener
+from sqlight.platforms import Platform
+
+
+class Statements(Listener):
+
+    def __init__(self):
+        self.queries = []
+
+    def before_execute(self, event):
+        self.queries.append(event.sql)
+
+
+class TestUpsertQuery(unittest.TestCase):
+
+    def test_on_conflict(self):
+        for platform in (Platform.PostgreSQL, Platform.SQLite):
+            self.assertEqual(
+                dialects.upsert_query(platform, "t", ["a", "b", "v"],
+                                      ["a", "b"], ["v"], 2),
+                "INSERT INTO t (a, b, v) VALUES (%s, %s, %s), (%s, %s, %s) "
+                "ON CONFLICT (a, b) DO UPDATE SET v = excluded.v")
+            self.assertEqual(
+                dialects.upsert_query(platform, "t", ["a"], ["a"], [], 1),
+                "INSERT INTO t (a) VALUES (%s) ON CONFLICT (a) DO NOTHING")
+
+    def test_on_duplicate_key(self):
+        for platform in (Platform.MySQL, Platform.MariaDB):
+            self.assertEqual(
+                dialects.upsert_query(platform, "t", ["a", "v", "w"], ["a"],
+                                      ["v", "w"], 1),
+                "INSERT INTO t (a, v, w) VALUES (%s, %s, %s) ON DUPLICATE "
+                "KEY UPDATE v = VALUES(v), w = VALUES(w)")
+            self.assertEqual(
+                dialects.upsert_query(platform, "t", ["a"], ["a"], [], 1),
+                "INSERT INTO t (a) VALUES (%s) ON DUPLICATE KEY UPDATE a = a")
+
+
+class TestUpsertMany(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = Connection.create_from_dburl("sqlite:///:memory:")
+        self.conn.connect()
+        self.conn.execute("CREATE TABLE t (a INTEGER, b INTEGER, v TEXT, "
+                          "n INTEGER DEFAULT 0, PRIMARY KEY (a, b))")
+        self.statements = Statements()
+        self.conn.add_listener(self.statements)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def rows(self):
+        return {(r["a"], r["b"]): r["v"]
+                for r in self.conn.query("SELECT * FROM t")}
+
+    def test_insert_and_update(self):
+        self.assertEqual(self.conn.upsertmany(
+            "t", [{"a": i, "b": 0, "v": "old"} for i in range(10)],
+            ["a", "b"]), 10)
+        self.assertEqual(self.conn.upsertmany(
+            "t", ({"a": i, "b": 0, "v": "new"} for i in range(5, 15)),
+            ["a", "b"]), 10)
+        self.assertEqual(len(self.statements.queries), 2)
+        rows = self.rows()
+        self.assertEqual(len(rows), 15)
+        self.assertEqual(rows[(4, 0)], "old")
+        self.assertEqual(rows[(5, 0)], "new")
+
+    def test_update_columns(self):
+        self.conn.insert("INSERT INTO t VALUES (1, 1, 'a', 7)")
+        self.conn.upsertmany("t", [{"a": 1, "b": 1, "v": "b", "n": 0},
+                                   {"a": 2, "b": 1, "v": "c", "n": 0}],
+                             ["a", "b"], update_columns=["v"])
+        self.assertEqual(self.conn.get("SELECT * FROM t WHERE a = 1")["n"], 7)
+        self.conn.upsertmany("t", [{"a": 1, "b": 1, "v": "z"}], ["a", "b"],
+                             update_columns=[])
+        self.assertEqual(self.rows(), {(1, 1): "b", (2, 1): "c"})
+
+    def test_pages(self):
+        rows = [{"a": i, "b": 0, "v": "x"} for i in range(25)]
+        self.assertEqual(self.conn.upsertmany("t", rows, ["a", "b"],
+                                              batch_size=10), 25)
+        self.assertEqual(len(self.statements.queries), 3)
+
+        self.statements.queries.clear()
+        self.conn._db.max_parameters = 30
+        self.conn.upsertmany("t", rows, ["a", "b"])
+        self.assertEqual(len(self.statements.queries), 3)
+
+    def test_statement_bytes(self):
+        self.conn._db.max_statement_bytes = 2000
+        rows = [{"a": i, "b": 0, "v": "x" * 100} for i in range(40)]
+        self.assertEqual(self.conn.upsertmany("t", rows, ["a", "b"]), 40)
+        self.assertGreater(len(self.statements.queries), 4)
+        self.assertEqual(len(self.rows()), 40)
+
+    def test_duplicate_keys(self):
+        rows = [{"a": 1, "b": 0, "v": "a"}, {"a": 2, "b": 0, "v": "b"},
+                {"a": 1, "b": 0, "v": "c"}, {"a": 1, "b": 1, "v": "d"}]
+        self.assertEqual(self.conn.upsertmany("t", rows, ["a", "b"]), 3)
+        self.assertEqual(len(self.statements.queries), 1)
+        self.assertEqual(self.statements.queries[0].count("(%s, %s, %s)"), 3)
+        self.assertEqual(self.rows(), {(1, 0): "c", (2, 0): "b",
+                                       (1, 1): "d"})
+
+    def test_empty_and_missing_column(self):
+        self.assertEqual(self.conn.upsertmany("t", [], ["a", "b"]), 0)
+        with self.assertRaises(ProgrammingError):
+            self.conn.upsertmany("t", [{"a": 1, "b": 1, "v": "x"},
+                                       {"a": 2, "b": 1}], ["a", "b"])
+        with self.assertRaises(ProgrammingError):
+            self.conn.upsertmany("t", [{"a": 1, "v": "x"}], ["a", "b"])